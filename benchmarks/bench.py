@@ -0,0 +1,317 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# Everything runs offline: the bots get the simulated broker and plots go nowhere
+os.environ["BROKER"] = "sim"
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "pybots"))
+sys.path.append(os.path.join(ROOT, "fxpred"))
+
+import numpy as np
+import pandas as pd
+import broker
+import barstore
+from backtest import load_bars
+from marketdata import MarketData
+
+DEFAULT_RESULTS_DIR = os.path.join(ROOT, "data", "benchmarks")
+NOTEBOOK = os.path.join(ROOT, "BTCUSD Trading Bot.ipynb")
+SIZES = "10k,100k,1M,10M"
+
+
+# Function to build the notebook's indicator helpers without running the notebook
+def notebook_helpers(path=NOTEBOOK):
+    """
+    The calculate_* functions defined in the notebook, compiled on their own
+    (the rest of the cell needs a MetaTrader5 terminal).
+    """
+    with open(path, encoding="utf-8") as f:
+        cells = json.load(f)["cells"]
+    namespace = {"pd": pd, "np": np}
+    for cell in cells:
+        if cell["cell_type"] != "code":
+            continue
+        try:
+            tree = ast.parse("".join(cell["source"]))
+        except SyntaxError:
+            continue
+        defs = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name.startswith("calculate_")]
+        if defs:
+            exec(compile(ast.Module(body=defs, type_ignores=[]), path, "exec"), namespace)
+    return namespace
+
+
+class Benchmark:
+    """
+    One timed workload.
+    setup(rates) prepares the inputs outside the timing and returns a callable;
+    each call is one timed run and returns how many items (bars, calls) it did.
+    :param max_bars: Largest size run unless --full is given (None for no cap)
+    """
+    def __init__(self, name, source, setup, max_bars=None):
+        self.name = name
+        self.source = source
+        self.setup = setup
+        self.max_bars = max_bars
+
+
+def close_frame(rates):
+    """Bar-store style DataFrame (DatetimeIndex, Close column) over the rates' closes"""
+    index = pd.to_datetime(rates["time"], unit="s")
+    return pd.DataFrame({"Close": rates["close"]}, index=index)
+
+
+def setup_indicator_engine(rates):
+    from indicators import IndicatorEngine
+    engine = IndicatorEngine(fast=20, slow=50, channel=20)
+
+    def run():
+        engine.seed(rates)  # Every bar goes through add() from per-column slices, as in the live loop
+        return len(rates)
+    return run
+
+
+def setup_nasdaq_moving_averages(rates, calls=1000):
+    import nasdaq
+    # Replay positioned on the last bar, so every call reads the newest closed bars
+    sim = broker.SimBroker(start=int(rates["time"][-1]))
+    sim.add_symbol("NAS100", rates, timeframe=broker.TIMEFRAME_M1)
+    sim.step()
+    nasdaq.mt5 = sim
+    nasdaq.market = MarketData(sim)
+
+    def run():
+        for _ in range(calls):
+            nasdaq.get_moving_averages("NAS100")
+        return calls
+    return run
+
+
+def setup_fxpred23_features(rates):
+    import features
+    import fxpred23
+    data = close_frame(rates)
+
+    def run():
+        features._cache.clear()  # Time the build, not the cache hit
+        fxpred23.preprocess_data(data)
+        return len(data)
+    return run
+
+
+def notebook_setup(kind):
+    def setup(rates):
+        helpers = notebook_helpers()
+        close = pd.Series(rates["close"])
+
+        def run():
+            if kind == "ema":
+                helpers["calculate_ema"](close, 20)
+            elif kind == "macd":
+                helpers["calculate_macd"](close)
+            else:
+                helpers["calculate_rsi"](close)
+            return len(close)
+        return run
+    return setup
+
+
+def forecast_setup(update):
+    def setup(rates):
+        import djiEA
+        from forecaster import ARIMAForecaster
+        index = pd.bdate_range("1990-01-01", periods=len(rates))
+        series = pd.Series(rates["close"], index=index)
+        history = series.iloc[:-1]
+
+        def run():
+            # A fresh, unpersisted model each run; the bot's saved model is never touched
+            djiEA.forecaster = ARIMAForecaster(order=(5, 1, 0))
+            if not update:
+                djiEA.forecast(series)
+                return len(series)
+            djiEA.forecast(history)
+            start = time.perf_counter()
+            djiEA.forecast(series)
+            # Only the one-bar update is reported
+            run.elapsed = time.perf_counter() - start
+            return 1
+        return run
+    return setup
+
+
+def setup_risk_lots(rates):
+    from risk import risk_lots
+    sl_distance = np.abs(rates["high"] - rates["low"]) + 1e-6
+
+    def run():
+        risk_lots(10000.0, 0.01, sl_distance, 0.01, 0.01, 0.01, 0.01, 100.0)
+        return len(sl_distance)
+    return run
+
+
+BENCHMARKS = [
+    Benchmark("indicator_engine", "mt5dailybot IndicatorEngine seed/update (SMA, rolling high/low)",
+              setup_indicator_engine, max_bars=1_000_000),
+    Benchmark("nasdaq_moving_averages", "nasdaq.get_moving_averages, 1000 calls on the simulator",
+              setup_nasdaq_moving_averages, max_bars=1_000_000),
+    Benchmark("fxpred23_features", "fxpred23.preprocess_data (lags, SMA_10/30, RSI_14)",
+              setup_fxpred23_features),
+    Benchmark("notebook_ema", "BTCUSD notebook calculate_ema(20)", notebook_setup("ema")),
+    Benchmark("notebook_macd", "BTCUSD notebook calculate_macd(12, 26, 9)", notebook_setup("macd")),
+    Benchmark("notebook_rsi", "BTCUSD notebook calculate_rsi(14)", notebook_setup("rsi")),
+    Benchmark("djiea_forecast", "djiEA.forecast, first call (full ARIMA fit)",
+              forecast_setup(update=False), max_bars=10_000),
+    Benchmark("djiea_forecast_update", "djiEA.forecast, one new bar after a fit",
+              forecast_setup(update=True), max_bars=10_000),
+    Benchmark("risk_lots", "risk.risk_lots over one stop distance per bar", setup_risk_lots),
+]
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+# Function to load the bars every benchmark slices its inputs from
+def load_rates(bars_path=None, symbol=None, interval="1d", size=None, seed=0):
+    """Stored bars (CSV/Parquet or the bar store) in the MT5 rates layout, else synthetic M1 bars"""
+    if bars_path is not None:
+        df = load_bars(bars_path)
+        rates = np.zeros(len(df), dtype=broker.RATES_DTYPE)
+        for col in ("time", "open", "high", "low", "close"):
+            rates[col] = df[col].to_numpy()
+        return rates, os.path.basename(bars_path)
+    if symbol is not None:
+        columns = barstore.store.columns(symbol, interval)
+        if columns is None:
+            raise SystemExit(f"No stored bars for {symbol} ({interval})")
+        return broker.to_rates(columns), f"{symbol} {interval}"
+    return broker.synthetic_bars(size, timeframe=broker.TIMEFRAME_M1, seed=seed), f"synthetic seed={seed}"
+
+
+def time_run(run, repeat):
+    """Best wall time of `repeat` runs, and the items per run"""
+    best = np.inf
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = run()
+        elapsed = getattr(run, "elapsed", time.perf_counter() - start)
+        best = min(best, elapsed)
+    return best, items
+
+
+def run_suite(rates, sizes, names=None, repeat=3, full=False):
+    results = []
+    for bench in BENCHMARKS:
+        if names and bench.name not in names:
+            continue
+        for n in sizes:
+            if n > len(rates):
+                continue
+            if bench.max_bars is not None and n > bench.max_bars and not full:
+                print(f"{bench.name:<24}{n:>12,}  skipped (over {bench.max_bars:,} bars, use --full)")
+                continue
+            run = bench.setup(rates[-n:])
+            seconds, items = time_run(run, repeat)
+            row = {"benchmark": bench.name, "bars": n, "seconds": seconds, "items": items,
+                   "ns_per_item": seconds / items * 1e9}
+            results.append(row)
+            print(f"{bench.name:<24}{n:>12,}{seconds:>12.4f} s{row['ns_per_item']:>14,.0f} ns/item")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Function to save a run and compare it with an earlier one
+def save_results(results, source, out_dir=DEFAULT_RESULTS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    report = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "source": source,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def previous_results(out_dir, exclude):
+    runs = sorted(p for p in glob.glob(os.path.join(out_dir, "*.json")) if os.path.abspath(p) != os.path.abspath(exclude))
+    return runs[-1] if runs else None
+
+
+def compare(results, baseline_path):
+    """Print the time of each benchmark/size relative to a saved run (below 1.00 is faster)"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["benchmark"], r["bars"]): r["seconds"] for r in baseline["results"]}
+    print(f"\nCompared with {os.path.basename(baseline_path)} (commit {baseline.get('commit')}):")
+    for row in results:
+        old = before.get((row["benchmark"], row["bars"]))
+        if old:
+            print(f"{row['benchmark']:<24}{row['bars']:>12,}{row['seconds'] / old:>10.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the indicator, feature, forecast and sizing code")
+    parser.add_argument("--sizes", default=SIZES, help="Bar counts, e.g. 10k,100k,1M,10M")
+    parser.add_argument("--only", help="Comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best is kept")
+    parser.add_argument("--full", action="store_true", help="Also run sizes above a benchmark's cap")
+    parser.add_argument("--bars", help="CSV/Parquet of stored bars instead of synthetic data")
+    parser.add_argument("--symbol", help="Symbol from the local bar store instead of synthetic data")
+    parser.add_argument("--interval", default="1d", help="Bar store interval for --symbol")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_RESULTS_DIR, help="Directory for the results JSON")
+    parser.add_argument("--compare", help="Results JSON to compare with (default: the previous run)")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for bench in BENCHMARKS:
+            print(f"{bench.name:<24}{bench.source}")
+        return
+
+    sizes = sorted(parse_size(s) for s in args.sizes.split(","))
+    names = set(args.only.split(",")) if args.only else None
+    rates, source = load_rates(args.bars, args.symbol, args.interval, max(sizes), args.seed)
+    if args.bars or args.symbol:
+        # Stored data: sizes beyond what is stored are replaced by the whole history
+        sizes = sorted({min(n, len(rates)) for n in sizes})
+    print(f"{len(rates):,} bars from {source}\n")
+
+    results = run_suite(rates, sizes, names, args.repeat, args.full)
+    path = save_results(results, source, args.out)
+    print(f"\nSaved {path}")
+    baseline = args.compare or previous_results(args.out, path)
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
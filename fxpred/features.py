@@ -0,0 +1,101 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Feature sets already built, keyed by dataset hash and parameters (most recent last)
+_cache = OrderedDict()
+CACHE_SIZE = 8
+
+def dataset_hash(close):
+    """Hash of a close series' values and index, used as the feature cache key"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(close.to_numpy(dtype=np.float64)).view(np.uint8))
+    if isinstance(close.index, pd.DatetimeIndex):
+        h.update(np.ascontiguousarray(close.index.asi8).view(np.uint8))
+    else:
+        h.update(str((close.index[0], close.index[-1], len(close))).encode() if len(close) else b"")
+    return h.hexdigest()
+
+def rolling_mean(values, window):
+    """
+    Rolling mean via cumulative sums, like rolling(window).mean(): NaN until the
+    window is full and for every window holding a NaN. NaNs are summed as zero
+    and counted separately, so a gap only spoils the windows that span it.
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        missing = np.isnan(values)
+        csum = np.cumsum(np.insert(np.where(missing, 0.0, values), 0, 0.0))
+        gaps = np.cumsum(np.insert(missing, 0, False))
+        means = (csum[window:] - csum[:-window]) / window
+        out[window - 1:] = np.where(gaps[window:] == gaps[:-window], means, np.nan)
+    return out
+
+def rsi(values, window=14):
+    """RSI with Wilder smoothing, same values as ta.momentum.RSIIndicator"""
+    diff = np.diff(values, prepend=np.nan)
+    up = pd.Series(np.where(diff > 0, diff, 0.0))
+    down = pd.Series(np.where(diff < 0, -diff, 0.0))
+    ema_up = up.ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+    ema_down = down.ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+    out[np.isnan(ema_up)] = np.nan
+    return out
+
+def build_features(data, lags=5, sma_windows=(), rsi_window=None, column='Close'):
+    """
+    Lagged closes (lag_1..lag_n) plus optional SMA_<w> and RSI columns, with the
+    warm-up rows dropped. `data` is not modified.
+    The lag block is a strided view over the close array, so no column is copied
+    when only lags are requested; with SMA/RSI the matrix is filled in one allocation.
+    Results are cached per dataset hash, so repeated calls on the same data are free.
+    :return: (X DataFrame, y Series) sharing the same index
+    """
+    close = data[column]
+    key = (dataset_hash(close), lags, tuple(sma_windows), rsi_window)
+    cached = _cache.get(key)
+    if cached is not None:
+        _cache.move_to_end(key)
+        return cached
+
+    values = close.to_numpy(dtype=np.float64)
+    # Rows before every feature is defined are dropped
+    warmup = max([lags] + [w - 1 for w in sma_windows] + ([rsi_window - 1] if rsi_window else []))
+    if len(values) <= warmup:
+        raise ValueError("The DataFrame is empty after preprocessing.")
+
+    # windows[i] = values[i .. i+lags]; reversing the first `lags` columns gives lag_1..lag_n
+    lag_view = sliding_window_view(values, lags + 1)[warmup - lags:, :lags][:, ::-1]
+    columns = [f'lag_{lag}' for lag in range(1, lags + 1)]
+    extra = [(f'SMA_{w}', rolling_mean(values, w)) for w in sma_windows]
+    if rsi_window:
+        extra.append(('RSI', rsi(values, rsi_window)))
+
+    if extra:
+        matrix = np.empty((len(values) - warmup, lags + len(extra)))
+        matrix[:, :lags] = lag_view
+        for i, (name, feature) in enumerate(extra):
+            matrix[:, lags + i] = feature[warmup:]
+            columns.append(name)
+        matrix.flags.writeable = False  # Shared through the cache, keep it immutable
+    else:
+        matrix = lag_view
+
+    index = close.index[warmup:]
+    X = pd.DataFrame(matrix, index=index, columns=columns, copy=False)
+    y = pd.Series(values[warmup:], index=index, name=column, copy=False)
+
+    # Rows with a NaN close, or a lag/SMA/RSI window spanning one, are dropped (as dropna() did)
+    valid = ~np.isnan(matrix).any(axis=1) & ~np.isnan(values[warmup:])
+    if not valid.all():
+        X, y = X[valid], y[valid]
+    if X.empty:
+        raise ValueError("The DataFrame is empty after preprocessing.")
+
+    _cache[key] = (X, y)
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return X, y
@@ -1,20 +1,34 @@
-import MetaTrader5 as mt5
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
-import time
 import matplotlib.pyplot as plt
+import os
+import sys
+
+# The bar store lives with the MT5 bots in ../pybots
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pybots"))
+import barstore
+from broker import get_broker
+from online import OnlinePricePredictor
+from features import build_features
+from journal import TradeJournal
+from positionbook import PositionBook
+from scheduler import ReplayFinished, get_clock
+
+mt5 = get_broker()  # MetaTrader5 terminal, or the simulator when BROKER=sim
+clock = get_clock(mt5)  # Wall time, or replay time on the simulator (sleeping replays the ticks)
 
 # Constants
 symbol = "EURUSD"
 lot = 0.1  # Size of the lot
 stop_loss = 50  # Stop loss in points
 take_profit = 100  # Take profit in points
+online_mode = True  # Update the model one bar at a time instead of refitting on every loop
 
-# Initialize lists to track performance
-trade_history = []
-equity_curve = []
+# Orders, fills, equity and predictions go to the shared SQLite journal instead of growing lists
+journal = TradeJournal(bot="fxbot", clock=clock)
+# New deals (fills, SL/TP exits) are picked up from history and journaled
+book = PositionBook(mt5, on_deal=journal.fill)
 
 # Function to connect to MT5
 def connect_mt5():
@@ -24,34 +38,34 @@ def connect_mt5():
 
 # Function to fetch historical data
 def fetch_data():
-    data = yf.download('EURUSD=X', start='2025-01-01', end='2025-03-01', interval='1d')
+    # Served from the local bar store, so the loop doesn't re-download every minute
+    data = barstore.download('EURUSD=X', '2025-01-01', '2025-03-01', interval='1d')
     return data
 
 # Function to preprocess data and make predictions
 def predict_price(data):
-    for lag in range(1, 6):
-        data[f'lag_{lag}'] = data['Close'].shift(lag)
-    
-    data['SMA_10'] = data['Close'].rolling(window=10).mean()
-    data['SMA_30'] = data['Close'].rolling(window=30).mean()
-    data = data.dropna()
-
-    X = data[[f'lag_{lag}' for lag in range(1, 6)] + ['SMA_10', 'SMA_30']]
-    y = data['Close']
+    X, y = build_features(data, lags=5, sma_windows=(10, 30))
 
     model = LinearRegression()
     model.fit(X, y)
 
     return model.predict(X.iloc[-1].values.reshape(1, -1))[0]
 
+# Function to make predictions with the streaming model (only new bars are ingested)
+predictor = OnlinePricePredictor()
+
+def predict_price_online(data):
+    predictor.update(data)
+    return predictor.predict()
+
 # Function to place a trade
 def place_trade(predicted_price):
     current_price = mt5.symbol_info_tick(symbol).ask
-    order_type = mt5.ORDER_BUY if predicted_price > current_price else mt5.ORDER_SELL
+    order_type = mt5.ORDER_TYPE_BUY if predicted_price > current_price else mt5.ORDER_TYPE_SELL
 
-    price = current_price if order_type == mt5.ORDER_BUY else current_price
-    sl = price - stop_loss * mt5.symbol_info(symbol).point if order_type == mt5.ORDER_BUY else price + stop_loss * mt5.symbol_info(symbol).point
-    tp = price + take_profit * mt5.symbol_info(symbol).point if order_type == mt5.ORDER_BUY else price - take_profit * mt5.symbol_info(symbol).point
+    price = current_price if order_type == mt5.ORDER_TYPE_BUY else current_price
+    sl = price - stop_loss * mt5.symbol_info(symbol).point if order_type == mt5.ORDER_TYPE_BUY else price + stop_loss * mt5.symbol_info(symbol).point
+    tp = price + take_profit * mt5.symbol_info(symbol).point if order_type == mt5.ORDER_TYPE_BUY else price - take_profit * mt5.symbol_info(symbol).point
 
     order = {
         "action": mt5.TRADE_ACTION_DEAL,
@@ -68,24 +82,29 @@ def place_trade(predicted_price):
         "type_filling": mt5.ORDER_FILLING_IOC,
     }
 
+    journal.signal(symbol, "online" if online_mode else "regression",
+                   "buy" if order_type == mt5.ORDER_TYPE_BUY else "sell",
+                   {"predicted": predicted_price, "price": current_price})
     result = mt5.order_send(order)
+    journal.order(order, result)
     if result.retcode == mt5.TRADE_RETCODE_DONE:
-        trade_history.append({"type": order_type, "price": price, "tp": tp, "sl": sl})
         print("Order placed successfully.")
     else:
         print(f"Order failed: {result.retcode}")
 
 # Function to update equity curve
 def update_equity():
-    balance = mt5.account_info().balance
-    equity_curve.append(balance)
+    book.refresh()
+    journal.equity(mt5.account_info())
 
 # Function to visualize performance
 def visualize_performance():
+    journal.flush()
+    curve = journal.equity_curve(bot="fxbot")
     plt.figure(figsize=(12, 6))
-    plt.plot(equity_curve, label='Equity Curve', color='blue')
+    plt.plot(pd.to_datetime(curve['time'], unit='s'), curve['balance'], label='Equity Curve', color='blue')
     plt.title('Trading Bot Performance')
-    plt.xlabel('Time (in iterations)')
+    plt.xlabel('Time')
     plt.ylabel('Equity')
     plt.legend()
     plt.grid()
@@ -94,14 +113,24 @@ def visualize_performance():
 # Main function
 def main():
     connect_mt5()
-    while True:
-        data = fetch_data()
-        predicted_price = predict_price(data)
-        place_trade(predicted_price)
-        update_equity()
-        time.sleep(60)  # Wait for 1 minute before next prediction
-        if len(equity_curve) >= 100:  # Visualize after 100 iterations
-            visualize_performance()
+    iterations = 0
+    try:
+        while True:
+            data = fetch_data()
+            predicted_price = predict_price_online(data) if online_mode else predict_price(data)
+            if predicted_price is None:
+                print("Not enough history for a prediction yet")
+            else:
+                place_trade(predicted_price)
+            update_equity()
+            iterations += 1
+            clock.sleep(60)  # Wait for 1 minute before next prediction
+            if iterations >= 100:  # Visualize after 100 iterations
+                visualize_performance()
+    except ReplayFinished:
+        print("Replay finished")
+    finally:
+        journal.close()  # Commit the last batch
 
 if __name__ == "__main__":
     main()
@@ -4,10 +4,14 @@ from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
 import matplotlib.pyplot as plt
+from features import build_features
+from walkforward import evaluate
+from loader import load_csv
 
 # Step 1: Data Collection from CSV
 def fetch_data(csv_file):
-    data = pd.read_csv(csv_file, parse_dates=['Date'], index_col='Date')
+    # Streamed in chunks and cached as NumPy files, so later runs load near-instantly
+    data = load_csv(csv_file, date_column='Date')
     print("Data Loaded:")
     print(data.head())  # Show the first few rows of the DataFrame
     print(f"Data Shape: {data.shape}")  # Show the shape of the DataFrame
@@ -15,25 +19,17 @@ def fetch_data(csv_file):
 
 # Step 2: Data Preprocessing
 def preprocess_data(data):
-    # Create lagged features
-    for lag in range(1, 6):
-        data[f'lag_{lag}'] = data['Close'].shift(lag)
-
-    # Drop NaN values
-    data = data.dropna()
+    # Create lagged features (shared pipeline, raises ValueError if nothing is left)
+    X, y = build_features(data, lags=5)
 
     # Check the shape after preprocessing
-    print(f"Data Shape after Preprocessing: {data.shape}")
-
-    if data.empty:
-        raise ValueError("The DataFrame is empty after preprocessing.")
-
-    # Define features and target
-    X = data[[f'lag_{lag}' for lag in range(1, 6)]]
-    y = data['Close']
+    print(f"Data Shape after Preprocessing: {X.shape}")
     
     return X, y
 
+# Walk-forward folds evaluated (in parallel) before the single split below; 0 to skip
+walk_forward_folds = 10
+
 # Step 3: Train-Test Split
 def train_test_split_data(X, y):
     return train_test_split(X, y, test_size=0.2, shuffle=False)
@@ -82,6 +78,11 @@ def main():
         return
 
     X, y = preprocess_data(data)
+
+    # Walk-forward evaluation: per-fold metrics and timing (fewer folds if the data is short)
+    if walk_forward_folds:
+        evaluate(X, y, n_folds=walk_forward_folds)
+
     X_train, X_test, y_train, y_test = train_test_split_data(X, y)
     model = train_model(X_train, y_train)
     
@@ -1,35 +1,28 @@
-import yfinance as yf
-
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
 import matplotlib.pyplot as plt
-import ta  # Technical Analysis library
+import os
+import sys
+
+# The bar store lives with the MT5 bots in ../pybots
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pybots"))
+import barstore
+from features import build_features
+from walkforward import evaluate
 
 # Step 1: Data Collection
 def fetch_data():
-    data = yf.download('EURUSD=X', start='2020-01-01', end='2023-01-01', interval='1d')
+    data = barstore.download('EURUSD=X', '2020-01-01', '2023-01-01', interval='1d')
     return data
 
 # Step 2: Data Preprocessing
 def preprocess_data(data):
-    # Create lagged features
-    for lag in range(1, 6):
-        data[f'lag_{lag}'] = data['Close'].shift(lag)
-
-    # Create additional features
-    data['SMA_10'] = data['Close'].rolling(window=10).mean()
-    data['SMA_30'] = data['Close'].rolling(window=30).mean()
-    data['RSI'] = ta.momentum.RSIIndicator(data['Close'], window=14).rsi()
+    # Lagged features plus SMA_10, SMA_30 and RSI from the shared pipeline
+    return build_features(data, lags=5, sma_windows=(10, 30), rsi_window=14)
 
-    # Drop NaN values
-    data = data.dropna()
-
-    # Define features and target
-    X = data[[f'lag_{lag}' for lag in range(1, 6)] + ['SMA_10', 'SMA_30', 'RSI']]
-    y = data['Close']
-    
-    return X, y
+# Walk-forward folds evaluated (in parallel) before the single split below; 0 to skip
+walk_forward_folds = 10
 
 # Step 3: Train-Test Split
 def train_test_split_data(X, y):
@@ -63,6 +56,11 @@ def plot_results(y_test, y_pred):
 def main():
     data = fetch_data()
     X, y = preprocess_data(data)
+
+    # Walk-forward evaluation: per-fold metrics and timing (fewer folds if the data is short)
+    if walk_forward_folds:
+        evaluate(X, y, n_folds=walk_forward_folds)
+
     X_train, X_test, y_train, y_test = train_test_split_data(X, y)
     model = train_model(X_train, y_train)
     y_pred = evaluate_model(model, X_test, y_test)
@@ -1,47 +1,123 @@
-import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
 import matplotlib.pyplot as plt
+import threading
+import queue
 from tkinter import Tk, Button, Label, filedialog, messagebox
-
-# Function to load CSV file
-def load_csv():
-    file_path = filedialog.askopenfilename(
-        filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
-    )
-    if file_path:
+from tkinter import ttk
+from features import build_features
+from loader import load_csv as load_price_csv
+
+class Cancelled(Exception):
+    """Raised inside the worker when the user presses Cancel"""
+
+class PredictionApp:
+    """Tk front end; loading and training run in a worker thread so the window stays responsive"""
+    def __init__(self, window):
+        self.window = window
+        self.worker = None
+        self.cancel_event = threading.Event()
+        self.results = queue.Queue()  # Messages from the worker, handled on the Tk thread
+
+        label = Label(window, text="Upload your CSV file:")
+        label.pack(pady=20)
+
+        self.upload_button = Button(window, text="Upload CSV", command=self.load_csv)
+        self.upload_button.pack(pady=10)
+
+        self.progress = ttk.Progressbar(window, mode="indeterminate", length=300)
+        self.progress.pack(pady=5)
+        self.status = Label(window, text="")
+        self.status.pack()
+
+        self.cancel_button = Button(window, text="Cancel", command=self.cancel, state="disabled")
+        self.cancel_button.pack(pady=5)
+
+    # Function to load CSV file
+    def load_csv(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        self.cancel_event.clear()
+        self.upload_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.progress.start(10)
+        self.worker = threading.Thread(target=self.run, args=(file_path,), daemon=True)
+        self.worker.start()
+        self.window.after(100, self.poll)
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.status.config(text="Cancelling...")
+
+    def report(self, text):
+        """Send a progress message to the Tk thread, or stop if the user cancelled"""
+        if self.cancel_event.is_set():
+            raise Cancelled()
+        self.results.put(("status", text))
+
+    def run(self, file_path):
+        """Worker thread: load, preprocess and train, then hand the result to the Tk thread"""
         try:
-            data = pd.read_csv(file_path, parse_dates=['Date'], index_col='Date')
-            process_data(data)
+            self.report("Loading data...")
+            # Streamed in chunks and cached as NumPy files, so reloading the same file is instant
+            data = load_price_csv(file_path, date_column='Date',
+                                  on_chunk=lambda rows: self.report(f"Loading data... {rows:,} rows"))
+            y_test, y_pred = process_data(data, self.report)
+            self.results.put(("done", (y_test, y_pred)))
+        except Cancelled:
+            self.results.put(("cancelled", None))
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load data: {e}")
-
-# Function to preprocess data and train model
-def process_data(data):
-    try:
-        # Create lagged features
-        for lag in range(1, 6):
-            data[f'lag_{lag}'] = data['Close'].shift(lag)
-
-        data = data.dropna()
-
-        if data.empty:
-            raise ValueError("The DataFrame is empty after preprocessing.")
+            self.results.put(("error", f"Failed to process data: {e}"))
 
-        X = data[[f'lag_{lag}' for lag in range(1, 6)]]
-        y = data['Close']
-
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
-        model = train_model(X_train, y_train)
-        y_pred = evaluate_model(model, X_test, y_test)
-
-        # Plot results
-        plot_results(y_test, y_pred)
+    def poll(self):
+        """Apply worker messages on the Tk thread until the job finishes"""
+        try:
+            while True:
+                kind, payload = self.results.get_nowait()
+                if kind == "status":
+                    self.status.config(text=payload)
+                    continue
+                self.finish()
+                if kind == "done":
+                    self.status.config(text="Done")
+                    # Plot results (matplotlib must run on the Tk thread)
+                    plot_results(*payload)
+                elif kind == "cancelled":
+                    self.status.config(text="Cancelled")
+                else:
+                    self.status.config(text="Failed")
+                    messagebox.showerror("Error", payload)
+                return
+        except queue.Empty:
+            pass
+        self.window.after(100, self.poll)
+
+    def finish(self):
+        self.progress.stop()
+        self.upload_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
 
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+# Function to preprocess data and train model
+def process_data(data, report=print):
+    """
+    Build features, train and evaluate; returns (y_test, y_pred).
+    `report` receives progress messages and may raise to cancel.
+    """
+    # Create lagged features (shared pipeline, raises ValueError if nothing is left)
+    report("Building features...")
+    X, y = build_features(data, lags=5)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
+    report("Training model...")
+    model = train_model(X_train, y_train)
+    report("Evaluating model...")
+    y_pred = evaluate_model(model, X_test, y_test)
+    return y_test, y_pred
 
 # Function to train the model
 def train_model(X_train, y_train):
@@ -84,13 +160,9 @@ def plot_results(y_test, y_pred):
 def setup_window():
     window = Tk()
     window.title("EUR/USD Prediction App")
-    window.geometry("400x200")
-
-    label = Label(window, text="Upload your CSV file:")
-    label.pack(pady=20)
+    window.geometry("400x260")
 
-    upload_button = Button(window, text="Upload CSV", command=load_csv)
-    upload_button.pack(pady=10)
+    PredictionApp(window)
 
     window.mainloop()
 
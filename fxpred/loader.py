@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    guess_datetime_format = None
+
+# Binary copies of loaded CSVs live under <repo>/data/cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache")
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+
+def cache_path(csv_file, options, cache_dir):
+    key = json.dumps([os.path.abspath(csv_file), options], sort_keys=True)
+    return os.path.join(cache_dir, hashlib.blake2b(key.encode(), digest_size=8).hexdigest())
+
+def source_stamp(csv_file):
+    st = os.stat(csv_file)
+    return [st.st_size, st.st_mtime_ns]
+
+def read_cache(path, csv_file, date_column):
+    """Memory-map a cached load if it exists and the CSV has not changed since"""
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    if meta["source"] != source_stamp(csv_file):
+        return None
+    index = pd.DatetimeIndex(np.load(os.path.join(path, "index.npy")), name=date_column)
+    columns = {col: np.load(os.path.join(path, f"{i}.npy"), mmap_mode="r") for i, col in enumerate(meta["columns"])}
+    return pd.DataFrame(columns, index=index, copy=False)
+
+def write_cache(path, csv_file, data):
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "index.npy"), data.index.to_numpy(dtype="datetime64[ns]"))
+    for i, col in enumerate(data.columns):
+        np.save(os.path.join(path, f"{i}.npy"), data[col].to_numpy())
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"source": source_stamp(csv_file), "columns": list(data.columns)}, f)
+
+def resample_chunk(chunk, timeframe):
+    """OHLC(V) bars per `timeframe` bucket; other numeric columns keep their last value"""
+    buckets = chunk.index.floor(timeframe)
+    grouped = chunk.groupby(buckets, sort=False)
+    agg = {}
+    for col in chunk.columns:
+        if col == "Open":
+            agg[col] = "first"
+        elif col == "High":
+            agg[col] = "max"
+        elif col == "Low":
+            agg[col] = "min"
+        elif col == "Volume":
+            agg[col] = "sum"
+        else:
+            agg[col] = "last"
+    return grouped.agg(agg)
+
+# Function to load a (possibly very large) CSV with bounded memory
+def load_csv(csv_file, date_column="Date", float32=False, timeframe=None, date_format=None,
+             chunksize=1_000_000, cache_dir=DEFAULT_CACHE_DIR, on_chunk=None):
+    """
+    Stream a price CSV in chunks with explicit dtypes and fast datetime parsing.
+    :param float32: Store prices as float32 (half the memory of float64)
+    :param timeframe: Pandas offset such as "1min", "15min" or "1h"; when set, ticks
+                      or small bars are downsampled chunk by chunk so the full-resolution
+                      data is never held in memory. Tick files with a single price
+                      column (Close, Price or Bid) become OHLC bars.
+    :param date_format: strftime format of the date column; guessed from the first row if omitted
+    :param cache_dir: The result is saved here as NumPy files and memory-mapped on later
+                      loads of the unchanged CSV (None disables the cache)
+    :param on_chunk: Called with the number of rows read so far after every chunk;
+                     it may raise to abort the load (e.g. when the user cancels)
+    :return: DataFrame indexed by date
+    """
+    dtype = np.float32 if float32 else np.float64
+    options = {"date_column": date_column, "float32": float32, "timeframe": timeframe,
+               "date_format": date_format}
+    path = None
+    if cache_dir is not None:
+        path = cache_path(csv_file, options, cache_dir)
+        cached = read_cache(path, csv_file, date_column)
+        if cached is not None:
+            return cached
+
+    header = pd.read_csv(csv_file, nrows=1)
+    if date_column not in header.columns:
+        raise ValueError(f"Missing '{date_column}' column")
+    value_columns = [col for col in header.columns if col != date_column]
+    # Volume stays float64 so fractional or blank volumes parse (NaN) instead of failing
+    dtypes = {col: (np.float64 if col == "Volume" else dtype) for col in value_columns}
+    if date_format is None and guess_datetime_format is not None:
+        date_format = guess_datetime_format(str(header[date_column].iloc[0]))
+
+    parts = []
+    carry = None  # Partial bar for the last, possibly incomplete bucket of the previous chunk
+    rows = 0
+    reader = pd.read_csv(csv_file, dtype={date_column: str, **dtypes}, chunksize=chunksize)
+    for chunk in reader:
+        rows += len(chunk)
+        if on_chunk is not None:
+            on_chunk(rows)
+        chunk.index = pd.DatetimeIndex(pd.to_datetime(chunk.pop(date_column), format=date_format),
+                                       name=date_column)
+        if timeframe is None:
+            parts.append(chunk)
+            continue
+
+        if "Open" not in chunk.columns:
+            price = next((c for c in ("Close", "Price", "Bid") if c in chunk.columns), None)
+            if price is None:
+                raise ValueError("No price column to build bars from")
+            prices = chunk.pop(price)
+            for col in PRICE_COLUMNS:
+                chunk[col] = prices
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+        last_bucket = chunk.index[-1].floor(timeframe)
+        tail = chunk.index.floor(timeframe) == last_bucket
+        # The aggregations are associative, so the open bucket is kept as one partial bar
+        carry = resample_chunk(chunk[tail], timeframe)
+        if not tail.all():
+            parts.append(resample_chunk(chunk[~tail], timeframe))
+    if carry is not None and len(carry):
+        parts.append(carry)
+
+    if not parts:
+        data = pd.DataFrame(columns=value_columns, index=pd.DatetimeIndex([], name=date_column))
+    else:
+        data = pd.concat(parts)
+    data.index.name = date_column
+    data = data[[c for c in PRICE_COLUMNS if c in data.columns] +
+                [c for c in data.columns if c not in PRICE_COLUMNS]]
+
+    if path is not None and len(data):
+        write_cache(path, csv_file, data)
+    return data
@@ -0,0 +1,105 @@
+from collections import deque
+import numpy as np
+
+
+class OnlineLinearRegression:
+    """
+    Linear regression with intercept fitted one observation at a time.
+    Keeps running means and centred cross-products (Welford-style), so memory and
+    time per update are O(features^2) no matter how much history has been seen,
+    and the solution matches sklearn's LinearRegression on the same rows.
+    :param decay: Forgetting factor in (0, 1]; 1.0 weights all history equally,
+                  lower values let the fit follow recent behaviour
+    """
+    def __init__(self, n_features, decay=1.0):
+        self.decay = decay
+        self.weight = 0.0
+        self.mean_x = np.zeros(n_features)
+        self.mean_y = 0.0
+        self.cxx = np.zeros((n_features, n_features))
+        self.cxy = np.zeros(n_features)
+        self.coef_ = None
+        self.intercept_ = None
+
+    def partial_fit(self, x, y):
+        """Add one observation (x: feature vector, y: target)"""
+        x = np.asarray(x, dtype=float)
+        self.weight = self.decay * self.weight + 1.0
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.weight
+        self.mean_y += dy / self.weight
+        self.cxx *= self.decay
+        self.cxy *= self.decay
+        self.cxx += np.outer(dx, x - self.mean_x)
+        self.cxy += dx * (y - self.mean_y)
+        self.coef_ = None  # Solve lazily on the next predict
+        return self
+
+    def solve(self):
+        # lstsq gives the minimum-norm solution when features are collinear, like sklearn
+        self.coef_ = np.linalg.lstsq(self.cxx, self.cxy, rcond=None)[0]
+        self.intercept_ = self.mean_y - self.mean_x @ self.coef_
+
+    def predict(self, x):
+        if self.coef_ is None:
+            self.solve()
+        return float(np.asarray(x, dtype=float) @ self.coef_ + self.intercept_)
+
+
+class OnlinePricePredictor:
+    """
+    Streaming version of fxbot.predict_price: lag_1..lag_5, SMA_10 and SMA_30 of
+    Close are maintained incrementally and fed to an OnlineLinearRegression one
+    bar at a time.
+    """
+    def __init__(self, lags=5, short_window=10, long_window=30, decay=1.0):
+        self.lags = lags
+        self.short_window = short_window
+        self.long_window = long_window
+        self.closes = deque(maxlen=max(long_window, lags + 1))
+        self.short_sum = 0.0
+        self.long_sum = 0.0
+        self.model = OnlineLinearRegression(lags + 2, decay)
+        self.last_features = None
+        self.last_index = None
+
+    def features(self):
+        """Feature row for the latest close, or None until enough history is seen"""
+        closes = self.closes
+        if len(closes) < self.long_window or len(closes) < self.lags + 1:
+            return None
+        lags = [closes[-1 - lag] for lag in range(1, self.lags + 1)]
+        return lags + [self.short_sum / self.short_window, self.long_sum / self.long_window]
+
+    def add_close(self, close):
+        """Ingest one new close and train on it"""
+        closes = self.closes
+        if len(closes) >= self.short_window:
+            self.short_sum -= closes[-self.short_window]
+        if len(closes) >= self.long_window:
+            self.long_sum -= closes[-self.long_window]
+        closes.append(close)
+        self.short_sum += close
+        self.long_sum += close
+
+        x = self.features()
+        if x is not None:
+            self.model.partial_fit(x, close)
+            self.last_features = x
+
+    def update(self, data):
+        """Ingest only the rows of `data` (indexed by date, with a Close column) not seen yet"""
+        close = data['Close']
+        if self.last_index is not None:
+            close = close.iloc[close.index.searchsorted(self.last_index, side='right'):]
+        for value in close.dropna().to_numpy(dtype=float):
+            self.add_close(value)
+        if len(close):
+            self.last_index = close.index[-1]
+
+    def predict(self):
+        """Model prediction for the latest bar, like predict_price's last row"""
+        if self.last_features is None:
+            return None
+        return self.model.predict(self.last_features)
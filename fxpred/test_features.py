@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import ta
+from features import build_features, rolling_mean
+
+
+def baseline_features(data):
+    """The fxpred23 preprocessing before the shared pipeline: shift/rolling/ta, then dropna()"""
+    data = data.copy()
+    for lag in range(1, 6):
+        data[f'lag_{lag}'] = data['Close'].shift(lag)
+    data['SMA_10'] = data['Close'].rolling(window=10).mean()
+    data['SMA_30'] = data['Close'].rolling(window=30).mean()
+    data['RSI'] = ta.momentum.RSIIndicator(data['Close'], window=14).rsi()
+    data = data.dropna()
+    return data[[f'lag_{lag}' for lag in range(1, 6)] + ['SMA_10', 'SMA_30', 'RSI']], data['Close']
+
+
+def closes(n=200, gaps=(), seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    close[list(gaps)] = np.nan
+    return pd.DataFrame({'Close': close}, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+def test_rolling_mean_matches_pandas_across_a_gap():
+    values = closes(gaps=(50,))['Close'].to_numpy()
+    expected = pd.Series(values).rolling(10).mean().to_numpy()
+    np.testing.assert_allclose(rolling_mean(values, 10), expected, equal_nan=True)
+
+
+def test_sma_features_keep_the_rows_after_a_gap():
+    data = closes(gaps=(50,))
+    X, y = build_features(data, lags=5, sma_windows=(10, 30))
+    expected = data.assign(**{f'lag_{lag}': data['Close'].shift(lag) for lag in range(1, 6)},
+                           SMA_10=data['Close'].rolling(10).mean(),
+                           SMA_30=data['Close'].rolling(30).mean()).dropna()
+    assert X.index.equals(expected.index)
+    np.testing.assert_allclose(X[['SMA_10', 'SMA_30']], expected[['SMA_10', 'SMA_30']])
+    np.testing.assert_allclose(y, expected['Close'])
+
+
+def test_full_features_match_the_baseline_without_gaps():
+    data = closes()
+    X, y = build_features(data, lags=5, sma_windows=(10, 30), rsi_window=14)
+    X_expected, y_expected = baseline_features(data)
+    assert X.index.equals(X_expected.index)
+    np.testing.assert_allclose(X, X_expected)
+    np.testing.assert_allclose(y, y_expected)
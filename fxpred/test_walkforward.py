@@ -0,0 +1,25 @@
+import numpy as np
+from walkforward import evaluate, fit_folds, walk_forward_splits
+
+
+def test_fit_folds_keeps_the_requested_count_when_it_fits():
+    assert fit_folds(1000, 10) == 10
+
+
+def test_fit_folds_shrinks_to_what_the_rows_allow():
+    folds = fit_folds(5, 10)
+    assert folds == 2
+    assert all(test_end - test_start >= 2 for _, _, test_start, test_end in walk_forward_splits(5, folds))
+
+
+def test_evaluate_skips_when_no_fold_fits(capsys):
+    X, y = np.arange(4.0).reshape(2, 2), np.arange(2.0)
+    assert evaluate(X, y, n_folds=10) is None
+    assert "skipped" in capsys.readouterr().out
+
+
+def test_evaluate_reduces_folds_on_short_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(12, 2))
+    results = evaluate(X, X @ [1.0, 2.0], n_folds=10, workers=1)
+    assert len(results) == fit_folds(12, 10) < 10
@@ -0,0 +1,132 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
+# Worker-side views of the shared feature matrix and target, set by init_worker
+_shm = None
+_X = None
+_y = None
+
+def init_worker(shm_name, shape):
+    """Map the shared block: X in the first columns, y in the last one"""
+    global _shm, _X, _y
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _X, _y = block[:, :-1], block[:, -1]
+
+def walk_forward_splits(n, n_folds=10, min_train=None, expanding=True):
+    """
+    Row ranges for walk-forward evaluation: each fold trains on data before its
+    test block and is scored on the block. Expanding windows always start at 0,
+    rolling windows keep the training length fixed at `min_train`.
+    :return: list of (train_start, train_end, test_start, test_end)
+    """
+    if min_train is None:
+        min_train = n // (n_folds + 1)
+    test_size = (n - min_train) // n_folds
+    if min_train <= 0 or test_size <= 0:
+        raise ValueError("Not enough rows for the requested folds")
+    splits = []
+    for fold in range(n_folds):
+        test_start = min_train + fold * test_size
+        test_end = n if fold == n_folds - 1 else test_start + test_size
+        train_start = 0 if expanding else test_start - min_train
+        splits.append((train_start, test_start, test_start, test_end))
+    return splits
+
+def fit_folds(n, n_folds, min_train=None, min_test=2):
+    """
+    Largest fold count up to `n_folds` that walk_forward_splits can make from n
+    rows with at least `min_test` test rows per fold (R^2 needs two), 0 if none.
+    """
+    for folds in range(n_folds, 0, -1):
+        train = n // (folds + 1) if min_train is None else min_train
+        if train > 0 and (n - train) // folds >= min_test:
+            return folds
+    return 0
+
+def run_fold(fold, split, model_factory, X=None, y=None):
+    """Train and score one fold on views of the feature matrix (no copies)"""
+    X = _X if X is None else X
+    y = _y if y is None else y
+    train_start, train_end, test_start, test_end = split
+    model = model_factory()
+
+    start = time.perf_counter()
+    model.fit(X[train_start:train_end], y[train_start:train_end])
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X[test_start:test_end])
+    predict_s = time.perf_counter() - start
+
+    y_test = y[test_start:test_end]
+    return {
+        "fold": fold,
+        "train_rows": train_end - train_start,
+        "test_rows": test_end - test_start,
+        "mse": mean_squared_error(y_test, y_pred),
+        "mae": mean_absolute_error(y_test, y_pred),
+        "r2": r2_score(y_test, y_pred),
+        "fit_s": fit_s,
+        "predict_s": predict_s,
+    }
+
+def walk_forward(X, y, n_folds=10, min_train=None, expanding=True,
+                 model_factory=LinearRegression, workers=None):
+    """
+    Evaluate a model with walk-forward folds trained in parallel.
+    X and y are written once into shared memory; every worker maps the same block
+    and trains on slices of it. With workers=1 folds run in-process on views of X.
+    `model_factory` must be picklable (a class or module-level function).
+    :return: DataFrame with one row of metrics and timings per fold
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    splits = walk_forward_splits(len(y), n_folds, min_train, expanding)
+    workers = min(workers or os.cpu_count() or 1, len(splits))
+
+    if workers == 1:
+        rows = [run_fold(i, split, model_factory, X, y) for i, split in enumerate(splits)]
+    else:
+        shape = (X.shape[0], X.shape[1] + 1)
+        shm = shared_memory.SharedMemory(create=True, size=8 * shape[0] * shape[1])
+        try:
+            block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            block[:, :-1] = X
+            block[:, -1] = y
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                     initargs=(shm.name, shape)) as pool:
+                futures = [pool.submit(run_fold, i, split, model_factory) for i, split in enumerate(splits)]
+                rows = [future.result() for future in futures]
+            del block
+        finally:
+            shm.close()
+            shm.unlink()
+    return pd.DataFrame(rows)
+
+def evaluate(X, y, n_folds=10, **kwargs):
+    """
+    walk_forward and print_report with the fold count reduced to what the data
+    allows; skipped with a message when there are too few rows even for one fold.
+    """
+    folds = fit_folds(len(y), n_folds, kwargs.get("min_train"))
+    if folds == 0:
+        print(f"Walk-forward skipped: {len(y)} rows are too few for a single fold")
+        return None
+    if folds < n_folds:
+        print(f"Walk-forward with {folds} folds instead of {n_folds}: only {len(y)} rows")
+    results = walk_forward(X, y, n_folds=folds, **kwargs)
+    print_report(results)
+    return results
+
+def print_report(results):
+    """Per-fold metrics followed by mean and standard deviation across folds"""
+    print(results.to_string(index=False))
+    summary = results[["mse", "mae", "r2", "fit_s"]].agg(["mean", "std"])
+    print(summary.to_string())
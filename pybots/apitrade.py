@@ -1,13 +1,13 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
+import barstore
 import backtrader as bt
-import requests
+from brokerclient import BrokerClient
 import matplotlib.pyplot as plt
 
 # Step 1: Fetch historical data
 def fetch_data(symbol, start_date, end_date):
-    data = yf.download(symbol, start=start_date, end=end_date)
+    data = barstore.download(symbol, start_date, end_date)
     return data
 
 # Step 2: Define the trading strategy
@@ -30,22 +30,22 @@ class MovingAverageCrossover(bt.Strategy):
             if self.position:
                 self.sell()
 
+# Broker clients keep their connection pool between orders, one per set of credentials
+clients = {}
+
+def get_client(api_key, token):
+    if (api_key, token) not in clients:
+        clients[(api_key, token)] = BrokerClient(api_key, token)
+    return clients[(api_key, token)]
+
 # Step 3: Function to place an order
-def place_order(api_key, token, symbol, order_type='BUY', volume=1):
-    url = "https://api.yourbroker.com/v1/orders"
-    headers = {
-        'X-IG-API-KEY': api_key,
-        'Authorization': f"Bearer {token}",
-        'Content-Type': 'application/json'
-    }
-    payload = {
-        "epic": symbol,
-        "size": volume,
-        "direction": order_type,
-        "orderType": "MARKET"
-    }
-    response = requests.post(url, headers=headers, json=payload)
-    return response.json()
+def place_order(api_key, token, symbol, order_type='BUY', volume=1, idempotency_key=None):
+    # Pass the same idempotency_key when resending an order so it cannot be filled twice
+    return get_client(api_key, token).place_order(symbol, order_type, volume, idempotency_key)
+
+# Function to send orders for several symbols in parallel
+def place_orders(api_key, token, orders):
+    return get_client(api_key, token).place_orders(orders)
 
 # Main function
 def main():
@@ -0,0 +1,257 @@
+import argparse
+import heapq
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from risk import risk_lots
+from strategies import FAST_PERIOD, SLOW_PERIOD, CHANNEL_PERIOD, STRATEGIES, new_engine, strategy_rules
+
+# Same as MT5TradingBot: the fixed SL/TP from place_order (in points)
+SL_POINTS = 100
+TP_POINTS = 200
+
+# Function to load OHLC bars from CSV or Parquet
+def load_bars(path):
+    """
+    Load bars with time/open/high/low/close columns (any case; Date/Datetime also
+    accepted for time) and return them as a DataFrame sorted by time.
+    """
+    if str(path).lower().endswith((".parquet", ".pq")):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    for name in ("time", "datetime", "date"):
+        if name in df.columns:
+            if name != "time":
+                df = df.rename(columns={name: "time"})
+            break
+    else:
+        raise ValueError("No time/date column found")
+    if not pd.api.types.is_numeric_dtype(df["time"]):
+        df["time"] = pd.to_datetime(df["time"]).astype("int64") // 10**9
+    df = df.sort_values("time").reset_index(drop=True)
+    return df[["time", "open", "high", "low", "close"]]
+
+def rolling_mean(x, period):
+    """Rolling mean via cumulative sums, NaN until the window is full"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        csum = np.cumsum(np.insert(x, 0, 0.0))
+        out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+def rolling_extreme(x, period, func):
+    """Rolling max/min (func = np.max or np.min), NaN until the window is full"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        out[period - 1:] = func(sliding_window_view(x, period), axis=1)
+    return out
+
+def previous(x):
+    """x shifted one bar later, NaN on the first bar"""
+    out = np.roll(x, 1)
+    out[:1] = np.nan
+    return out
+
+def strategy_signals(strategy, high, low, close, point):
+    """
+    Vectorized MT5TradingBot signals: the indicator arrays of every bar go through
+    strategies.strategy_rules in one call. Bars before the live bot's
+    IndicatorEngine is ready never signal, so the signals match the bot bar for bar.
+    Returns (buy, sell) boolean arrays.
+    """
+    fast = rolling_mean(close, FAST_PERIOD)
+    slow = rolling_mean(close, SLOW_PERIOD)
+    with np.errstate(invalid="ignore"):
+        buy, sell = strategy_rules(strategy, point, close, fast, slow, previous(fast), previous(slow),
+                                   rolling_extreme(high, CHANNEL_PERIOD, np.max),
+                                   rolling_extreme(low, CHANNEL_PERIOD, np.min))
+    warmup = new_engine().warmup  # The engine is ready once it has seen more bars than this
+    buy[:warmup] = False
+    sell[:warmup] = False
+    return buy, sell
+
+def first_hit(high, low, start, sl, tp, is_buy, spread, chunk=256):
+    """
+    Find the first bar at or after `start` where the SL or TP is touched.
+    Bars are bid prices; sells are closed at the ask (bid + spread).
+    If both levels are inside the same bar the stop-loss is assumed first.
+    Returns (bar index, exit price, reason) or (None, None, None).
+    """
+    n = len(high)
+    i = start
+    while i < n:
+        j = min(n, i + chunk)
+        if is_buy:
+            sl_hit = low[i:j] <= sl
+            tp_hit = high[i:j] >= tp
+        else:
+            sl_hit = high[i:j] + spread >= sl
+            tp_hit = low[i:j] + spread <= tp
+        any_hit = sl_hit | tp_hit
+        if any_hit.any():
+            k = int(np.argmax(any_hit))
+            if sl_hit[k]:
+                return i + k, sl, "sl"
+            return i + k, tp, "tp"
+        i = j
+        chunk *= 2  # Long trades are rare, widen the search window as we go
+    return None, None, None
+
+# Function to run a backtest
+def run_backtest(bars, strategy, risk_percent=0.01, balance=10000.0, point=0.01,
+                 spread_points=0, contract_size=1.0):
+    """
+    Backtest one MT5TradingBot strategy on closed bars.
+    Signals are evaluated on each closed bar and filled at the next bar's open
+    (ask for buys, bid for sells) with the fixed SL/TP from place_order. Like the
+    live bot, a new buy is skipped while a buy is open (same for sells), and the
+    lots risk `risk_percent` of the balance realized at entry time at the stop-loss,
+    rounded down to 0.01 lots (see risk.risk_lots).
+    :return: (trades DataFrame, equity Series indexed by bar time)
+    """
+    time_ = bars["time"].to_numpy()
+    open_ = bars["open"].to_numpy(dtype=float)
+    high = bars["high"].to_numpy(dtype=float)
+    low = bars["low"].to_numpy(dtype=float)
+    close = bars["close"].to_numpy(dtype=float)
+    n = len(close)
+    spread = spread_points * point
+
+    buy, sell = strategy_signals(strategy, high, low, close, point)
+    # The order goes out after the signal bar closes, so the last bar can't trade
+    valid = np.ones(n, dtype=bool)
+    valid[-1:] = False
+    signal_idx = {
+        True: np.flatnonzero(buy & valid),
+        False: np.flatnonzero(sell & valid),
+    }
+
+    trades = []
+    realized = balance
+    pending = []  # heap of (exit bar, profit) for trades not yet booked
+    # Per side, the first bar a new signal may fire on. The bot sees a position
+    # as closed once its exit bar has closed, so that bar may signal again.
+    busy_until = {True: 0, False: 0}
+    while True:
+        # Pick the earliest next signal on a side that is flat at that time
+        candidates = []
+        for is_buy in (True, False):
+            idx = signal_idx[is_buy]
+            pos = np.searchsorted(idx, busy_until[is_buy])
+            if pos < len(idx):
+                candidates.append((int(idx[pos]), is_buy))
+        if not candidates:
+            break
+        i, is_buy = min(candidates)
+
+        # Book every trade that closed before this signal
+        while pending and pending[0][0] <= i:
+            realized += heapq.heappop(pending)[1]
+
+        lots = float(risk_lots(realized, risk_percent, SL_POINTS * point, point, point * contract_size))
+        entry_bar = i + 1
+        if lots <= 0:
+            if not pending:
+                break  # Nothing left to book, so every later signal sizes to 0 as well
+            # The lot size only changes when a trade books its profit: skip both sides to then
+            for side in busy_until:
+                busy_until[side] = max(busy_until[side], pending[0][0])
+            continue
+        if is_buy:
+            entry = open_[entry_bar] + spread
+            sl = entry - SL_POINTS * point
+            tp = entry + TP_POINTS * point
+        else:
+            entry = open_[entry_bar]
+            sl = entry + SL_POINTS * point
+            tp = entry - TP_POINTS * point
+
+        exit_bar, exit_price, reason = first_hit(high, low, entry_bar, sl, tp, is_buy, spread)
+        if exit_bar is None:
+            # Still open at the end of the data, mark it to the last close
+            exit_bar = n - 1
+            exit_price = close[-1] if is_buy else close[-1] + spread
+            reason = "open"
+        direction = 1 if is_buy else -1
+        profit = direction * (exit_price - entry) * lots * contract_size
+
+        trades.append((time_[i], time_[entry_bar], time_[exit_bar], "buy" if is_buy else "sell",
+                       lots, entry, sl, tp, exit_price, reason, profit, entry_bar, exit_bar))
+        heapq.heappush(pending, (exit_bar, profit))
+        busy_until[is_buy] = exit_bar
+
+    columns = ["signal_time", "entry_time", "exit_time", "type", "lots", "entry", "sl", "tp",
+               "exit", "reason", "profit", "entry_bar", "exit_bar"]
+    trades = pd.DataFrame(trades, columns=columns)
+    equity = equity_curve(trades, close, spread, balance, contract_size)
+    return trades, pd.Series(equity, index=pd.to_datetime(time_, unit="s"), name="equity")
+
+def equity_curve(trades, close, spread, balance, contract_size):
+    """Balance plus floating profit of open trades at every bar close, without a per-bar loop"""
+    n = len(close)
+    equity = np.full(n, float(balance))
+    if trades.empty:
+        return equity
+    entry_bar = trades["entry_bar"].to_numpy()
+    exit_bar = trades["exit_bar"].to_numpy()
+    direction = np.where(trades["type"].to_numpy() == "buy", 1.0, -1.0)
+    size = direction * trades["lots"].to_numpy() * contract_size
+    profit = trades["profit"].to_numpy()
+
+    # Realized profit is added from the exit bar onwards
+    realized = np.zeros(n + 1)
+    np.add.at(realized, exit_bar, profit)
+    equity += np.cumsum(realized[:n])
+
+    # While open (entry bar .. exit bar - 1), floating = size * (mark - entry)
+    open_size = np.zeros(n + 1)
+    open_cost = np.zeros(n + 1)
+    np.add.at(open_size, entry_bar, size)
+    np.add.at(open_size, exit_bar, -size)
+    np.add.at(open_cost, entry_bar, size * trades["entry"].to_numpy())
+    np.add.at(open_cost, exit_bar, -size * trades["entry"].to_numpy())
+    # Buys are marked at the bid (close), sells at the ask (close + spread)
+    short_size = np.zeros(n + 1)
+    np.add.at(short_size, entry_bar, np.where(direction < 0, size, 0.0))
+    np.add.at(short_size, exit_bar, -np.where(direction < 0, size, 0.0))
+    equity += (np.cumsum(open_size[:n]) * close + np.cumsum(short_size[:n]) * spread
+               - np.cumsum(open_cost[:n]))
+    return equity
+
+def summarize(trades, equity):
+    """Headline statistics for a backtest"""
+    peak = equity.cummax()
+    wins = trades["profit"] > 0
+    return {
+        "trades": len(trades),
+        "win_rate": float(wins.mean()) if len(trades) else 0.0,
+        "net_profit": float(trades["profit"].sum()),
+        "max_drawdown": float((peak - equity).max()),
+        "final_equity": float(equity.iloc[-1]),
+    }
+
+# Main function
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the MT5TradingBot strategies on stored bars")
+    parser.add_argument("bars", help="CSV or Parquet file with time/open/high/low/close columns")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=STRATEGIES[0])
+    parser.add_argument("--risk", type=float, default=1.0, help="Risk %% per trade")
+    parser.add_argument("--balance", type=float, default=10000.0)
+    parser.add_argument("--point", type=float, default=0.01, help="Symbol point size")
+    parser.add_argument("--spread", type=float, default=0, help="Spread in points")
+    parser.add_argument("--contract-size", type=float, default=1.0)
+    parser.add_argument("--trades-out", help="Write the trade list to this CSV")
+    args = parser.parse_args()
+
+    bars = load_bars(args.bars)
+    trades, equity = run_backtest(bars, args.strategy, args.risk / 100, args.balance,
+                                  args.point, args.spread, args.contract_size)
+    for key, value in summarize(trades, equity).items():
+        print(f"{key}: {value}")
+    if args.trades_out:
+        trades.to_csv(args.trades_out, index=False)
+
+if __name__ == "__main__":
+    main()
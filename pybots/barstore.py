@@ -0,0 +1,172 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Bars live under <repo>/data/bars unless BAR_STORE points somewhere else
+DEFAULT_ROOT = os.environ.get(
+    "BAR_STORE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "bars"),
+)
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class BarStore:
+    """
+    On-disk columnar OHLC store keyed by symbol and interval.
+    Each series is a directory holding one raw binary file per column (int64 epoch
+    seconds for time, float64 for prices and volume) plus meta.json recording the
+    date range already downloaded. Reads are memory-mapped; new data is appended,
+    so only missing ranges are ever downloaded.
+    """
+    def __init__(self, root=DEFAULT_ROOT, fetcher=None):
+        self.root = root
+        self.fetcher = fetcher or yfinance_fetch
+
+    def path(self, symbol, interval):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+        return os.path.join(self.root, f"{safe}_{interval}")
+
+    def load_meta(self, symbol, interval):
+        try:
+            with open(os.path.join(self.path(symbol, interval), "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_meta(self, symbol, interval, meta):
+        path = os.path.join(self.path(symbol, interval), "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def columns(self, symbol, interval):
+        """Memory-mapped column arrays (time first), or None if nothing is stored"""
+        meta = self.load_meta(symbol, interval)
+        if meta is None or meta["rows"] == 0:
+            return None
+        base = self.path(symbol, interval)
+        out = {"time": np.memmap(os.path.join(base, "time.bin"), dtype=np.int64, mode="r", shape=(meta["rows"],))}
+        for col in COLUMNS:
+            out[col] = np.memmap(os.path.join(base, f"{col}.bin"), dtype=np.float64, mode="r", shape=(meta["rows"],))
+        return out
+
+    def read(self, symbol, interval, start=None, end=None):
+        """Stored bars in [start, end) as a DataFrame indexed by Date, like yf.download"""
+        cols = self.columns(symbol, interval)
+        if cols is None:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+        times = cols["time"]
+        lo = 0 if start is None else np.searchsorted(times, to_epoch(start))
+        hi = len(times) if end is None else np.searchsorted(times, to_epoch(end))
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(times[lo:hi]), unit="s"), name="Date")
+        return pd.DataFrame({col: np.asarray(cols[col][lo:hi]) for col in COLUMNS}, index=index)
+
+    def write(self, symbol, interval, frame, covered, mode):
+        """
+        Store `frame` (Open/High/Low/Close/Volume indexed by time).
+        mode "append" drops stored rows at or after the frame's first bar and appends,
+        mode "replace" rewrites the whole series.
+        """
+        base = self.path(symbol, interval)
+        os.makedirs(base, exist_ok=True)
+        meta = self.load_meta(symbol, interval) or {"rows": 0}
+        # An empty frame only records the range as covered
+        times = to_epoch(frame.index) if len(frame) else np.empty(0, dtype=np.int64)
+        keep = meta["rows"]
+        if mode == "append" and keep and len(times):
+            stored = self.columns(symbol, interval)["time"]
+            keep = int(np.searchsorted(stored, times[0]))
+            del stored
+        elif mode == "replace":
+            keep = 0
+
+        data = {"time": np.asarray(times, dtype=np.int64)}
+        for col in COLUMNS:
+            data[col] = frame[col].to_numpy(dtype=np.float64) if col in frame else np.full(len(frame), np.nan)
+        for name, values in data.items():
+            path = os.path.join(base, f"{name}.bin")
+            with open(path, "ab") as f:
+                f.truncate(keep * values.itemsize)
+                f.write(values.tobytes())
+        meta["rows"] = keep + len(frame)
+        meta["start"], meta["end"] = covered
+        self.save_meta(symbol, interval, meta)
+
+    def download(self, symbol, start, end=None, interval="1d"):
+        """
+        Bars for [start, end), fetching only the ranges not already on disk.
+        A successful fetch marks its range as covered even when it is empty
+        (weekends, holidays); a failed one (the fetcher raises, e.g. offline)
+        leaves the coverage alone and whatever is stored is returned.
+        Dates without a timezone are UTC, like the stored bar times.
+        """
+        now = pd.Timestamp.now(tz="UTC")
+        end = end or (now + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        start_s, end_s = to_epoch(start), to_epoch(end)
+        # The latest bar may still be forming, so never treat today as fully downloaded
+        today = to_epoch(now.normalize())
+        meta = self.load_meta(symbol, interval)
+
+        try:
+            if meta is None or "start" not in meta:
+                frame = self.fetcher(symbol, start, end, interval)
+                self.write(symbol, interval, frame, (start_s, max(start_s, min(end_s, today))), "replace")
+            else:
+                covered_start, covered_end = meta["start"], meta["end"]
+                if start_s < covered_start:
+                    # Prepending is rare (asking for older history), rewrite the series
+                    older = self.fetcher(symbol, start, from_epoch(covered_start), interval)
+                    if len(older):
+                        frame = pd.concat([older, self.read(symbol, interval)])
+                        frame = frame[~frame.index.duplicated(keep="last")]
+                        self.write(symbol, interval, frame, (start_s, covered_end), "replace")
+                    else:
+                        self.write(symbol, interval, older, (start_s, covered_end), "append")
+                    covered_start = start_s
+                if end_s > covered_end:
+                    newer = self.fetcher(symbol, from_epoch(covered_end), end, interval)
+                    self.write(symbol, interval, newer, (covered_start, max(covered_end, min(end_s, today))), "append")
+        except Exception as e:
+            if meta is None:
+                raise
+            print(f"Bar store: could not update {symbol} {interval}, using stored data: {e}")
+        return self.read(symbol, interval, start, end)
+
+
+def to_epoch(value):
+    """Dates, strings, timestamps or a DatetimeIndex as int64 epoch seconds"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, pd.DatetimeIndex):
+        if value.tz is not None:
+            value = value.tz_convert(None)
+        return value.as_unit("ns").asi8 // 10**9
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_convert(None)
+    return int(ts.value // 10**9)
+
+def from_epoch(seconds):
+    return pd.Timestamp(seconds, unit="s").strftime("%Y-%m-%d")
+
+def yfinance_fetch(symbol, start, end, interval):
+    """Download bars with yfinance and flatten its column layout; raises if the download failed"""
+    import yfinance as yf
+    data = yf.download(symbol, start=start, end=end, interval=interval, progress=False)
+    # yfinance logs failures (offline, unknown symbol, rate limit) and returns an empty frame
+    errors = getattr(yf.shared, "_ERRORS", {})
+    error = errors.get(symbol) or errors.get(symbol.upper())
+    if error:
+        raise RuntimeError(f"yfinance: {error}")
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    return data[[col for col in COLUMNS if col in data.columns]]
+
+
+# Shared store for the scripts
+store = BarStore()
+
+def download(symbol, start, end=None, interval="1d"):
+    """Drop-in replacement for yf.download(symbol, start=..., end=..., interval=...)"""
+    return store.download(symbol, start, end, interval)
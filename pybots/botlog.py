@@ -0,0 +1,172 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from collections import deque
+
+# Log files live under <repo>/data/logs
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "logs")
+LINE_FORMAT = "[%(asctime)s] %(levelname)s %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Keeps the last `capacity` formatted lines in memory for the GUI.
+    Every line gets a sequence number, so a view can ask for just the lines
+    added since its last refresh.
+    """
+    def __init__(self, capacity=5000):
+        super().__init__()
+        self.lines = deque(maxlen=capacity)
+        self.seq = 0  # Lines emitted so far
+        self.lines_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self.lines_lock:
+            self.lines.append(line)
+            self.seq += 1
+
+    def since(self, seq):
+        """(lines added after `seq`, current seq, True if older lines were evicted in between)"""
+        with self.lines_lock:
+            new = self.seq - seq
+            evicted = new > len(self.lines)
+            lines = list(self.lines) if evicted else [self.lines[i] for i in range(len(self.lines) - new, len(self.lines))]
+            return lines, self.seq, evicted
+
+    def clear(self):
+        with self.lines_lock:
+            self.lines.clear()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler on a bounded queue that drops (and counts) records instead of blocking"""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message (and exception, if any)"""
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class BotLog:
+    """
+    Logging for a long-running bot with constant cost per line.
+    The caller's thread only formats into the in-memory ring buffer and puts the
+    record on a bounded queue; a listener thread writes it to the console, a
+    size-rotated text log and (optionally) a rotated JSON-lines log.
+    :param capacity: Lines kept in memory for the GUI view
+    :param log_dir: Directory for <name>.log / <name>.jsonl (None for no files)
+    """
+    def __init__(self, name="mt5bot", level=logging.INFO, capacity=5000, log_dir=DEFAULT_LOG_DIR,
+                 max_bytes=10 * 1024 * 1024, backups=5, structured=True, console=True, queue_size=10000):
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(level)
+        self.logger.propagate = False
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+
+        formatter = logging.Formatter(LINE_FORMAT, DATE_FORMAT)
+        self.ring = RingBufferHandler(capacity)
+        self.ring.setFormatter(formatter)
+        self.logger.addHandler(self.ring)
+
+        sinks = []
+        if console:
+            stream = logging.StreamHandler()
+            stream.setFormatter(formatter)
+            sinks.append(stream)
+        if log_dir is not None:
+            os.makedirs(log_dir, exist_ok=True)
+            text = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, f"{name}.log"), maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            text.setFormatter(formatter)
+            sinks.append(text)
+            if structured:
+                jsonl = logging.handlers.RotatingFileHandler(
+                    os.path.join(log_dir, f"{name}.jsonl"), maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+                jsonl.setFormatter(JsonFormatter())
+                sinks.append(jsonl)
+        self.sinks = sinks
+        self.queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.logger.addHandler(self.queue_handler)
+        self.listener = logging.handlers.QueueListener(self.queue_handler.queue, *sinks,
+                                                       respect_handler_level=True)
+        self.listener.start()
+
+    def set_level(self, level):
+        """Change the minimum level, by number or name ("DEBUG", "INFO", ...)"""
+        self.logger.setLevel(logging.getLevelName(level) if isinstance(level, str) else level)
+
+    @property
+    def dropped(self):
+        """Records the file/console sinks could not keep up with"""
+        return self.queue_handler.dropped
+
+    def close(self):
+        """Flush the queue to the sinks and stop the listener"""
+        self.listener.stop()
+        for sink in self.sinks:
+            sink.close()
+
+
+class LogView:
+    """
+    Shows a RingBufferHandler in a Tk Text widget.
+    refresh() is meant to be called on a timer (the frame rate cap): it inserts
+    all lines added since the last call in one go, trims the widget to the ring's
+    capacity so it never grows, and only scrolls when the user is at the bottom.
+    """
+    def __init__(self, text, ring):
+        self.text = text
+        self.ring = ring
+        self.seq = 0
+        self.capacity = ring.lines.maxlen
+
+    def refresh(self):
+        lines, self.seq, evicted = self.ring.since(self.seq)
+        if not lines and not evicted:
+            return
+        at_bottom = self.text.yview()[1] >= 0.999
+        self.text.config(state="normal")
+        if evicted:
+            # Fell more than a full buffer behind, redraw from the ring
+            self.text.delete("1.0", "end")
+        self.text.insert("end", "\n".join(lines) + "\n")
+        excess = int(self.text.index("end-1c").split(".")[0]) - 1 - self.capacity
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+        self.text.config(state="disabled")
+        if at_bottom:
+            self.text.see("end")
+
+    def clear(self):
+        self.ring.clear()
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.config(state="disabled")
@@ -0,0 +1,654 @@
+import argparse
+import os
+import time
+from collections import namedtuple
+import numpy as np
+import barstore
+from scheduler import ReplayFinished, WallClock
+
+# The bots talk to a broker through the MetaTrader5 API subset below, so either
+# backend can be dropped in with `mt5 = get_broker()`:
+#   copy_rates / copy_rates_from_pos, symbol_info, symbol_info_tick, symbol_select,
+#   positions_get, account_info, order_send, initialize, login, shutdown, last_error
+# plus the TIMEFRAME_*, ORDER_*, TRADE_* constants.
+
+# MetaTrader5 constant values, so the simulator needs no Windows package
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+TIMEFRAME_SECONDS = {
+    TIMEFRAME_M1: 60, TIMEFRAME_M5: 300, TIMEFRAME_M15: 900, TIMEFRAME_M30: 1800,
+    TIMEFRAME_H1: 3600, TIMEFRAME_H4: 14400, TIMEFRAME_D1: 86400,
+}
+# Bar store / yfinance interval names
+INTERVAL_TIMEFRAMES = {"1m": TIMEFRAME_M1, "5m": TIMEFRAME_M5, "15m": TIMEFRAME_M15,
+                       "30m": TIMEFRAME_M30, "1h": TIMEFRAME_H1, "1d": TIMEFRAME_D1}
+TIMEFRAME_INTERVALS = {timeframe: interval for interval, timeframe in INTERVAL_TIMEFRAMES.items()}
+
+TRADE_ACTION_DEAL = 1
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_MARKET_CLOSED = 10018
+TRADE_RETCODE_NO_MONEY = 10019
+TRADE_RETCODE_POSITION_CLOSED = 10036
+
+# Same layout as the arrays MetaTrader5.copy_rates_* returns
+RATES_DTYPE = np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+                        ("close", "<f8"), ("tick_volume", "<u8"), ("spread", "<i4"),
+                        ("real_volume", "<u8")])
+
+SymbolInfo = namedtuple("SymbolInfo", [
+    "name", "visible", "point", "digits", "spread", "bid", "ask", "trade_contract_size",
+    "trade_tick_size", "trade_tick_value", "volume_min", "volume_max", "volume_step",
+    "filling_mode", "currency_profit", "currency_margin"])
+Tick = namedtuple("Tick", ["time", "bid", "ask", "last", "volume", "time_msc", "flags", "volume_real"])
+TradePosition = namedtuple("TradePosition", [
+    "ticket", "time", "type", "magic", "identifier", "volume", "price_open", "sl", "tp",
+    "price_current", "swap", "profit", "symbol", "comment"])
+TradeDeal = namedtuple("TradeDeal", [
+    "ticket", "order", "time", "type", "entry", "magic", "position_id", "volume", "price",
+    "commission", "swap", "profit", "symbol", "comment"])
+AccountInfo = namedtuple("AccountInfo", [
+    "login", "leverage", "balance", "credit", "profit", "equity", "margin", "margin_free",
+    "margin_level", "currency", "server"])
+OrderSendResult = namedtuple("OrderSendResult", [
+    "retcode", "deal", "order", "volume", "price", "bid", "ask", "comment", "request_id",
+    "retcode_external", "request"])
+
+
+class MT5Broker:
+    """The MetaTrader5 terminal; everything not defined here is passed to the package"""
+    def __init__(self):
+        import MetaTrader5
+        self.mt5 = MetaTrader5
+
+    def __getattr__(self, name):
+        return getattr(self.mt5, name)
+
+    def copy_rates(self, symbol, timeframe, start_pos, count):
+        return self.mt5.copy_rates_from_pos(symbol, timeframe, start_pos, count)
+
+
+class SimBroker:
+    """
+    In-process MT5 stand-in that replays stored bars as ticks and fills orders.
+    Each bar becomes four ticks (open, low/high in the order implied by the bar's
+    direction, close) spread over the bar's duration; ticks of all symbols are
+    merged once into one time-ordered stream, so step() is a few array lookups.
+    copy_rates returns bars up to the current tick, position 0 being the forming
+    bar; a coarser timeframe than the replayed one is resampled from it and a
+    finer one is loaded from the bar store. The bots drive the replay through
+    `clock` (a SimClock): each sleep replays the ticks it skips. Market orders fill at the current ask/bid plus `slippage_points` (and up
+    to `random_slippage_points` more, adverse), are rejected with a requote when
+    that exceeds the request's deviation, and SL/TP are checked on every tick.
+    :param start: Replay starts at the first tick at or after this time (epoch or date)
+    :param interval: Bar store interval used to load symbols on first use
+    """
+    def __init__(self, balance=10000.0, leverage=100, slippage_points=0, random_slippage_points=0,
+                 start=None, interval="1d", store=None, seed=0):
+        self.initial_balance = balance
+        self.balance = balance
+        self.leverage = leverage
+        self.slippage_points = slippage_points
+        self.random_slippage_points = random_slippage_points
+        self.start = None if start is None else int(barstore.to_epoch(start))
+        self.interval = interval
+        self.store = store or barstore.store
+        self.rng = np.random.default_rng(seed)
+        self.symbols = {}  # name -> per-symbol replay state (dict)
+        self.positions = {}  # ticket -> TradePosition
+        self.deals = []
+        self.next_ticket = 1
+        self.error = (1, "Success")
+        # Merged tick stream: symbol id and per-symbol tick index, in time order
+        self.names = []
+        self.stream_symbol = np.empty(0, dtype=np.int32)
+        self.stream_tick = np.empty(0, dtype=np.int64)
+        self.stream_time = np.empty(0, dtype=np.int64)
+        self.cursor = -1
+        self.time = None
+        self.clock_time = self.start  # Where the last sleep advanced to
+        self.clock = SimClock(self)
+
+    # Function to add a symbol's bars to the replay
+    def add_symbol(self, name, bars, timeframe=TIMEFRAME_D1, point=0.01, digits=2, spread_points=0,
+                   contract_size=1.0, tick_value=None, volume_min=0.01, volume_max=100.0, volume_step=0.01):
+        """
+        :param bars: DataFrame indexed by date with Open/High/Low/Close (bar store
+                     layout) or a structured array in the MT5 rates layout
+        :param tick_value: Account-currency value of one point per lot (default point * contract_size)
+        """
+        rates = to_rates(bars, spread_points)
+        period = TIMEFRAME_SECONDS[timeframe]
+        n = len(rates)
+        # Four ticks per bar: open, first extreme, second extreme, close
+        bullish = rates["close"] >= rates["open"]
+        prices = np.empty((n, 4))
+        prices[:, 0] = rates["open"]
+        prices[:, 1] = np.where(bullish, rates["low"], rates["high"])
+        prices[:, 2] = np.where(bullish, rates["high"], rates["low"])
+        prices[:, 3] = rates["close"]
+        times = rates["time"][:, None] + (np.arange(4) * period // 4)[None, :]
+        self.symbols[name] = {
+            "rates": rates,
+            "timeframe": timeframe,
+            "tick_time": times.ravel(),
+            "tick_bid": prices.ravel(),
+            "cursor": -1,
+            "groups": {},  # coarser period -> first bar index of each coarse bar
+            "info": SymbolInfo(
+                name=name, visible=True, point=point, digits=digits, spread=spread_points,
+                bid=0.0, ask=0.0, trade_contract_size=contract_size, trade_tick_size=point,
+                trade_tick_value=point * contract_size if tick_value is None else tick_value,
+                volume_min=volume_min, volume_max=volume_max, volume_step=volume_step,
+                filling_mode=3, currency_profit="USD", currency_margin="USD"),
+        }
+        self.merge()
+
+    def load_symbol(self, name, interval=None, **spec):
+        """Add (or replace) a symbol from the bar store; False if nothing is stored for it"""
+        interval = interval or self.interval
+        columns = self.store.columns(name, interval)
+        if columns is None:
+            return False
+        self.add_symbol(name, columns, timeframe=INTERVAL_TIMEFRAMES[interval], **spec)
+        return True
+
+    def reload_symbol(self, name, interval):
+        """Replace a symbol's bars with another stored interval, keeping its spec and the clock"""
+        info = self.symbols[name]["info"]
+        return self.load_symbol(
+            name, interval, point=info.point, digits=info.digits, spread_points=info.spread,
+            contract_size=info.trade_contract_size, tick_value=info.trade_tick_value,
+            volume_min=info.volume_min, volume_max=info.volume_max, volume_step=info.volume_step)
+
+    def merge(self):
+        """Rebuild the merged tick stream and keep the clock where it was"""
+        self.names = list(self.symbols)
+        symbol_ids = [np.full(len(self.symbols[s]["tick_time"]), i, dtype=np.int32) for i, s in enumerate(self.names)]
+        tick_ids = [np.arange(len(self.symbols[s]["tick_time"])) for s in self.names]
+        times = np.concatenate([self.symbols[s]["tick_time"] for s in self.names])
+        order = np.argsort(times, kind="stable")
+        self.stream_time = times[order]
+        self.stream_symbol = np.concatenate(symbol_ids)[order]
+        self.stream_tick = np.concatenate(tick_ids)[order]
+        if self.time is None:
+            # Not started yet: stop just before the first tick at or after `start`
+            limit, side = (np.iinfo(np.int64).min if self.start is None else self.start), "left"
+        else:
+            limit, side = self.now(), "right"
+        self.cursor = int(np.searchsorted(self.stream_time, limit, side=side)) - 1
+        for state in self.symbols.values():
+            state["cursor"] = int(np.searchsorted(state["tick_time"], limit, side=side)) - 1
+        if self.cursor >= 0:
+            self.time = int(self.stream_time[self.cursor])
+
+    def step(self):
+        """Advance one tick; returns the symbol that ticked, or None at the end of the data"""
+        if self.cursor + 1 >= len(self.stream_time):
+            return None
+        self.cursor += 1
+        name = self.names[self.stream_symbol[self.cursor]]
+        state = self.symbols[name]
+        state["cursor"] = self.stream_tick[self.cursor]
+        self.time = int(self.stream_time[self.cursor])
+        self.check_stops(name)
+        return name
+
+    def now(self):
+        """Replay time: the latest tick, or later if a sleep went past it"""
+        times = [t for t in (self.time, self.clock_time) if t is not None]
+        if times:
+            return max(times)
+        return int(self.stream_time[0]) if len(self.stream_time) else 0
+
+    def advance_to(self, t):
+        """
+        Replay every tick up to time t, checking SL/TP on each. With no open
+        positions there is nothing to check, so the cursors jump straight there.
+        Raises ReplayFinished once t is past the last tick.
+        """
+        end = int(np.searchsorted(self.stream_time, t, side="right")) - 1
+        if end > self.cursor:
+            if self.positions:
+                while self.cursor < end:
+                    self.step()
+            else:
+                self.cursor = end
+                self.time = int(self.stream_time[end])
+                for state in self.symbols.values():
+                    state["cursor"] = int(np.searchsorted(state["tick_time"], t, side="right")) - 1
+        self.clock_time = t if self.clock_time is None else max(self.clock_time, t)
+        if not len(self.stream_time) or t > self.stream_time[-1]:
+            raise ReplayFinished(f"No ticks after {self.stream_time[-1] if len(self.stream_time) else t}")
+
+    def run(self, on_tick=None, on_bar=None, max_ticks=None):
+        """
+        Replay ticks, calling on_tick(symbol) after every tick and on_bar(symbol)
+        when a new bar opens (the moment a live bot wakes up). Returns ticks replayed.
+        """
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            name = self.step()
+            if name is None:
+                break
+            ticks += 1
+            if on_bar is not None and self.symbols[name]["cursor"] % 4 == 0:
+                on_bar(name)
+            if on_tick is not None:
+                on_tick(name)
+        return ticks
+
+    def state(self, symbol):
+        state = self.symbols.get(symbol)
+        if state is None and self.load_symbol(symbol):
+            state = self.symbols[symbol]
+        return state
+
+    def quote(self, state):
+        """(bid, ask) at the symbol's current tick, or None before its first tick"""
+        cursor = state["cursor"]
+        if cursor < 0:
+            return None
+        bid = float(state["tick_bid"][cursor])
+        return bid, bid + state["info"].spread * state["info"].point
+
+    # MetaTrader5 API
+
+    def initialize(self, *args, **kwargs):
+        return True
+
+    def login(self, *args, **kwargs):
+        return True
+
+    def shutdown(self):
+        return True
+
+    def last_error(self):
+        return self.error
+
+    def symbol_select(self, symbol, enable=True):
+        return self.state(symbol) is not None
+
+    def symbol_info(self, symbol):
+        state = self.state(symbol)
+        if state is None:
+            self.error = (-1, f"Unknown symbol {symbol}")
+            return None
+        quote = self.quote(state) or (0.0, 0.0)
+        return state["info"]._replace(bid=quote[0], ask=quote[1])
+
+    def symbol_info_tick(self, symbol):
+        state = self.state(symbol)
+        quote = None if state is None else self.quote(state)
+        if quote is None:
+            self.error = (-1, f"No tick for {symbol}")
+            return None
+        t = int(state["tick_time"][state["cursor"]])
+        return Tick(time=t, bid=quote[0], ask=quote[1], last=quote[0], volume=0,
+                    time_msc=t * 1000, flags=6, volume_real=0.0)
+
+    def copy_rates(self, symbol, timeframe, start_pos, count):
+        """Bars ending `start_pos` bars before the forming one, oldest first (like copy_rates_from_pos)"""
+        period = TIMEFRAME_SECONDS.get(timeframe)
+        if period is None:
+            self.error = (-2, f"Unknown timeframe {timeframe}")
+            return None
+        interval = TIMEFRAME_INTERVALS.get(timeframe)
+        if symbol not in self.symbols and interval is not None:
+            # First use: load the interval asked for if it is stored
+            self.load_symbol(symbol, interval)
+        state = self.state(symbol)
+        if state is None:
+            self.error = (-1, f"No rates for {symbol}")
+            return None
+        base = TIMEFRAME_SECONDS[state["timeframe"]]
+        if period < base:
+            if interval is None or not self.reload_symbol(symbol, interval):
+                self.error = (-2, f"No stored {interval or timeframe} bars for {symbol}")
+                return None
+            state = self.symbols[symbol]
+        elif period % base:
+            self.error = (-2, f"Timeframe {timeframe} can't be built from the replayed bars")
+            return None
+        if state["cursor"] < 0:
+            self.error = (-1, f"No rates for {symbol}")
+            return None
+        if period > base:
+            return self.resample(state, period, start_pos, count)
+        current = state["cursor"] // 4
+        end = current - start_pos + 1
+        begin = max(end - count, 0)
+        if end <= 0:
+            return None
+        out = state["rates"][begin:end].copy()
+        if start_pos == 0:
+            self.forming(state, out)
+        return out
+
+    def forming(self, state, out):
+        """The forming bar (last of `out`) only knows the ticks seen so far"""
+        cursor = state["cursor"]
+        seen = state["tick_bid"][cursor - cursor % 4:cursor + 1]
+        out[-1]["high"] = seen.max()
+        out[-1]["low"] = seen.min()
+        out[-1]["close"] = seen[-1]
+
+    def resample(self, state, period, start_pos, count):
+        """copy_rates for bars `period` seconds long, aggregated from the replayed bars"""
+        rates = state["rates"]
+        starts = state["groups"].get(period)
+        if starts is None:
+            bucket = rates["time"] // period
+            starts = state["groups"][period] = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+        current = state["cursor"] // 4
+        end = int(np.searchsorted(starts, current, side="right")) - 1 - start_pos
+        if end < 0:
+            return None
+        begin = max(end - count + 1, 0)
+        lo = starts[begin]
+        fine = rates[lo:current + 1 if start_pos == 0 else starts[end + 1]].copy()
+        if start_pos == 0:
+            self.forming(state, fine)
+        offsets = starts[begin:end + 1] - lo
+        out = np.zeros(len(offsets), dtype=RATES_DTYPE)
+        out["time"] = fine["time"][offsets] // period * period
+        out["open"] = fine["open"][offsets]
+        out["high"] = np.maximum.reduceat(fine["high"], offsets)
+        out["low"] = np.minimum.reduceat(fine["low"], offsets)
+        out["close"] = fine["close"][np.append(offsets[1:], len(fine)) - 1]
+        out["tick_volume"] = np.add.reduceat(fine["tick_volume"], offsets)
+        out["spread"] = fine["spread"][offsets]
+        out["real_volume"] = np.add.reduceat(fine["real_volume"], offsets)
+        return out
+
+    copy_rates_from_pos = copy_rates
+
+    def positions_get(self, symbol=None, ticket=None):
+        positions = []
+        for position in self.positions.values():
+            if (symbol is None or position.symbol == symbol) and (ticket is None or position.ticket == ticket):
+                positions.append(self.mark(position))
+        return tuple(positions)
+
+    def history_deals_get(self, date_from=None, date_to=None, position=None):
+        lo = 0 if date_from is None else barstore.to_epoch(date_from)
+        hi = np.inf if date_to is None else barstore.to_epoch(date_to)
+        return tuple(d for d in self.deals if lo <= d.time <= hi and (position is None or d.position_id == position))
+
+    def mark(self, position):
+        """Position with price_current and profit at the current tick"""
+        state = self.symbols[position.symbol]
+        bid, ask = self.quote(state)
+        price = bid if position.type == POSITION_TYPE_BUY else ask
+        return position._replace(price_current=price, profit=self.profit(position, price))
+
+    def profit(self, position, price):
+        info = self.symbols[position.symbol]["info"]
+        direction = 1 if position.type == POSITION_TYPE_BUY else -1
+        return float(direction * (price - position.price_open) / info.trade_tick_size
+                     * info.trade_tick_value * position.volume)
+
+    def margin(self, symbol, volume, price):
+        info = self.symbols[symbol]["info"]
+        return volume * info.trade_contract_size * price / self.leverage
+
+    def order_calc_margin(self, action, symbol, volume, price):
+        if self.state(symbol) is None:
+            return None
+        return self.margin(symbol, volume, price)
+
+    def account_info(self):
+        profit = sum(self.mark(p).profit for p in self.positions.values())
+        margin = sum(self.margin(p.symbol, p.volume, p.price_open) for p in self.positions.values())
+        equity = self.balance + profit
+        return AccountInfo(login=0, leverage=self.leverage, balance=self.balance, credit=0.0,
+                           profit=profit, equity=equity, margin=margin, margin_free=equity - margin,
+                           margin_level=equity / margin * 100 if margin else 0.0,
+                           currency="USD", server="SimBroker")
+
+    def order_send(self, request):
+        """Market deals only: open a position, or close one when request['position'] is set"""
+        def reject(retcode, comment):
+            return OrderSendResult(retcode, 0, 0, 0.0, 0.0, 0.0, 0.0, comment, 0, 0, request)
+
+        symbol = request.get("symbol")
+        state = self.state(symbol)
+        if request.get("action") != TRADE_ACTION_DEAL or state is None:
+            return reject(TRADE_RETCODE_INVALID, "Invalid request")
+        quote = self.quote(state)
+        if quote is None:
+            return reject(TRADE_RETCODE_MARKET_CLOSED, "Market closed")
+        info = state["info"]
+        order_type = request.get("type")
+        if order_type not in (ORDER_TYPE_BUY, ORDER_TYPE_SELL):
+            return reject(TRADE_RETCODE_INVALID, "Invalid order type")
+        volume = float(request.get("volume", 0))
+        steps = round(volume / info.volume_step)
+        if not info.volume_min <= volume <= info.volume_max or abs(steps * info.volume_step - volume) > 1e-9:
+            return reject(TRADE_RETCODE_INVALID_VOLUME, "Invalid volume")
+
+        bid, ask = quote
+        slippage = self.slippage_points
+        if self.random_slippage_points:
+            slippage += self.rng.uniform(0, self.random_slippage_points)
+        buy = order_type == ORDER_TYPE_BUY
+        price = round(ask + slippage * info.point if buy else bid - slippage * info.point, info.digits)
+        requested = request.get("price") or price
+        if abs(price - requested) > request.get("deviation", 0) * info.point + 1e-12:
+            return reject(TRADE_RETCODE_REQUOTE, "Requote")
+
+        ticket = self.next_ticket
+        self.next_ticket += 1
+        closing = request.get("position")
+        if closing:
+            position = self.positions.get(closing)
+            if position is None or position.type == order_type or position.volume != volume:
+                return reject(TRADE_RETCODE_POSITION_CLOSED, "Position not found")
+            self.close(position, price, ticket, "close")
+        else:
+            if self.margin(symbol, volume, price) > self.account_info().margin_free:
+                return reject(TRADE_RETCODE_NO_MONEY, "No money")
+            self.positions[ticket] = TradePosition(
+                ticket=ticket, time=self.time, type=order_type, magic=request.get("magic", 0),
+                identifier=ticket, volume=volume, price_open=price, sl=request.get("sl", 0.0) or 0.0,
+                tp=request.get("tp", 0.0) or 0.0, price_current=price, swap=0.0, profit=0.0,
+                symbol=symbol, comment=request.get("comment", ""))
+            self.deals.append(TradeDeal(
+                ticket=ticket, order=ticket, time=self.time, type=order_type, entry=DEAL_ENTRY_IN,
+                magic=request.get("magic", 0), position_id=ticket, volume=volume, price=price,
+                commission=0.0, swap=0.0, profit=0.0, symbol=symbol, comment=request.get("comment", "")))
+        return OrderSendResult(TRADE_RETCODE_DONE, ticket, ticket, volume, price, bid, ask,
+                               "Request executed", 0, 0, request)
+
+    def close(self, position, price, ticket, comment):
+        """Book the exit deal and realize the position's profit"""
+        del self.positions[position.ticket]
+        profit = self.profit(position, price)
+        self.balance += profit
+        self.deals.append(TradeDeal(
+            ticket=ticket, order=ticket, time=self.time,
+            type=DEAL_TYPE_SELL if position.type == POSITION_TYPE_BUY else DEAL_TYPE_BUY,
+            entry=DEAL_ENTRY_OUT, magic=position.magic, position_id=position.ticket,
+            volume=position.volume, price=price, commission=0.0, swap=0.0, profit=profit,
+            symbol=position.symbol, comment=comment))
+
+    def check_stops(self, symbol):
+        """Close positions on `symbol` whose SL or TP the current tick has reached"""
+        if not self.positions:
+            return
+        bid, ask = self.quote(self.symbols[symbol])
+        for position in [p for p in self.positions.values() if p.symbol == symbol]:
+            if position.type == POSITION_TYPE_BUY:
+                if position.sl and bid <= position.sl:
+                    reason = "sl"
+                elif position.tp and bid >= position.tp:
+                    reason = "tp"
+                else:
+                    continue
+                price = bid
+            else:
+                if position.sl and ask >= position.sl:
+                    reason = "sl"
+                elif position.tp and ask <= position.tp:
+                    reason = "tp"
+                else:
+                    continue
+                price = ask
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            self.close(position, price, ticket, f"[{reason} {price}]")
+
+class SimClock(WallClock):
+    """
+    A SimBroker's replay time, for the bots' schedulers and sleeps (scheduler.get_clock):
+    sleeping replays the ticks in between instead of waiting.
+    """
+    max_sleep = float("inf")
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    def time(self):
+        return self.sim.now()
+
+    def monotonic(self):
+        return self.sim.now()
+
+    def sleep(self, seconds):
+        self.sim.advance_to(self.time() + seconds)
+
+    def wait(self, stop_event, seconds):
+        if stop_event is not None and stop_event.is_set():
+            return True
+        self.sleep(seconds)
+        return stop_event is not None and stop_event.is_set()
+
+# The MT5 constants are attributes of the simulator too, so `mt5.ORDER_TYPE_BUY` works with either backend
+for _name, _value in list(globals().items()):
+    if _name.startswith(("TIMEFRAME_", "TRADE_", "ORDER_", "POSITION_", "DEAL_")) and isinstance(_value, int):
+        setattr(SimBroker, _name, _value)
+
+def to_rates(bars, spread_points=0):
+    """Bars in the MT5 rates layout from a bar store DataFrame/columns or a rates array"""
+    if isinstance(bars, np.ndarray) and bars.dtype.names and "open" in bars.dtype.names:
+        rates = np.zeros(len(bars), dtype=RATES_DTYPE)
+        for name in bars.dtype.names:
+            if name in RATES_DTYPE.names:
+                rates[name] = bars[name]
+        return rates
+    if isinstance(bars, dict):
+        times = np.asarray(bars["time"])
+    else:
+        times = barstore.to_epoch(bars.index)
+    rates = np.zeros(len(times), dtype=RATES_DTYPE)
+    rates["time"] = times
+    for col in ("Open", "High", "Low", "Close"):
+        rates[col.lower()] = np.asarray(bars[col])
+    if "Volume" in bars:
+        rates["tick_volume"] = np.nan_to_num(np.asarray(bars["Volume"]))
+    rates["spread"] = spread_points
+    return rates
+
+def synthetic_bars(n, timeframe=TIMEFRAME_M1, start=1_700_000_000, price=100.0, volatility=0.001, seed=0):
+    """Random-walk OHLC bars in the MT5 rates layout, for soak tests and benchmarks"""
+    rng = np.random.default_rng(seed)
+    period = TIMEFRAME_SECONDS[timeframe]
+    close = price * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.concatenate([[price], close[:-1]])
+    wiggle = np.abs(rng.normal(0, volatility, (2, n))) * close
+    rates = np.zeros(n, dtype=RATES_DTYPE)
+    rates["time"] = start - start % period + np.arange(n) * period
+    rates["open"] = open_
+    rates["close"] = close
+    rates["high"] = np.maximum(open_, close) + wiggle[0]
+    rates["low"] = np.minimum(open_, close) - wiggle[1]
+    rates["tick_volume"] = 4
+    return rates
+
+# Simulator shared by every script in the process (BROKER=sim)
+_sim = None
+
+def get_broker(backend=None):
+    """
+    The broker the bots should use: BROKER=mt5 (default) for the MetaTrader5
+    terminal, BROKER=sim for the shared SimBroker replaying the bar store
+    (BROKER_SIM_INTERVAL picks the stored interval, default 1d; BROKER_SIM_START
+    where the replay starts; BROKER_SIM_SYMBOLS, comma-separated, to load up front).
+    """
+    global _sim
+    backend = backend or os.environ.get("BROKER", "mt5")
+    if backend == "mt5":
+        return MT5Broker()
+    if backend == "sim":
+        if _sim is None:
+            _sim = SimBroker(start=os.environ.get("BROKER_SIM_START") or None,
+                             interval=os.environ.get("BROKER_SIM_INTERVAL", "1d"))
+            for symbol in filter(None, os.environ.get("BROKER_SIM_SYMBOLS", "").split(",")):
+                _sim.load_symbol(symbol.strip())
+        return _sim
+    raise ValueError(f"Unknown broker backend: {backend}")
+
+
+# Function to soak-test the simulator with a moving-average bot on every bar
+def soak(symbols=4, bars=100_000, fast=10, slow=50, slippage=2, seed=0):
+    sim = SimBroker(balance=100_000.0, random_slippage_points=slippage, seed=seed)
+    for i in range(symbols):
+        sim.add_symbol(f"SYM{i}", synthetic_bars(bars, seed=seed + i), timeframe=TIMEFRAME_M1,
+                       point=0.001, digits=3, spread_points=10)
+
+    def on_bar(symbol):
+        rates = sim.copy_rates(symbol, TIMEFRAME_M1, 1, slow)
+        if rates is None or len(rates) < slow:
+            return
+        close = rates["close"]
+        signal = ORDER_TYPE_BUY if close[-fast:].mean() > close.mean() else ORDER_TYPE_SELL
+        open_positions = sim.positions_get(symbol=symbol)
+        if any(p.type == signal for p in open_positions):
+            return
+        tick = sim.symbol_info_tick(symbol)
+        for p in open_positions:
+            sim.order_send({"action": TRADE_ACTION_DEAL, "symbol": symbol, "volume": p.volume,
+                            "type": signal, "position": p.ticket, "deviation": 20,
+                            "price": tick.ask if signal == ORDER_TYPE_BUY else tick.bid})
+        price = tick.ask if signal == ORDER_TYPE_BUY else tick.bid
+        point = sim.symbol_info(symbol).point
+        sl = price - 500 * point if signal == ORDER_TYPE_BUY else price + 500 * point
+        sim.order_send({"action": TRADE_ACTION_DEAL, "symbol": symbol, "volume": 1.0, "type": signal,
+                        "price": price, "sl": sl, "tp": 0.0, "deviation": 20})
+
+    start = time.perf_counter()
+    ticks = sim.run(on_bar=on_bar)
+    elapsed = time.perf_counter() - start
+    return ticks, elapsed, len(sim.deals), sim.account_info()
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test the simulated MT5 broker")
+    parser.add_argument("--symbols", type=int, default=4)
+    parser.add_argument("--bars", type=int, default=100_000, help="M1 bars per symbol")
+    args = parser.parse_args()
+    ticks, elapsed, deals, account = soak(args.symbols, args.bars)
+    print(f"{ticks:,} ticks in {elapsed:.2f} s ({ticks / elapsed:,.0f} ticks/s), {deals} deals")
+    print(f"Balance {account.balance:.2f}, equity {account.equity:.2f}")
+
+if __name__ == "__main__":
+    main()
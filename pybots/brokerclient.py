@@ -0,0 +1,203 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from requests.adapters import HTTPAdapter
+
+BROKER_URL = "https://api.yourbroker.com/v1"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class BrokerClient:
+    """
+    REST client for the broker's order API.
+    One requests.Session with a keep-alive connection pool is shared by all calls,
+    so a burst of orders reuses warm connections instead of paying a TCP/TLS
+    handshake each. Every order carries an Idempotency-Key header that stays the
+    same across retries, so a timed-out request can be resent without the risk
+    of a duplicate fill. submit_order() sends from a thread pool and returns a
+    Future; place_orders() sends a batch concurrently.
+    :param timeout: (connect, read) timeout in seconds
+    """
+    def __init__(self, api_key, token, base_url=BROKER_URL, timeout=(3.05, 10.0),
+                 pool_size=10, max_retries=3, backoff=0.2, workers=8):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.session.headers.update({
+            'X-IG-API-KEY': api_key,
+            'Authorization': f"Bearer {token}",
+            'Content-Type': 'application/json'
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="broker")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def request(self, method, path, idempotency_key=None, **kwargs):
+        """Send one request, retrying connection errors, timeouts and 429/5xx with backoff"""
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, self.base_url + path, headers=headers,
+                                                timeout=self.timeout, **kwargs)
+                if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+            except (requests.ConnectionError, requests.Timeout):
+                # Only safe to resend non-idempotent calls when the server can deduplicate them
+                if (method != "GET" and not idempotency_key) or attempt == self.max_retries:
+                    raise
+            time.sleep(delay)
+            delay *= 2
+
+    # Function to place a market order
+    def place_order(self, symbol, order_type='BUY', volume=1, idempotency_key=None):
+        payload = {
+            "epic": symbol,
+            "size": volume,
+            "direction": order_type,
+            "orderType": "MARKET"
+        }
+        return self.request("POST", "/orders", idempotency_key or str(uuid.uuid4()), json=payload)
+
+    def submit_order(self, symbol, order_type='BUY', volume=1, idempotency_key=None):
+        """Send an order in the background; returns a Future with the broker's response"""
+        # The key is fixed here so a caller resubmitting the same order can reuse it
+        key = idempotency_key or str(uuid.uuid4())
+        return self.executor.submit(self.place_order, symbol, order_type, volume, key)
+
+    def place_orders(self, orders):
+        """
+        Send several orders concurrently.
+        :param orders: Iterable of dicts with symbol, order_type, volume and optional idempotency_key
+        :return: List of responses (or the exception raised) in the same order
+        """
+        futures = [self.submit_order(**order) for order in orders]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class MockBrokerServer:
+    """
+    Local HTTP/1.1 stand-in for the broker's /orders endpoint.
+    Orders are deduplicated by Idempotency-Key, and the number of distinct client
+    connections is recorded so connection reuse can be checked.
+    :param latency: Seconds to wait before answering each request
+    :param fail_first: Number of requests answered with 503 before succeeding
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_first=0):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.requests = 0
+        self.orders = {}  # Idempotency key -> deal reference
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                key = self.headers.get("Idempotency-Key")
+                if mock.latency:
+                    time.sleep(mock.latency)
+                with mock.lock:
+                    mock.requests += 1
+                    mock.connections.add(self.client_address)
+                    failing = mock.requests <= mock.fail_first
+                    if failing:
+                        status, body = 503, {"errorCode": "service.unavailable"}
+                    elif not self.path.endswith("/orders"):
+                        status, body = 404, {"errorCode": "not.found"}
+                    else:
+                        order_key = key or str(uuid.uuid4())
+                        if order_key not in mock.orders:
+                            mock.orders[order_key] = f"DEAL{len(mock.orders) + 1}"
+                        status, body = 200, {"dealReference": mock.orders[order_key],
+                                             "epic": payload.get("epic")}
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# Function to compare one-connection-per-order with the pooled concurrent client
+def main():
+    parser = argparse.ArgumentParser(description="Broker client demo against a local mock server")
+    parser.add_argument("--orders", type=int, default=40, help="Orders in the burst")
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock response time in seconds")
+    args = parser.parse_args()
+    symbols = ["CS.D.US30.CFD.IP", "IX.D.NASDAQ.CFD.IP", "CS.D.EURUSD.CFD.IP", "CS.D.GBPUSD.CFD.IP"]
+    orders = [{"symbol": symbols[i % len(symbols)], "order_type": "BUY", "volume": 1}
+              for i in range(args.orders)]
+
+    mock = MockBrokerServer(latency=args.latency).start()
+    start = time.perf_counter()
+    for order in orders:
+        requests.post(mock.url + "/orders", json={"epic": order["symbol"]}, timeout=10)
+    sequential = time.perf_counter() - start
+    print(f"requests.post per order: {sequential:.3f} s, {len(mock.connections)} connections")
+    mock.stop()
+
+    mock = MockBrokerServer(latency=args.latency).start()
+    with BrokerClient("KEY", "TOKEN", base_url=mock.url) as client:
+        start = time.perf_counter()
+        results = client.place_orders(orders)
+        pooled = time.perf_counter() - start
+    failed = sum(isinstance(r, Exception) for r in results)
+    print(f"BrokerClient.place_orders: {pooled:.3f} s, {len(mock.connections)} connections, {failed} failed")
+    mock.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 import backtrader as bt
-import yfinance as yf
+import barstore
 
 # Create a subclass of Strategy to define the indicators and logic
 class SmaCross(bt.Strategy):
@@ -19,8 +19,8 @@ class SmaCross(bt.Strategy):
 
 cerebro = bt.Cerebro()
 
-# Create a data feed with yfinance
-data = bt.feeds.PandasData(dataname=yf.download('MSFT', start='2024-07-01', end='2024-09-30'))
+# Create a data feed from the local bar store (downloads with yfinance on first run)
+data = bt.feeds.PandasData(dataname=barstore.download('MSFT', '2024-07-01', '2024-09-30'))
 
 cerebro.adddata(data)
 cerebro.addstrategy(SmaCross)
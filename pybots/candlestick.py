@@ -1,7 +1,7 @@
-import yfinance as yf
+import barstore
 import mplfinance as mpf
 
 ticker = input("Enter stock name: ")
-df = yf.download(ticker, start='2024-08-01', end='2025-08-16')
+df = barstore.download(ticker, '2024-08-01', '2025-08-16')
 mpf.plot(df, type='candle', style='charles',
          title=f'{ticker} Candlestick Chart', ylabel='Price')
@@ -1,39 +1,43 @@
-import MetaTrader5 as mt5
-import yfinance as yf
+import barstore
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.arima.model import ARIMA
 from datetime import datetime, timedelta
-import time
+import os
+from forecaster import ARIMAForecaster, DEFAULT_MODEL_DIR
+from broker import get_broker
+from scheduler import ReplayFinished, get_clock
 
 # MT5 Initialization
+mt5 = get_broker()  # MetaTrader5 terminal, or the simulator when BROKER=sim
 if not mt5.initialize():
     print("initialize() failed")
     mt5.shutdown()
 
+# Wall time, or replay time on the simulator (its sleeps replay the ticks in between)
+clock = get_clock(mt5)
+
 def fetch_data(symbol, start_date):
-    data = yf.download(symbol, start=start_date, end=datetime.now().strftime('%Y-%m-%d'))
+    # Served from the local bar store, only new days are downloaded
+    data = barstore.download(symbol, start_date, clock.now().strftime('%Y-%m-%d'))
     return data['Close'].asfreq('B')  # Business days frequency
 
-def forecast(symbol):
-    # Fetch historical data
-    us30_data = fetch_data(symbol, '2024-10-10')
-    
-    # Fit ARIMA model
-    model = ARIMA(us30_data, order=(5, 1, 0))
-    model_fit = model.fit()
+# ARIMA model persisted between runs; new days are filtered in and it is refit on a schedule
+forecaster = ARIMAForecaster(order=(5, 1, 0), path=os.path.join(DEFAULT_MODEL_DIR, "dji_arima.pkl"))
+
+def forecast(us30_data):
+    # Update the ARIMA model with any new observations
+    forecaster.update(us30_data)
     
     # Forecast for the next month (20 business days)
     forecast_steps = 20
-    forecast_results = model_fit.get_forecast(steps=forecast_steps)
-    forecast = forecast_results.predicted_mean
+    forecast = forecaster.forecast(steps=forecast_steps)
     return forecast
 
 def place_order(symbol, order_type, volume=0.1):
     if order_type == 'buy':
-        order = mt5.ORDER_BUY
+        order = mt5.ORDER_TYPE_BUY
     elif order_type == 'sell':
-        order = mt5.ORDER_SELL
+        order = mt5.ORDER_TYPE_SELL
     else:
         return
     
@@ -58,18 +62,23 @@ def place_order(symbol, order_type, volume=0.1):
 def main():
     symbol = '^DJI'
     
-    while True:
-        forecast_values = forecast(symbol)
-        last_price = fetch_data(symbol, '2024-10-10')[-1]  # Get the last available price
-        
-        if forecast_values[0] > last_price:
-            print("Placing Buy Order")
-            place_order(symbol, 'buy')
-        else:
-            print("Placing Sell Order")
-            place_order(symbol, 'sell')
+    try:
+        while True:
+            # Fetch historical data once per cycle for both the model and the last price
+            us30_data = fetch_data(symbol, '2024-10-10')
+            forecast_values = forecast(us30_data)
+            last_price = us30_data.dropna().iloc[-1]  # Get the last available price
+            
+            if forecast_values.iloc[0] > last_price:
+                print("Placing Buy Order")
+                place_order(symbol, 'buy')
+            else:
+                print("Placing Sell Order")
+                place_order(symbol, 'sell')
 
-        time.sleep(86400)  # Sleep for a day (86400 seconds)
+            clock.sleep(86400)  # Sleep for a day (86400 seconds)
+    except ReplayFinished:
+        print("Replay finished")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,146 @@
+import argparse
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+# Fitted models are kept next to the bar store unless MODEL_DIR points somewhere else
+DEFAULT_MODEL_DIR = os.environ.get(
+    "MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "models"),
+)
+
+
+class ARIMAForecaster:
+    """
+    ARIMA model that is fitted once and then only updated with new observations.
+    New bars are run through the Kalman filter with the existing parameters
+    (results.extend), which costs O(new bars) instead of a full maximum-likelihood
+    fit over the whole history. A full refit, warm-started from the current
+    parameters, happens every `refit_every` new observations or when the
+    standardized one-step forecast errors of the new bars drift above
+    `drift_threshold`.
+    The model itself runs on plain arrays; dates are only attached to the forecast,
+    because statsmodels' date-index handling costs O(history) on every extend.
+    :param path: Pickle file the model is persisted to between runs (None to disable)
+    """
+    def __init__(self, order=(5, 1, 0), path=None, refit_every=20, drift_threshold=3.0):
+        self.order = order
+        self.path = path
+        self.refit_every = refit_every
+        self.drift_threshold = drift_threshold
+        self.results = None
+        self.last_index = None
+        self.since_refit = 0
+        self.params = None
+        self.freq = None
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def fit(self, series):
+        """Full fit on the whole history, warm-started from the last parameters if any"""
+        model = ARIMA(series.to_numpy(dtype=float), order=self.order)
+        self.results = model.fit(start_params=self.params)
+        self.params = self.results.params
+        self.last_index = series.index[-1]
+        self.freq = series.index.freq or pd.infer_freq(series.index[-10:]) or "B"
+        self.since_refit = 0
+
+    def update(self, series):
+        """
+        Bring the model up to date with `series` (the full history so far).
+        Returns "fit", "extend" or "none" depending on the work done.
+        """
+        if self.results is None or self.last_index not in series.index:
+            self.fit(series)
+            action = "fit"
+        else:
+            new = series[series.index > self.last_index]
+            if new.empty:
+                return "none"
+            extended = self.results.extend(new.to_numpy(dtype=float))
+            self.since_refit += len(new)
+            if self.since_refit >= self.refit_every or self.drifted(extended, len(new)):
+                self.fit(series)
+                action = "fit"
+            else:
+                self.results = extended
+                self.last_index = new.index[-1]
+                action = "extend"
+        self.save()
+        return action
+
+    def drifted(self, results, count):
+        """True if the new bars' standardized forecast errors are too large on average"""
+        errors = results.filter_results.standardized_forecasts_error[0][-count:]
+        errors = errors[np.isfinite(errors)]
+        return errors.size > 0 and np.abs(errors).mean() > self.drift_threshold
+
+    def forecast(self, steps=20):
+        """Point forecast for the next `steps` periods, indexed by date"""
+        values = self.results.forecast(steps=steps)
+        index = pd.date_range(self.last_index, periods=steps + 1, freq=self.freq)[1:]
+        return pd.Series(values, index=index, name="predicted_mean")
+
+    def save(self):
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "wb") as f:
+            pickle.dump({
+                "order": self.order,
+                "results": self.results,
+                "last_index": self.last_index,
+                "since_refit": self.since_refit,
+                "params": self.params,
+                "freq": self.freq,
+            }, f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            state = pickle.load(f)
+        if tuple(state["order"]) != tuple(self.order):
+            return  # Different model, start over
+        self.results = state["results"]
+        self.last_index = state["last_index"]
+        self.since_refit = state["since_refit"]
+        self.params = state["params"]
+        self.freq = state["freq"]
+
+
+# Function to compare incremental updates against a full refit
+def benchmark(years=(1, 5, 10, 20), order=(5, 1, 0), seed=0):
+    """
+    Time a full ARIMA fit against a one-bar extend on synthetic business-day
+    random walks of growing length. Returns a DataFrame of seconds per update.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for n_years in years:
+        n = n_years * 260
+        index = pd.bdate_range("2000-01-03", periods=n + 1)
+        series = pd.Series(30000 + np.cumsum(rng.normal(0, 100, n + 1)), index=index)
+
+        forecaster = ARIMAForecaster(order=order, refit_every=10**9, drift_threshold=np.inf)
+        start = time.perf_counter()
+        forecaster.fit(series.iloc[:-1])
+        full = time.perf_counter() - start
+
+        start = time.perf_counter()
+        forecaster.update(series)
+        incremental = time.perf_counter() - start
+        rows.append({"years": n_years, "bars": n, "full_fit_s": full,
+                     "extend_s": incremental, "speedup": full / incremental})
+    return pd.DataFrame(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="ARIMA incremental update benchmark")
+    parser.add_argument("--years", default="1,5,10,20", help="History lengths to test")
+    args = parser.parse_args()
+    print(benchmark([int(y) for y in args.years.split(",")]).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
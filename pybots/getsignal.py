@@ -1,6 +1,6 @@
 from datetime import datetime
 import backtrader as bt
-import yfinance as yf
+import barstore
 
 # Create a subclass of SignalStrategy to define the indicators and signals
 class SmaCross(bt.SignalStrategy):
@@ -17,9 +17,9 @@ class SmaCross(bt.SignalStrategy):
 
 cerebro = bt.Cerebro()  # create a "Cerebro" engine instance
 
-# Create a data feed with yfinance
+# Create a data feed from the local bar store (downloads with yfinance on first run)
 data = bt.feeds.PandasData(
-    dataname=yf.download('MSFT', start='2024-08-01', end='2024-10-24')
+    dataname=barstore.download('MSFT', '2024-08-01', '2024-10-24')
 )
 
 cerebro.adddata(data)  # Add the data feed
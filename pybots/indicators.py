@@ -0,0 +1,174 @@
+from collections import deque
+import numpy as np
+
+
+class SMA:
+    """Simple moving average kept as a running sum over the last `period` values"""
+    def __init__(self, period):
+        self.period = period
+        self.window = deque()
+        self.total = 0.0
+        self.updates = 0
+        self.value = None
+
+    def update(self, x):
+        self.window.append(x)
+        self.total += x
+        if len(self.window) > self.period:
+            self.total -= self.window.popleft()
+        self.updates += 1
+        if self.updates % (self.period * 100) == 0:
+            # Re-sum now and then so float error in the running total can't build up
+            self.total = sum(self.window)
+        if len(self.window) == self.period:
+            self.value = self.total / self.period
+        return self.value
+
+
+class EMA:
+    """Exponential moving average, same as pandas ewm(span=period, adjust=False)"""
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingMax:
+    """Rolling maximum over the last `period` values using a monotonic deque"""
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.window = deque()  # (index, value), values decreasing
+        self.value = None
+
+    def _better(self, a, b):
+        return a >= b
+
+    def update(self, x):
+        while self.window and self._better(x, self.window[-1][1]):
+            self.window.pop()
+        self.window.append((self.count, x))
+        if self.window[0][0] <= self.count - self.period:
+            self.window.popleft()
+        self.count += 1
+        if self.count >= self.period:
+            self.value = self.window[0][1]
+        return self.value
+
+
+class RollingMin(RollingMax):
+    """Rolling minimum over the last `period` values using a monotonic deque"""
+    def _better(self, a, b):
+        return a <= b
+
+
+class RSI:
+    """Relative strength index with Wilder smoothing"""
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value = None
+
+    def update(self, x):
+        if self.prev is None:
+            self.prev = x
+            return self.value
+        change = x - self.prev
+        self.prev = x
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        self.count += 1
+        if self.count <= self.period:
+            # Seed with the plain average of the first `period` changes
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            if self.count < self.period:
+                return self.value
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        if self.avg_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+        return self.value
+
+
+class IndicatorEngine:
+    """Streaming indicators for one symbol, seeded once and fed only newly closed bars"""
+    def __init__(self, fast=20, slow=50, channel=20, ema=20, rsi=14):
+        self.sma_fast = SMA(fast)
+        self.sma_slow = SMA(slow)
+        self.high_max = RollingMax(channel)
+        self.low_min = RollingMin(channel)
+        self.ema = EMA(ema)
+        self.rsi = RSI(rsi)
+        self.params = (fast, slow, channel, ema, rsi)
+        self.warmup = max(fast, slow, channel, rsi + 1)
+        self.last_time = None
+        self.bars = 0
+        self.close = None
+        self.prev_sma_fast = None
+        self.prev_sma_slow = None
+
+    @property
+    def ready(self):
+        """True once every indicator (and the previous SMA values) is defined"""
+        return self.bars > self.warmup
+
+    def seed(self, rates):
+        """Reset and load the engine from a history of closed bars"""
+        self.__init__(*self.params)
+        self.update(rates)
+
+    def update(self, rates):
+        """
+        Ingest bars newer than the last one seen.
+        `rates` is an MT5 rates array or a marketdata.Rates; only its time, high,
+        low and close columns are read, as views, and only for the new bars.
+        Returns False if `rates` does not overlap the last seen bar, meaning
+        bars may have been missed and the engine has to be re-seeded.
+        """
+        if rates is None or len(rates) == 0:
+            return True
+        times = rates['time']
+        start = 0
+        if self.last_time is not None:
+            if times[0] > self.last_time:
+                return False
+            start = int(np.searchsorted(times, self.last_time, side='right'))
+        if start == len(times):
+            return True
+        # One conversion per column instead of a record lookup per field per bar
+        for t, high, low, close in zip(times[start:].tolist(), rates['high'][start:].tolist(),
+                                       rates['low'][start:].tolist(), rates['close'][start:].tolist()):
+            self.add(t, high, low, close)
+        return True
+
+    def add_bar(self, bar):
+        """Advance every indicator by one closed bar (a rates record)"""
+        self.add(bar['time'], float(bar['high']), float(bar['low']), float(bar['close']))
+
+    def add(self, time, high, low, close):
+        """Advance every indicator by one closed bar given as plain floats"""
+        self.prev_sma_fast = self.sma_fast.value
+        self.prev_sma_slow = self.sma_slow.value
+        self.sma_fast.update(close)
+        self.sma_slow.update(close)
+        self.high_max.update(high)
+        self.low_min.update(low)
+        self.ema.update(close)
+        self.rsi.update(close)
+        self.close = close
+        self.last_time = time
+        self.bars += 1
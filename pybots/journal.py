@@ -0,0 +1,417 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from scheduler import WALL_CLOCK
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+# The journal is <repo>/data/journal.sqlite unless JOURNAL_PATH points somewhere else
+DEFAULT_PATH = os.environ.get("JOURNAL_PATH", os.path.join(DATA_DIR, "journal.sqlite"))
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "docs", "tradeJournal.xlsx")
+
+# Columns of the weekly sheets in docs/tradeJournal.xlsx (header row 4, trades from row 5)
+SHEET_COLUMNS = ["#", "Time", "Currency", "Direction", "Entry Price", "Exit Price", "Position Size", "S/L", "T/P"]
+HEADER_ROW = 4
+
+# Hours the trade server's clock is ahead of UTC (MT5 deal times are server time)
+SERVER_UTC_OFFSET = float(os.environ.get("SERVER_UTC_OFFSET", "0"))
+# Replays set JOURNAL_RUN: simulator tickets restart at 1 every run, live MT5 tickets are unique ("")
+RUN = os.environ.get("JOURNAL_RUN", "")
+
+log = logging.getLogger("journal")
+
+# Deal tickets are only unique within a run (see RUN)
+FILLS_TABLE = """
+CREATE TABLE IF NOT EXISTS fills (
+    ticket INTEGER NOT NULL, time REAL NOT NULL, bot TEXT, symbol TEXT NOT NULL, type INTEGER,
+    entry INTEGER, volume REAL, price REAL, profit REAL, commission REAL, swap REAL,
+    magic INTEGER, position_id INTEGER, order_ticket INTEGER, comment TEXT, server_time REAL,
+    run TEXT NOT NULL DEFAULT '', PRIMARY KEY (run, ticket))"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    time REAL NOT NULL, bot TEXT, symbol TEXT NOT NULL, side TEXT, volume REAL, price REAL,
+    sl REAL, tp REAL, magic INTEGER, retcode INTEGER, order_ticket INTEGER, deal_ticket INTEGER, comment TEXT,
+    run TEXT NOT NULL DEFAULT '');
+CREATE INDEX IF NOT EXISTS orders_symbol_time ON orders (symbol, time);
+CREATE INDEX IF NOT EXISTS orders_time ON orders (time);
+CREATE INDEX IF NOT EXISTS orders_ticket ON orders (order_ticket);
+""" + FILLS_TABLE + """;
+CREATE INDEX IF NOT EXISTS fills_symbol_time ON fills (symbol, time);
+CREATE INDEX IF NOT EXISTS fills_time ON fills (time);
+CREATE INDEX IF NOT EXISTS fills_position ON fills (position_id);
+
+CREATE TABLE IF NOT EXISTS equity (
+    time REAL NOT NULL, bot TEXT, balance REAL, equity REAL, margin REAL);
+CREATE INDEX IF NOT EXISTS equity_bot_time ON equity (bot, time);
+
+CREATE TABLE IF NOT EXISTS signals (
+    time REAL NOT NULL, bot TEXT, symbol TEXT NOT NULL, strategy TEXT, signal TEXT, inputs TEXT);
+CREATE INDEX IF NOT EXISTS signals_symbol_time ON signals (symbol, time);
+"""
+
+INSERTS = {
+    "orders": "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    # Fills can be reported twice (resyncs, restarts); (run, deal ticket) keeps one copy
+    "fills": "INSERT OR IGNORE INTO fills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "equity": "INSERT INTO equity VALUES (?, ?, ?, ?, ?)",
+    "signals": "INSERT INTO signals VALUES (?, ?, ?, ?, ?, ?)",
+}
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    # WAL: one writer appends while readers (queries, exports, other bots) keep reading
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def migrate(conn):
+    """Bring tables written by older versions up to SCHEMA (run before it)"""
+    def columns(table):
+        return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    orders = columns("orders")
+    if orders and "run" not in orders:
+        conn.execute("ALTER TABLE orders ADD COLUMN run TEXT NOT NULL DEFAULT ''")
+    fills = columns("fills")
+    if fills and "run" not in fills:
+        # Fills were keyed by the deal ticket alone: rebuild them keyed by (run, ticket)
+        with conn:
+            conn.execute("BEGIN")
+            if "server_time" not in fills:
+                conn.execute("ALTER TABLE fills ADD COLUMN server_time REAL")
+            conn.execute("ALTER TABLE fills RENAME TO fills_old")
+            for index in ("fills_symbol_time", "fills_time", "fills_position"):
+                conn.execute(f"DROP INDEX IF EXISTS {index}")
+            conn.execute(FILLS_TABLE)
+            conn.execute("INSERT INTO fills SELECT *, '' FROM fills_old")
+            conn.execute("DROP TABLE fills_old")
+
+def to_epoch(value):
+    """Epoch seconds from None, a number, a datetime or a date string"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class TradeJournal:
+    """
+    Append-only trade journal in SQLite (WAL mode), shared by every bot.
+    Orders, fills, equity snapshots and signal inputs are queued by the caller
+    and written by a background thread in batches: one transaction per
+    `flush_interval` seconds or `batch_size` rows. Nothing is kept in memory
+    beyond the pending batch, so a bot can run indefinitely.
+    Recording never blocks the caller: when `queue_size` rows are pending (the
+    writer is stuck on a locked or full disk) new rows are dropped and counted.
+    A failed commit is retried `retries` times, then its batch is dropped and
+    logged, and the writer carries on.
+    Every `time` column is UTC epoch seconds. Fills come with trade-server time,
+    which is shifted by `server_utc_offset` hours; the raw value is kept in
+    fills.server_time.
+    Queries open their own connection and return pandas DataFrames.
+    :param bot: Name stored with every row (e.g. "fxbot")
+    :param queue_size: Pending rows before new ones are dropped, bounding memory
+    :param clock: Time source for orders, equity and signals; pass
+                  scheduler.get_clock(mt5) so a replay is stamped in replay time
+    :param run: Stored with orders and fills; tickets are unique per run (see RUN)
+    """
+    def __init__(self, path=DEFAULT_PATH, bot=None, batch_size=500, flush_interval=1.0, queue_size=10000,
+                 retries=3, retry_delay=1.0, server_utc_offset=SERVER_UTC_OFFSET, clock=None, run=RUN):
+        self.path = path
+        self.bot = bot
+        self.run_id = run
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.server_offset = server_utc_offset * 3600
+        self.clock = clock or WALL_CLOCK
+        self.dropped = 0  # Rows never queued because the queue was full
+        self.failed = 0  # Rows in batches that could not be committed
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = connect(path)
+        migrate(conn)
+        conn.executescript(SCHEMA)
+        conn.close()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    # Recording (any thread)
+
+    def order(self, request, result=None, bot=None):
+        """An order_send request and its result (None if the call itself failed)"""
+        order_type = request.get("type")
+        side = "buy" if order_type == 0 else "sell" if order_type == 1 else None
+        self.put(("orders", (
+            self.clock.time(), bot or self.bot, request.get("symbol"), side, request.get("volume"),
+            request.get("price"), request.get("sl"), request.get("tp"), request.get("magic"),
+            None if result is None else result.retcode, None if result is None else result.order,
+            None if result is None else result.deal, request.get("comment"), self.run_id)))
+
+    def fill(self, deal, bot=None):
+        """A trade deal from history_deals_get (entries, exits, SL/TP hits)"""
+        self.put(("fills", (
+            deal.ticket, deal.time - self.server_offset, bot or self.bot, deal.symbol, deal.type, deal.entry,
+            deal.volume, deal.price, deal.profit, deal.commission, deal.swap, deal.magic, deal.position_id,
+            deal.order, deal.comment, deal.time, self.run_id)))
+
+    def equity(self, account, bot=None):
+        """An account_info() snapshot"""
+        if account is None:
+            return
+        self.put(("equity", (self.clock.time(), bot or self.bot, account.balance, account.equity, account.margin)))
+
+    def signal(self, symbol, strategy, signal, inputs=None, bot=None):
+        """A strategy decision and the values it was based on (any JSON-serializable dict)"""
+        self.put(("signals", (self.clock.time(), bot or self.bot, symbol, strategy, signal,
+                              json.dumps(inputs or {}, default=float))))
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued so far is written; False on timeout"""
+        done = threading.Event()
+        try:
+            self.queue.put(("flush", done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=30.0):
+        """Write what is pending and stop the writer (gives up after `timeout` seconds)"""
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            log.error("Trade journal: writer not keeping up, closing with rows unwritten")
+            return
+        self.worker.join(timeout)
+
+    # Writer thread
+
+    def run(self):
+        conn = connect(self.path)
+        pending = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ("flush", None)
+            if item is not None and item[0] != "flush":
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(pending) < self.batch_size:
+                    continue
+            self.write(conn, pending)
+            pending = []
+            deadline = None
+            if item is None:
+                break
+            if item[0] == "flush" and item[1] is not None:
+                item[1].set()
+        conn.close()
+
+    def write(self, conn, pending):
+        """Commit one batch, retrying on errors such as a locked database; drop it if that fails"""
+        if not pending:
+            return
+        rows = {}
+        for table, row in pending:
+            rows.setdefault(table, []).append(row)
+        for attempt in range(self.retries + 1):
+            try:
+                with conn:
+                    for table, batch in rows.items():
+                        conn.executemany(INSERTS[table], batch)
+                return
+            except sqlite3.Error as e:
+                if attempt < self.retries:
+                    time.sleep(self.retry_delay * 2 ** attempt)
+                    continue
+                self.failed += len(pending)
+                log.error("Trade journal: dropped %d rows after %d attempts: %s", len(pending), attempt + 1, e)
+
+    # Queries
+
+    def query(self, sql, params=()):
+        import pandas as pd
+        conn = connect(self.path)
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    def select(self, table, symbol=None, start=None, end=None, bot=None):
+        """Rows of one table, filtered on the indexed symbol/time (and bot) columns"""
+        where, params = [], []
+        if symbol is not None:
+            where.append("symbol = ?")
+            params.append(symbol)
+        if bot is not None:
+            where.append("bot = ?")
+            params.append(bot)
+        if start is not None:
+            where.append("time >= ?")
+            params.append(to_epoch(start))
+        if end is not None:
+            where.append("time < ?")
+            params.append(to_epoch(end))
+        sql = f"SELECT * FROM {table}" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY time"
+        return self.query(sql, params)
+
+    def orders(self, symbol=None, start=None, end=None, bot=None):
+        return self.select("orders", symbol, start, end, bot)
+
+    def fills(self, symbol=None, start=None, end=None, bot=None):
+        return self.select("fills", symbol, start, end, bot)
+
+    def signals(self, symbol=None, start=None, end=None, bot=None):
+        return self.select("signals", symbol, start, end, bot)
+
+    def equity_curve(self, bot=None, start=None, end=None):
+        return self.select("equity", None, start, end, bot)
+
+    def round_trips(self, symbol=None, start=None, end=None):
+        """
+        One row per position (per run) opened in [start, end): open time, symbol, side,
+        volume-weighted entry and exit prices, size, and the order's SL/TP.
+        Exit price is NaN while the position is open.
+        """
+        where, params = ["f.type IN (0, 1)"], []
+        if symbol is not None:
+            where.append("f.symbol = ?")
+            params.append(symbol)
+        having = []
+        if start is not None:
+            having.append("open_time >= ?")
+            params.append(to_epoch(start))
+        if end is not None:
+            having.append("open_time < ?")
+            params.append(to_epoch(end))
+        sql = f"""
+            SELECT t.*, o.sl, o.tp FROM (
+                SELECT f.run, f.position_id,
+                       MIN(CASE WHEN f.entry = 0 THEN f.time END) AS open_time,
+                       MIN(f.symbol) AS symbol,
+                       MIN(CASE WHEN f.entry = 0 THEN f.type END) AS type,
+                       SUM(CASE WHEN f.entry = 0 THEN f.price * f.volume END)
+                           / SUM(CASE WHEN f.entry = 0 THEN f.volume END) AS entry_price,
+                       SUM(CASE WHEN f.entry != 0 THEN f.price * f.volume END)
+                           / SUM(CASE WHEN f.entry != 0 THEN f.volume END) AS exit_price,
+                       SUM(CASE WHEN f.entry = 0 THEN f.volume END) AS volume,
+                       SUM(f.profit) AS profit,
+                       MIN(CASE WHEN f.entry = 0 THEN f.order_ticket END) AS order_ticket
+                FROM fills f
+                WHERE {" AND ".join(where)}
+                GROUP BY f.run, f.position_id
+                HAVING open_time IS NOT NULL{"".join(" AND " + h for h in having)}
+            ) t
+            LEFT JOIN orders o ON o.order_ticket = t.order_ticket AND o.run = t.run AND o.retcode = 10009
+            ORDER BY t.open_time
+        """
+        return self.query(sql, params)
+
+    # Spreadsheet export
+
+    def export_xlsx(self, path, symbol=None, start=None, end=None, template=DEFAULT_TEMPLATE):
+        """
+        Write round trips to an .xlsx in the docs/tradeJournal.xlsx layout: one
+        sheet per ISO week, header on row 4, one trade per row. The template's
+        first sheet is copied for its formatting when it can be read.
+        Returns the number of trades written.
+        """
+        import openpyxl
+
+        trips = self.round_trips(symbol, start, end)
+        workbook, base = None, None
+        if template is not None and os.path.exists(template):
+            workbook = openpyxl.load_workbook(template)
+            base = workbook.worksheets[0]
+        else:
+            workbook = openpyxl.Workbook()
+            base = workbook.active
+            base["C2"] = "Weekly Trading Journal"
+            for col, name in enumerate(SHEET_COLUMNS, start=1):
+                base.cell(row=HEADER_ROW, column=col, value=name)
+        originals = list(workbook.worksheets)
+
+        times = [datetime.fromtimestamp(t, tz=timezone.utc).replace(tzinfo=None) for t in trips["open_time"]]
+        weeks = {}
+        for i, opened in enumerate(times):
+            year, week, _ = opened.isocalendar()
+            weeks.setdefault((year, week), []).append(i)
+
+        for (year, week), rows in sorted(weeks.items()):
+            sheet = workbook.copy_worksheet(base)
+            sheet.title = f"{year}-W{week:02d}"
+            # Blank the template's example trades, keep its formatting
+            for row in sheet.iter_rows(min_row=HEADER_ROW + 1, max_col=len(SHEET_COLUMNS)):
+                for cell in row:
+                    cell.value = None
+            for n, i in enumerate(rows, start=1):
+                trip = trips.iloc[i]
+                exit_price = trip["exit_price"]
+                values = [n, times[i], trip["symbol"], "UP" if trip["type"] == 0 else "DOWN",
+                          trip["entry_price"], None if exit_price != exit_price else exit_price,
+                          trip["volume"], trip["sl"], trip["tp"]]
+                for col, value in enumerate(values, start=1):
+                    if isinstance(value, float) and value != value:
+                        value = None
+                    cell = sheet.cell(row=HEADER_ROW + n, column=col,
+                                      value=value.item() if hasattr(value, "item") else value)
+                    if col == 2:
+                        cell.number_format = "yyyy-mm-dd hh:mm:ss"
+
+        if weeks:
+            for sheet in originals:
+                workbook.remove(sheet)
+        workbook.save(path)
+        return len(trips)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or export the trade journal")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Write round trips in the tradeJournal.xlsx layout")
+    export.add_argument("path")
+    show = sub.add_parser("show", help="Print one table")
+    show.add_argument("table", choices=["orders", "fills", "equity", "signals", "trips"])
+    for p in (export, show):
+        p.add_argument("--symbol")
+        p.add_argument("--start", help="ISO date, e.g. 2025-01-01")
+        p.add_argument("--end")
+    args = parser.parse_args()
+
+    journal = TradeJournal(args.db)
+    try:
+        if args.command == "export":
+            n = journal.export_xlsx(args.path, args.symbol, args.start, args.end)
+            print(f"Wrote {n} trades to {args.path}")
+        elif args.table == "trips":
+            print(journal.round_trips(args.symbol, args.start, args.end).to_string(index=False))
+        elif args.table == "equity":
+            print(journal.equity_curve(start=args.start, end=args.end).to_string(index=False))
+        else:
+            print(journal.select(args.table, args.symbol, args.start, args.end).to_string(index=False))
+    finally:
+        journal.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import bisect
+import json
+import os
+import time
+
+# Bucket upper bounds in nanoseconds: 1 us to ~100 s, four buckets per doubling (~19% resolution)
+BUCKET_BOUNDS = [int(1000 * 2 ** (i / 4)) for i in range(4 * 27)]
+DEFAULT_DUMP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "latency.json")
+
+
+class Histogram:
+    """Fixed log-spaced latency buckets; recording is one bisect and three adds"""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q):
+        """Upper bound (ns) of the bucket holding the q-th percentile, capped at the max seen"""
+        if self.count == 0:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+
+class Stage:
+    """Context manager that times one pass through a stage"""
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter_ns() - self.start)
+        return False
+
+
+class NullStage:
+    """Stand-in returned while recording is off: nothing is timed or stored"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+class LatencyRecorder:
+    """
+    Per-stage latency histograms for a hot path, e.g.
+        with latency.stage("order_send"):
+            result = mt5.order_send(request)
+    While disabled, stage() hands back a shared no-op context manager, so the
+    instrumented code pays one attribute check per stage and records nothing.
+    Histograms are written by the trading thread only; snapshot() may be read
+    from the GUI thread (a count can be one sample behind, which is harmless).
+    :param enabled: Start with recording on
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}  # stage name -> Histogram, in first-seen order
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_STAGE
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return Stage(histogram)
+
+    def reset(self):
+        self.histograms = {}
+
+    def snapshot(self):
+        """{stage: {count, mean_ms, p50_ms, p99_ms, max_ms}}"""
+        stats = {}
+        for name, h in list(self.histograms.items()):
+            if h.count == 0:
+                continue
+            stats[name] = {
+                "count": h.count,
+                "mean_ms": h.total / h.count / 1e6,
+                "p50_ms": h.percentile(50) / 1e6,
+                "p99_ms": h.percentile(99) / 1e6,
+                "max_ms": h.max / 1e6,
+            }
+        return stats
+
+    def dump(self, path=DEFAULT_DUMP_PATH):
+        """Write the snapshot as JSON and return the path"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "stages": self.snapshot()}, f, indent=2)
+        return path
+
+
+def format_table(stats):
+    """Plain-text table of a snapshot, slowest p99 first"""
+    lines = [f"{'stage':<16}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]["p99_ms"]):
+        lines.append(f"{name:<16}{s['count']:>8}{s['p50_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}")
+    return "\n".join(lines)
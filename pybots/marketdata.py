@@ -0,0 +1,151 @@
+import threading
+from scheduler import get_clock
+
+# MT5 symbol filling_mode flags (SYMBOL_FILLING_FOK / SYMBOL_FILLING_IOC)
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+
+class Rates:
+    """
+    Column access to a copy_rates_* result without copying it.
+    rates.close, rates.high, ... (or rates["close"]) are NumPy views into the
+    terminal's structured array, so indicator and strategy code reads the buffer
+    directly. frame() builds a pandas DataFrame only when something wants one
+    (display, export) and keeps it for this batch.
+    """
+    __slots__ = ("array", "_frame")
+
+    def __init__(self, array):
+        self.array = array
+        self._frame = None
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, key):
+        return self.array[key]
+
+    @property
+    def time(self):
+        return self.array["time"]
+
+    @property
+    def open(self):
+        return self.array["open"]
+
+    @property
+    def high(self):
+        return self.array["high"]
+
+    @property
+    def low(self):
+        return self.array["low"]
+
+    @property
+    def close(self):
+        return self.array["close"]
+
+    @property
+    def tick_volume(self):
+        return self.array["tick_volume"]
+
+    def frame(self):
+        """DataFrame indexed by bar time, built on first use"""
+        if self._frame is None:
+            import pandas as pd
+            self._frame = pd.DataFrame(self.array)
+            self._frame["time"] = pd.to_datetime(self._frame["time"], unit="s")
+            self._frame.set_index("time", inplace=True)
+        return self._frame
+
+
+class MarketData:
+    """
+    Shared cache in front of the MT5 terminal for the order hot path.
+    Symbol specs (point, digits, volume step, filling modes...) rarely change and
+    are kept for `spec_ttl` seconds. Account info is kept for `account_ttl`
+    seconds and dropped after every order. Ticks are never cached: call tick()
+    once per decision and reuse the snapshot.
+    :param mt5: The MetaTrader5 module (or anything with the same API)
+    The TTLs follow the broker's clock (replay time on the simulator).
+    """
+    def __init__(self, mt5, spec_ttl=3600.0, account_ttl=1.0):
+        self.mt5 = mt5
+        self.clock = get_clock(mt5)
+        self.spec_ttl = spec_ttl
+        self.account_ttl = account_ttl
+        self.specs = {}  # symbol -> (fetched_at, symbol_info)
+        self.account = None  # (fetched_at, account_info)
+        self.lock = threading.Lock()
+
+    def symbol_info(self, symbol):
+        """Cached symbol spec, or None if the symbol does not exist"""
+        now = self.clock.monotonic()
+        with self.lock:
+            cached = self.specs.get(symbol)
+            if cached is not None and now - cached[0] < self.spec_ttl:
+                return cached[1]
+
+        info = self.mt5.symbol_info(symbol)
+        if info is None:
+            return None
+        if not info.visible:
+            self.mt5.symbol_select(symbol, True)
+        with self.lock:
+            self.specs[symbol] = (now, info)
+        return info
+
+    def tick(self, symbol):
+        """Fresh tick snapshot, fetched once; use its bid/ask for the whole decision"""
+        return self.mt5.symbol_info_tick(symbol)
+
+    def rates(self, symbol, timeframe, start_pos, count):
+        """Bars from copy_rates_from_pos as a Rates (never cached), or None on failure"""
+        array = self.mt5.copy_rates_from_pos(symbol, timeframe, start_pos, count)
+        if array is None or len(array) == 0:
+            return None
+        return Rates(array)
+
+    def account_info(self):
+        """Account info, re-fetched at most every `account_ttl` seconds"""
+        now = self.clock.monotonic()
+        with self.lock:
+            if self.account is not None and now - self.account[0] < self.account_ttl:
+                return self.account[1]
+        info = self.mt5.account_info()
+        if info is not None:
+            with self.lock:
+                self.account = (now, info)
+        return info
+
+    def filling_type(self, symbol, preferred):
+        """
+        Pick an order filling type the symbol supports, trying `preferred` first.
+        Falls back to `preferred` if the spec is unavailable.
+        """
+        info = self.symbol_info(symbol)
+        if info is None:
+            return preferred
+        supported = []
+        if info.filling_mode & SYMBOL_FILLING_FOK:
+            supported.append(self.mt5.ORDER_FILLING_FOK)
+        if info.filling_mode & SYMBOL_FILLING_IOC:
+            supported.append(self.mt5.ORDER_FILLING_IOC)
+        if preferred in supported or not supported:
+            return preferred
+        return supported[0]
+
+    def invalidate(self, symbol=None):
+        """Drop cached specs for one symbol (or all) and the cached account info"""
+        with self.lock:
+            if symbol is None:
+                self.specs.clear()
+            else:
+                self.specs.pop(symbol, None)
+            self.account = None
+
+    def invalidate_account(self):
+        """Drop cached account info, e.g. after an order changed the margin"""
+        with self.lock:
+            self.account = None
@@ -1,38 +1,102 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import MetaTrader5 as mt5
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import time
+import threading
+import queue
+import logging
+from strategies import STRATEGIES, new_engine, strategy_order
+from scheduler import BarScheduler, ReplayFinished, TIMEFRAME_SECONDS, get_clock
+from marketdata import MarketData
+from broker import get_broker
+from positionbook import PositionBook
+from risk import RiskEngine
+from botlog import BotLog, LogView
+from latency import LatencyRecorder, format_table
+from journal import TradeJournal
+
+mt5 = get_broker()  # MetaTrader5 terminal, or the simulator when BROKER=sim
+
+# Strategy timeframe, and how often the GUI drains the worker's message queue
+# (this also caps the log view at 10 refreshes per second)
+TIMEFRAME = mt5.TIMEFRAME_M15
+TIMEFRAME_NAME = "M15"
+UI_POLL_MS = 100
+
+# Lines kept in memory and in the log view; older lines are only in data/logs
+LOG_CAPACITY = 2000
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+# How often the latency window redraws
+LATENCY_REFRESH_MS = 1000
+
+# Bars used to seed the indicator engine, and bars re-read each cycle to pick up new closes
+SEED_BARS = 100
+UPDATE_BARS = 3
+
+# Stop-loss and take-profit distance of every order, in points; lots are sized to risk the stop
+SL_POINTS = 100
+TP_POINTS = 200
 
 class MT5TradingBot:
     def __init__(self, root):
         self.root = root
         self.root.title("MT5 Daily Trading Bot")
         self.root.geometry("800x600")
-        
-        # Connection variables
-        self.connected = False
-        self.symbol = "XAUUSD"  # Gold trading symbol
+        self.init_state()
         
         # GUI Setup
         self.setup_connection_frame()
         self.setup_trading_frame()
         self.setup_log_frame()
+        self.root.after(UI_POLL_MS, self.process_ui_queue)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Initialize MT5
         self.initialize_mt5()
     
+    @classmethod
+    def headless(cls, settings):
+        """A bot without a window (for replays, see simrun.py); call run_trading_loop() directly"""
+        bot = cls.__new__(cls)
+        bot.root = None
+        bot.init_state()
+        bot.settings = settings
+        return bot
+    
+    def init_state(self):
+        """Connection, trading and logging state: everything but the widgets"""
+        # Connection variables
+        self.connected = False
+        self.symbol = "XAUUSD"  # Gold trading symbol
+        self.clock = get_clock(mt5)  # Wall time, or replay time on the simulator
+        self.engines = {}  # Per-symbol indicator state
+        self.market = MarketData(mt5)  # Cached symbol specs and account info
+        self.journal = TradeJournal(bot="mt5dailybot", clock=self.clock)  # Orders, fills, equity and signals on disk
+        self.book = PositionBook(mt5, on_deal=self.journal.fill)  # Open positions, updated from new deals each cycle
+        self.risk = RiskEngine(mt5, self.market, self.book)  # Lot sizing and portfolio limits
+        
+        # Trading runs in a worker thread; it talks to the GUI only through ui_queue
+        self.trading_active = False
+        self.worker = None
+        self.stop_event = threading.Event()
+        self.ui_queue = queue.Queue()
+        self.settings = {}
+        
+        # Bounded in-memory log for the view, rotating text/JSON files written by a background thread
+        self.log = BotLog("mt5dailybot", capacity=LOG_CAPACITY)
+        
+        # Per-stage timings of the trading cycle (rates, indicators, sizing, order_send...)
+        self.latency = LatencyRecorder()
+        self.latency_window = None
+    
     def initialize_mt5(self):
         """Initialize MT5 connection if library is available"""
         try:
             if not mt5.initialize():
-                self.log_message("MT5 initialization failed")
+                self.log_message("MT5 initialization failed", logging.ERROR)
             else:
                 self.log_message("MT5 library loaded successfully (not connected yet)")
         except Exception as e:
-            self.log_message(f"Error loading MT5: {str(e)}")
+            self.log_message(f"Error loading MT5: {str(e)}", logging.ERROR)
     
     def setup_connection_frame(self):
         """Setup the connection frame"""
@@ -78,9 +142,9 @@ class MT5TradingBot:
         trading_frame = ttk.LabelFrame(self.root, text="Trading Parameters", padding=10)
         trading_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        # Symbol selection
-        ttk.Label(trading_frame, text="Symbol:").grid(row=0, column=0, sticky=tk.W)
-        self.symbol_entry = ttk.Entry(trading_frame, width=10)
+        # Symbol selection (comma-separated watchlist)
+        ttk.Label(trading_frame, text="Symbols:").grid(row=0, column=0, sticky=tk.W)
+        self.symbol_entry = ttk.Entry(trading_frame, width=40)
         self.symbol_entry.grid(row=0, column=1, padx=5, pady=2, sticky=tk.W)
         self.symbol_entry.insert(0, "XAUUSD")
         
@@ -107,7 +171,7 @@ class MT5TradingBot:
         self.strategy_combobox = ttk.Combobox(
             trading_frame, 
             textvariable=self.strategy_var,
-            values=["Mean Reversion", "Breakout", "Moving Average Crossover"]
+            values=STRATEGIES
         )
         self.strategy_combobox.grid(row=4, column=1, padx=5, pady=2, sticky=tk.W)
         self.strategy_combobox.current(0)
@@ -128,6 +192,13 @@ class MT5TradingBot:
             foreground="red"
         )
         self.trading_status.grid(row=6, column=0, columnspan=2)
+        
+        # Hot path timings
+        ttk.Button(
+            trading_frame,
+            text="Latency...",
+            command=self.show_latency
+        ).grid(row=7, column=0, columnspan=2, pady=5)
     
     def setup_log_frame(self):
         """Setup the logging frame"""
@@ -147,6 +218,7 @@ class MT5TradingBot:
         scrollbar = ttk.Scrollbar(log_frame, command=self.log_text.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.log_text.config(yscrollcommand=scrollbar.set)
+        self.log_view = LogView(self.log_text, self.log.ring)
         
         # Clear log button
         clear_button = ttk.Button(
@@ -155,6 +227,18 @@ class MT5TradingBot:
             command=self.clear_log
         )
         clear_button.pack(side=tk.BOTTOM, pady=5)
+        
+        # Minimum level shown and written to the log files
+        self.log_level_var = tk.StringVar(value="INFO")
+        level_combo = ttk.Combobox(
+            log_frame,
+            textvariable=self.log_level_var,
+            values=LOG_LEVELS,
+            state="readonly",
+            width=10
+        )
+        level_combo.bind("<<ComboboxSelected>>", lambda e: self.log.set_level(self.log_level_var.get()))
+        level_combo.pack(side=tk.BOTTOM, pady=5)
     
     def toggle_connection(self):
         """Connect or disconnect from MT5"""
@@ -171,7 +255,7 @@ class MT5TradingBot:
         
         try:
             if not mt5.initialize():
-                self.log_message("MT5 initialization failed")
+                self.log_message("MT5 initialization failed", logging.ERROR)
                 return
             
             authorized = mt5.login(login, password, server)
@@ -189,13 +273,19 @@ class MT5TradingBot:
                 self.log_message(f"Equity: {account_info.equity}")
                 self.log_message(f"Margin: {account_info.margin}")
             else:
-                self.log_message(f"Connection failed: {mt5.last_error()}")
+                self.log_message(f"Connection failed: {mt5.last_error()}", logging.ERROR)
         except Exception as e:
-            self.log_message(f"Connection error: {str(e)}")
+            self.log_message(f"Connection error: {str(e)}", logging.ERROR)
     
     def disconnect_from_mt5(self):
         """Disconnect from MT5"""
+        if self.trading_active:
+            self.stop_trading()
+        self.join_worker()
         mt5.shutdown()
+        self.market.invalidate()
+        self.book.clear()
+        self.risk.invalidate()
         self.connected = False
         self.connect_button.config(text="Connect")
         self.connection_status.config(text="Disconnected", foreground="red")
@@ -204,9 +294,6 @@ class MT5TradingBot:
     
     def toggle_trading(self):
         """Start or stop the trading bot"""
-        if not hasattr(self, 'trading_active'):
-            self.trading_active = False
-        
         if not self.trading_active:
             self.start_trading()
         else:
@@ -214,161 +301,234 @@ class MT5TradingBot:
     
     def start_trading(self):
         """Start the trading bot"""
+        if self.worker is not None and self.worker.is_alive():
+            self.log_message("Previous trading loop is still finishing, try again shortly")
+            return
+        
+        # Tk widgets must only be read on the GUI thread, so snapshot the settings here
+        try:
+            self.settings = self.read_settings()
+        except ValueError as e:
+            messagebox.showerror("Invalid settings", str(e))
+            return
+        
         self.trading_active = True
         self.trading_button.config(text="Stop Trading")
-        self.trading_status.config(text="Trading Active", foreground="green")
+        self.set_trading_status("Trading Active", "green")
         self.log_message("Trading bot started")
         
-        # Start trading in a separate thread to avoid freezing the GUI
-        self.root.after(100, self.run_trading_loop)
+        # Run the trading loop in a worker thread so broker calls never block the GUI
+        self.stop_event.clear()
+        self.worker = threading.Thread(target=self.run_trading_loop, name="trading-loop", daemon=True)
+        self.worker.start()
     
     def stop_trading(self):
         """Stop the trading bot"""
         self.trading_active = False
+        self.stop_event.set()
         self.trading_button.config(text="Start Trading")
-        self.trading_status.config(text="Not Trading", foreground="red")
+        self.set_trading_status("Not Trading", "red")
         self.log_message("Trading bot stopped")
     
+    def join_worker(self, timeout=5.0):
+        """Wait for the worker thread to finish its current cycle"""
+        if self.worker is not None and self.worker.is_alive():
+            self.worker.join(timeout)
+    
+    def on_close(self):
+        """Stop the worker before the window is destroyed"""
+        self.stop_event.set()
+        self.join_worker()
+        self.journal.close()
+        self.log.close()
+        self.root.destroy()
+    
+    def read_settings(self):
+        """Read the trading parameters from the GUI"""
+        symbols = self.get_watchlist()
+        if not symbols:
+            raise ValueError("Enter at least one symbol")
+        return {
+            "symbols": symbols,
+            "strategy": self.strategy_var.get(),
+            "risk_percent": float(self.risk_entry.get()) / 100,
+            "start_time": self.start_time_entry.get(),
+            "end_time": self.end_time_entry.get(),
+        }
+    
     def run_trading_loop(self):
-        """Main trading loop"""
-        if not self.trading_active:
+        """Main trading loop, runs in the worker thread"""
+        # Make sure every watchlist symbol is in Market Watch so rates can be copied
+        for symbol in self.settings["symbols"]:
+            if not mt5.symbol_select(symbol, True):
+                self.log_message(f"Failed to select {symbol}", logging.WARNING)
+        
+        # Wake once per closed bar instead of polling every minute
+        scheduler = BarScheduler(TIMEFRAME_SECONDS[TIMEFRAME_NAME], clock=self.clock)
+        first_run = True
+        while not self.stop_event.is_set():
+            # Run once straight away, then after every bar close
+            try:
+                if not first_run and scheduler.wait(self.stop_event) is None:
+                    break
+            except ReplayFinished:
+                self.log_message("Replay finished")
+                break
+            first_run = False
+            try:
+                # Get current time
+                now = self.clock.now()
+                current_time = now.strftime("%H:%M")
+                
+                # Check if within trading hours
+                start_time = self.settings["start_time"]
+                end_time = self.settings["end_time"]
+                
+                if current_time >= start_time and current_time <= end_time:
+                    # Execute trading strategy
+                    with self.latency.stage("cycle"):
+                        self.execute_strategy()
+            except Exception as e:
+                self.log_message(f"Trading error: {str(e)}", logging.ERROR)
+    
+    def get_watchlist(self):
+        """Parse the symbol entry into a list of unique symbols"""
+        symbols = []
+        for symbol in self.symbol_entry.get().replace(";", ",").split(","):
+            symbol = symbol.strip().upper()
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+        return symbols
+    
+    def execute_strategy(self):
+        """Execute the selected trading strategy on every watchlist symbol"""
+        symbols = self.settings["symbols"]
+        strategy = self.settings["strategy"]
+        risk_percent = self.settings["risk_percent"]
+        
+        # Drop indicator state for symbols removed from the watchlist
+        for symbol in list(self.engines):
+            if symbol not in symbols:
+                del self.engines[symbol]
+        
+        # Pick up deals since the last cycle (fills, SL/TP exits) instead of listing every position
+        with self.latency.stage("book_refresh"):
+            self.book.refresh()
+        self.journal.equity(self.market.account_info())
+        
+        # Collect the signals of the whole watchlist first, then size them together
+        candidates = []
+        for symbol in symbols:
+            if self.stop_event.is_set():
+                return
+            try:
+                order_type = self.execute_symbol(symbol, strategy)
+                if order_type is not None:
+                    candidates.append((symbol, order_type))
+                    self.journal_signal(symbol, strategy, order_type)
+            except Exception as e:
+                # One bad symbol should not stop the rest of the watchlist
+                self.log_message(f"{symbol}: strategy error: {str(e)}", logging.ERROR)
+        if not candidates:
             return
         
-        try:
-            # Get current time
-            now = datetime.now()
-            current_time = now.strftime("%H:%M")
-            
-            # Check if within trading hours
-            start_time = self.start_time_entry.get()
-            end_time = self.end_time_entry.get()
-            
-            if current_time >= start_time and current_time <= end_time:
-                # Execute trading strategy
-                self.execute_strategy()
-            
-            # Schedule next check (every minute)
-            self.root.after(60000, self.run_trading_loop)
-        except Exception as e:
-            self.log_message(f"Trading error: {str(e)}")
-            self.root.after(60000, self.run_trading_loop)
+        sides = [mt5.POSITION_TYPE_BUY if order_type == "buy" else mt5.POSITION_TYPE_SELL
+                 for _, order_type in candidates]
+        with self.latency.stage("sizing"):
+            lots = self.risk.size([symbol for symbol, _ in candidates], sides, SL_POINTS, risk_percent)
+        for (symbol, order_type), lot_size in zip(candidates, lots):
+            if self.stop_event.is_set():
+                return
+            if lot_size <= 0:
+                self.log_message(f"{symbol}: {order_type} skipped, no size left within the risk limits", logging.WARNING)
+                continue
+            try:
+                self.place_order(symbol, order_type, float(lot_size))
+            except Exception as e:
+                self.log_message(f"{symbol}: order error: {str(e)}", logging.ERROR)
     
-    def execute_strategy(self):
-        """Execute the selected trading strategy"""
-        symbol = self.symbol_entry.get()
-        strategy = self.strategy_var.get()
-        risk_percent = float(self.risk_entry.get()) / 100
-        
-        # Get current price data
-        rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M15, 0, 100)
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        df.set_index('time', inplace=True)
-        
-        # Calculate technical indicators
-        df['sma_20'] = df['close'].rolling(20).mean()
-        df['sma_50'] = df['close'].rolling(50).mean()
-        
-        # Get current positions
-        positions = mt5.positions_get(symbol=symbol)
-        
-        # Strategy logic
-        if strategy == "Mean Reversion":
-            self.mean_reversion_strategy(df, symbol, risk_percent, positions)
-        elif strategy == "Breakout":
-            self.breakout_strategy(df, symbol, risk_percent, positions)
-        elif strategy == "Moving Average Crossover":
-            self.ma_crossover_strategy(df, symbol, risk_percent, positions)
+    def execute_symbol(self, symbol, strategy):
+        """Run the selected strategy for one symbol; returns "buy", "sell" or None"""
+        # Update streaming indicators with newly closed bars only
+        engine = self.update_indicators(symbol)
+        if engine is None or not engine.ready:
+            return None
+        
+        # Strategy logic, shared with the backtest and the tick replay
+        with self.latency.stage("strategy"):
+            point = self.market.symbol_info(symbol).point
+            return strategy_order(strategy, engine, point,
+                                  self.book.has(symbol, mt5.POSITION_TYPE_BUY),
+                                  self.book.has(symbol, mt5.POSITION_TYPE_SELL))
     
-    def mean_reversion_strategy(self, df, symbol, risk_percent, positions):
-        """Mean reversion trading strategy"""
-        last_close = df['close'].iloc[-1]
-        sma_20 = df['sma_20'].iloc[-1]
-        
-        # Calculate position size based on risk
-        account_info = mt5.account_info()
-        risk_amount = account_info.balance * risk_percent
-        point = mt5.symbol_info(symbol).point
-        price_diff = abs(last_close - sma_20)
-        
-        if price_diff > 10 * point:  # If price deviates significantly from mean
-            lot_size = round(risk_amount / price_diff, 2)
-            
-            if last_close > sma_20 and not any(p.type == mt5.ORDER_TYPE_SELL for p in positions):
-                # Price is above mean - sell signal
-                self.place_order(symbol, "sell", lot_size)
-            elif last_close < sma_20 and not any(p.type == mt5.ORDER_TYPE_BUY for p in positions):
-                # Price is below mean - buy signal
-                self.place_order(symbol, "buy", lot_size)
+    def update_indicators(self, symbol):
+        """Seed the symbol's indicator engine once, then feed it only newly closed bars"""
+        engine = self.engines.get(symbol)
+        if engine is None:
+            engine = self.engines[symbol] = new_engine()
+        
+        # Position 1 skips the bar that is still forming
+        if engine.last_time is None:
+            rates = self.copy_rates(symbol, SEED_BARS)
+            with self.latency.stage("indicators"):
+                engine.seed(rates)
+        else:
+            rates = self.copy_rates(symbol, UPDATE_BARS)
+            with self.latency.stage("indicators"):
+                updated = engine.update(rates)
+            if not updated:
+                # Missed bars since the last cycle, so reload the full window
+                rates = self.copy_rates(symbol, SEED_BARS)
+                with self.latency.stage("indicators"):
+                    engine.seed(rates)
+        
+        if rates is None:
+            self.log_message(f"Failed to get rates for {symbol}", logging.ERROR)
+            return None
+        return engine
     
-    def breakout_strategy(self, df, symbol, risk_percent, positions):
-        """Breakout trading strategy"""
-        # Get recent high/low
-        recent_high = df['high'].rolling(20).max().iloc[-1]
-        recent_low = df['low'].rolling(20).min().iloc[-1]
-        last_close = df['close'].iloc[-1]
-        
-        # Calculate position size
-        account_info = mt5.account_info()
-        risk_amount = account_info.balance * risk_percent
-        point = mt5.symbol_info(symbol).point
-        price_diff = abs(recent_high - recent_low)
-        lot_size = round(risk_amount / price_diff, 2)
-        
-        if last_close > recent_high and not any(p.type == mt5.ORDER_TYPE_BUY for p in positions):
-            # Breakout above resistance - buy
-            self.place_order(symbol, "buy", lot_size)
-        elif last_close < recent_low and not any(p.type == mt5.ORDER_TYPE_SELL for p in positions):
-            # Breakout below support - sell
-            self.place_order(symbol, "sell", lot_size)
+    def journal_signal(self, symbol, strategy, order_type):
+        """Record a signal with the indicator values it came from"""
+        engine = self.engines[symbol]
+        self.journal.signal(symbol, strategy, order_type, {
+            "close": engine.close,
+            "sma_fast": engine.sma_fast.value,
+            "sma_slow": engine.sma_slow.value,
+            "high_max": engine.high_max.value,
+            "low_min": engine.low_min.value,
+            "rsi": engine.rsi.value,
+        })
     
-    def ma_crossover_strategy(self, df, symbol, risk_percent, positions):
-        """Moving average crossover strategy"""
-        # Get current and previous values
-        sma_20_now = df['sma_20'].iloc[-1]
-        sma_50_now = df['sma_50'].iloc[-1]
-        sma_20_prev = df['sma_20'].iloc[-2]
-        sma_50_prev = df['sma_50'].iloc[-2]
-        
-        # Calculate position size
-        account_info = mt5.account_info()
-        risk_amount = account_info.balance * risk_percent
-        point = mt5.symbol_info(symbol).point
-        price_diff = abs(sma_20_now - sma_50_now)
-        lot_size = round(risk_amount / price_diff, 2)
-        
-        # Check for crossover
-        if sma_20_prev < sma_50_prev and sma_20_now > sma_50_now:
-            # Golden cross - buy signal
-            if not any(p.type == mt5.ORDER_TYPE_BUY for p in positions):
-                self.place_order(symbol, "buy", lot_size)
-        elif sma_20_prev > sma_50_prev and sma_20_now < sma_50_now:
-            # Death cross - sell signal
-            if not any(p.type == mt5.ORDER_TYPE_SELL for p in positions):
-                self.place_order(symbol, "sell", lot_size)
+    def copy_rates(self, symbol, count):
+        """Closed bars from the terminal as zero-copy column views, timed as the "rates" stage"""
+        with self.latency.stage("rates"):
+            return self.market.rates(symbol, TIMEFRAME, 1, count)
     
     def place_order(self, symbol, order_type, lot_size):
         """Place an order in MT5"""
-        symbol_info = mt5.symbol_info(symbol)
+        symbol_info = self.market.symbol_info(symbol)
         if symbol_info is None:
-            self.log_message(f"{symbol} not found")
+            self.log_message(f"{symbol} not found", logging.WARNING)
             return
         
-        if not symbol_info.visible:
-            mt5.symbol_select(symbol, True)
+        # One tick snapshot for the whole order
+        tick = self.market.tick(symbol)
+        if tick is None:
+            self.log_message(f"No tick for {symbol}", logging.WARNING)
+            return
         
         point = symbol_info.point
-        price = mt5.symbol_info_tick(symbol).ask if order_type == "buy" else mt5.symbol_info_tick(symbol).bid
+        price = tick.ask if order_type == "buy" else tick.bid
         deviation = 20
         
         if order_type == "buy":
             order_type_mt5 = mt5.ORDER_TYPE_BUY
-            sl = price - 100 * point
-            tp = price + 200 * point
+            sl = price - SL_POINTS * point
+            tp = price + TP_POINTS * point
         else:
             order_type_mt5 = mt5.ORDER_TYPE_SELL
-            sl = price + 100 * point
-            tp = price - 200 * point
+            sl = price + SL_POINTS * point
+            tp = price - TP_POINTS * point
         
         request = {
             "action": mt5.TRADE_ACTION_DEAL,
@@ -382,34 +542,86 @@ class MT5TradingBot:
             "magic": 123456,
             "comment": "Python script open",
             "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_FOK,
+            "type_filling": self.market.filling_type(symbol, mt5.ORDER_FILLING_FOK),
         }
         
-        result = mt5.order_send(request)
+        with self.latency.stage("order_send"):
+            result = mt5.order_send(request)
+        self.market.invalidate_account()
+        self.journal.order(request, result)
         
         if result.retcode == mt5.TRADE_RETCODE_DONE:
+            self.book.refresh()  # Record the new position's deal
             self.log_message(f"{order_type.capitalize()} order executed for {lot_size} lots of {symbol}")
         else:
-            self.log_message(f"Order failed, retcode={result.retcode}")
+            self.log_message(f"Order failed, retcode={result.retcode}", logging.ERROR)
+    
+    def show_latency(self):
+        """Open (or raise) the window with p50/p99 timings per trading stage"""
+        if self.latency_window is not None and self.latency_window.winfo_exists():
+            self.latency_window.lift()
+            return
+        window = self.latency_window = tk.Toplevel(self.root)
+        window.title("Latency")
+        
+        self.latency_text = tk.Text(window, height=12, width=56, font=("Courier", 10), state=tk.DISABLED)
+        self.latency_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        buttons = ttk.Frame(window)
+        buttons.pack(fill=tk.X, padx=5, pady=5)
+        self.latency_enabled_var = tk.BooleanVar(value=self.latency.enabled)
+        ttk.Checkbutton(
+            buttons,
+            text="Record",
+            variable=self.latency_enabled_var,
+            command=lambda: setattr(self.latency, "enabled", self.latency_enabled_var.get())
+        ).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Reset", command=self.latency.reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Save JSON", command=self.save_latency).pack(side=tk.LEFT)
+        
+        self.refresh_latency()
+    
+    def refresh_latency(self):
+        """Redraw the latency table while its window is open"""
+        if self.latency_window is None or not self.latency_window.winfo_exists():
+            return
+        self.latency_text.config(state=tk.NORMAL)
+        self.latency_text.delete(1.0, tk.END)
+        self.latency_text.insert(tk.END, format_table(self.latency.snapshot()))
+        self.latency_text.config(state=tk.DISABLED)
+        self.root.after(LATENCY_REFRESH_MS, self.refresh_latency)
+    
+    def save_latency(self):
+        """Write the current timings to data/latency.json"""
+        path = self.latency.dump()
+        self.log_message(f"Latency stats saved to {path}")
+    
+    def log_message(self, message, level=logging.INFO):
+        """Add a message to the log (safe to call from any thread)"""
+        self.log.logger.log(level, message)
+    
+    def set_trading_status(self, text, color):
+        """Update the trading status label (safe to call from any thread)"""
+        self.ui_queue.put(("status", text, color))
     
-    def log_message(self, message):
-        """Add a message to the log"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_line = f"[{timestamp}] {message}\n"
-        
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, log_line)
-        self.log_text.config(state=tk.DISABLED)
-        self.log_text.see(tk.END)
-        
-        # Also print to console for debugging
-        print(log_line.strip())
+    def process_ui_queue(self):
+        """Apply new log lines and queued status updates on the GUI thread"""
+        try:
+            while True:
+                item = self.ui_queue.get_nowait()
+                if item[0] == "status":
+                    self.trading_status.config(text=item[1], foreground=item[2])
+        except queue.Empty:
+            pass
+        
+        # Everything logged since the last refresh goes in as one insert
+        self.log_view.refresh()
+        
+        self.root.after(UI_POLL_MS, self.process_ui_queue)
     
     def clear_log(self):
         """Clear the log messages"""
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        self.log_view.clear()
 
 if __name__ == "__main__":
     root = tk.Tk()
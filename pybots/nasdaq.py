@@ -1,16 +1,22 @@
-import MetaTrader5 as mt5
-import time
-import requests
-from datetime import datetime
 import os
 from dotenv import load_dotenv
+from scheduler import BarScheduler, ReplayFinished, TIMEFRAME_SECONDS, get_clock
+from marketdata import MarketData
+from notifier import TelegramNotifier, TELEGRAM_API_URL
+from broker import get_broker
+from positionbook import PositionBook
+from risk import RiskEngine
+from journal import TradeJournal
 
 # Load environment variables
 load_dotenv()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# Set TELEGRAM_API_URL to a local StubTelegramServer (notifier.py) for testing
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", TELEGRAM_API_URL)
 
 # Initialize MT5
+mt5 = get_broker()  # MetaTrader5 terminal, or the simulator when BROKER=sim
 if not mt5.initialize():
     print("Failed to initialize MT5")
     quit()
@@ -25,56 +31,73 @@ if not mt5.login(account, password, server):
     mt5.shutdown()
     quit()
 
-# Function to send Telegram message
+# Wall time, or replay time on the simulator (its sleeps replay the ticks in between)
+clock = get_clock(mt5)
+
+# Cached symbol specs and account info shared by every order
+market = MarketData(mt5)
+# Orders, fills, equity and signals, appended to the shared SQLite journal
+journal = TradeJournal(bot="nasdaq", clock=clock)
+# Open positions, kept current from new deals so each minute costs one history call
+book = PositionBook(mt5, on_deal=journal.fill)
+# Lot sizing from the symbol's tick value, volume step and margin
+risk = RiskEngine(mt5, market, book)
+MAGIC = 123456
+
+# Alerts are sent from a background thread, batched and retried there
+notifier = TelegramNotifier(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, base_url=TELEGRAM_API_URL)
+
+# Function to send Telegram message (queued, never blocks the trading loop)
 def send_telegram_message(message):
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    params = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": message
-    }
-    response = requests.get(url, params=params)
-    if response.status_code != 200:
-        print(f"Failed to send Telegram message: {response.text}")
+    notifier.send(message)
 
 # Function to check if today is Monday
 def is_monday():
-    return datetime.now().weekday() == 0  # 0 = Monday
+    return clock.now().weekday() == 0  # 0 = Monday
 
 # Function to get moving averages
 def get_moving_averages(symbol, period_short=10, period_long=50):
-    rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M1, 0, period_long + 1)
+    # Called right after a bar closes, so read closed bars only (position 1 onwards)
+    rates = market.rates(symbol, mt5.TIMEFRAME_M1, 1, period_long)
     if rates is None:
         print(f"Failed to get rates for {symbol}")
         return None, None
 
-    close_prices = [rate['close'] for rate in rates]
-    ma_short = sum(close_prices[-period_short:]) / period_short
-    ma_long = sum(close_prices[-period_long:]) / period_long
+    # Means over views of the close column, no per-bar Python objects
+    close = rates.close
+    ma_short = float(close[-period_short:].mean())
+    ma_long = float(close[-period_long:].mean())
     return ma_short, ma_long
 
 # Function to calculate lot size based on risk
-def calculate_lot_size(account_balance, risk_percent=1, sl_pips=20):
-    risk_amount = account_balance * (risk_percent / 100)
-    lot_size = risk_amount / (sl_pips * 10)  # 1 pip = $10 for micro lot (0.01)
-    return round(lot_size, 2)  # Round to 2 decimal places
+def calculate_lot_size(symbol, side, risk_percent=1, sl_pips=20):
+    # Losing sl_pips points costs risk_percent of the balance, in the symbol's own tick value
+    return risk.size_one(symbol, side, sl_pips, risk_percent / 100)
 
 # Function to place a trade with SL and TP
 def place_trade(symbol, action, lot_size=0.01, sl_pips=20, risk_reward_ratio=2):
-    symbol_info = mt5.symbol_info(symbol)
+    symbol_info = market.symbol_info(symbol)
     if symbol_info is None:
         print(f"Symbol {symbol} not found")
         return
 
+    # One tick snapshot for the whole order
+    tick = market.tick(symbol)
+    if tick is None:
+        print(f"No tick for {symbol}")
+        return
+    point = symbol_info.point
+
     if action == "buy":
         order_type = mt5.ORDER_TYPE_BUY
-        price = mt5.symbol_info_tick(symbol).ask
-        sl = price - sl_pips * mt5.symbol_info(symbol).point
-        tp = price + (sl_pips * risk_reward_ratio) * mt5.symbol_info(symbol).point
+        price = tick.ask
+        sl = price - sl_pips * point
+        tp = price + (sl_pips * risk_reward_ratio) * point
     elif action == "sell":
         order_type = mt5.ORDER_TYPE_SELL
-        price = mt5.symbol_info_tick(symbol).bid
-        sl = price + sl_pips * mt5.symbol_info(symbol).point
-        tp = price - (sl_pips * risk_reward_ratio) * mt5.symbol_info(symbol).point
+        price = tick.bid
+        sl = price + sl_pips * point
+        tp = price - (sl_pips * risk_reward_ratio) * point
     else:
         print("Invalid action")
         return
@@ -88,13 +111,15 @@ def place_trade(symbol, action, lot_size=0.01, sl_pips=20, risk_reward_ratio=2):
         "sl": sl,
         "tp": tp,
         "deviation": 10,
-        "magic": 123456,
+        "magic": MAGIC,
         "comment": "Python script open",
         "type_time": mt5.ORDER_TIME_GTC,
-        "type_filling": mt5.ORDER_FILLING_IOC,
+        "type_filling": market.filling_type(symbol, mt5.ORDER_FILLING_IOC),
     }
 
     result = mt5.order_send(request)
+    market.invalidate_account()
+    journal.order(request, result)
     if result.retcode != mt5.TRADE_RETCODE_DONE:
         print(f"Failed to place {action} order: {result.comment}")
     else:
@@ -110,32 +135,44 @@ def trade(symbol="NAS100"):
         print("Today is not Monday. No trading.")
         return
 
-    # Get account balance
-    account_info = mt5.account_info()
-    if account_info is None:
-        print("Failed to get account info")
-        return
-    account_balance = account_info.balance
-
-    # Calculate lot size based on risk
-    lot_size = calculate_lot_size(account_balance, risk_percent=1, sl_pips=20)
-
+    journal.equity(market.account_info())
     ma_short, ma_long = get_moving_averages(symbol)
     if ma_short is None or ma_long is None:
         return
 
     if ma_short > ma_long:
-        print("Buy signal detected")
-        place_trade(symbol, "buy", lot_size=lot_size)
+        action, side = "buy", mt5.POSITION_TYPE_BUY
     elif ma_short < ma_long:
-        print("Sell signal detected")
-        place_trade(symbol, "sell", lot_size=lot_size)
+        action, side = "sell", mt5.POSITION_TYPE_SELL
     else:
         print("No clear signal")
+        return
+
+    print(f"{action.capitalize()} signal detected")
+    journal.signal(symbol, "MA 10/50", action, {"ma_short": ma_short, "ma_long": ma_long})
+    # The signal usually holds for many minutes; only one position per side
+    book.refresh()
+    if book.has(symbol, side, MAGIC):
+        print(f"{action.capitalize()} position already open for {symbol}")
+        return
+
+    # Calculate lot size based on risk
+    lot_size = calculate_lot_size(symbol, side, risk_percent=1, sl_pips=20)
+    if lot_size <= 0:
+        print(f"Lot size for {symbol} rounds to 0 within the risk limits")
+        return
+    place_trade(symbol, action, lot_size=lot_size)
 
 # Run the bot
 if __name__ == "__main__":
     symbol = "NAS100"  # Replace with your desired symbol
-    while True:
-        trade(symbol)
-        time.sleep(60)  # Check every minute
+    scheduler = BarScheduler(TIMEFRAME_SECONDS["M1"], clock=clock)
+    try:
+        while True:
+            trade(symbol)
+            scheduler.wait()  # Wake just after the next M1 bar closes
+    except ReplayFinished:
+        print("Replay finished")
+    finally:
+        notifier.close()  # Deliver queued alerts before exiting
+        journal.close()  # Commit the last batch
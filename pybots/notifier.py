@@ -0,0 +1,208 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit for one sendMessage text
+
+
+class TelegramNotifier:
+    """
+    Sends Telegram messages from a background thread so callers never wait on the API.
+    send() only puts the text on a queue. The worker coalesces everything that
+    arrives within `batch_window` seconds of the first message into one request
+    (split at Telegram's length limit), reuses one pooled keep-alive session, and
+    retries connection errors, 5xx and 429 responses with exponential backoff.
+    :param base_url: API root; point it at a StubTelegramServer for testing
+    """
+    def __init__(self, token, chat_id, base_url=TELEGRAM_API_URL, batch_window=1.0,
+                 max_retries=5, backoff=0.5, max_backoff=30.0, timeout=10.0):
+        self.url = f"{base_url.rstrip('/')}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.enabled = bool(token and chat_id)
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def send(self, message):
+        """Queue a message; returns immediately"""
+        if self.enabled:
+            self.queue.put(message)
+
+    def close(self, timeout=10.0):
+        """Deliver what is still queued, then stop the worker"""
+        self.queue.put(None)
+        self.worker.join(timeout)
+        self.session.close()
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            message = self.queue.get()
+            if message is None:
+                break
+            batch = [message]
+            # Coalesce a burst (e.g. several fills in one cycle) into one request
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    message = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if message is None:
+                    stopping = True
+                    break
+                batch.append(message)
+            for text in split_batch(batch):
+                self.post(text)
+
+    def post(self, text):
+        """One sendMessage call with retries; failures are printed, never raised"""
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, data={"chat_id": self.chat_id, "text": text},
+                                             timeout=self.timeout)
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code == 200:
+                    return True
+                error = f"{response.status_code} {response.text}"
+                if response.status_code == 429:
+                    # Telegram says how long to wait in parameters.retry_after
+                    try:
+                        delay = max(delay, float(response.json()["parameters"]["retry_after"]))
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                elif response.status_code < 500:
+                    break  # Bad token or chat id, retrying will not help
+            if attempt < self.max_retries:
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+        print(f"Failed to send Telegram message: {error}")
+        return False
+
+def split_batch(messages, limit=MAX_MESSAGE_LENGTH):
+    """Join messages with blank lines into as few texts as fit within `limit`"""
+    texts = []
+    current = ""
+    for message in messages:
+        while len(message) > limit:
+            if current:
+                texts.append(current)
+                current = ""
+            texts.append(message[:limit])
+            message = message[limit:]
+        if current and len(current) + 2 + len(message) > limit:
+            texts.append(current)
+            current = ""
+        current = f"{current}\n\n{message}" if current else message
+    if current:
+        texts.append(current)
+    return texts
+
+
+class StubTelegramServer:
+    """
+    Local stand-in for the Telegram Bot API that accepts sendMessage and records it.
+    :param fail_first: Number of requests answered with 500 before succeeding (to exercise retries)
+    :param latency: Seconds to wait before answering each request
+    """
+    def __init__(self, host="127.0.0.1", port=0, fail_first=0, latency=0.0):
+        self.messages = []
+        self.requests = 0
+        self.fail_first = fail_first
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.handle_send()
+
+            def do_POST(self):
+                self.handle_send()
+
+            def handle_send(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                fields = parse_qs(parts.query)
+                fields.update(parse_qs(self.rfile.read(length).decode()))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                with stub.lock:
+                    stub.requests += 1
+                    failing = stub.requests <= stub.fail_first
+                    if not failing and parts.path.endswith("/sendMessage"):
+                        stub.messages.append(fields.get("text", [""])[0])
+                status = 500 if failing else 200
+                body = json.dumps({"ok": not failing}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# Function to demonstrate the notifier against the local stub
+def main():
+    parser = argparse.ArgumentParser(description="Telegram notifier demo against a local stub API")
+    parser.add_argument("--messages", type=int, default=20, help="Messages to send in one burst")
+    parser.add_argument("--fail-first", type=int, default=1, help="Stub requests that fail before succeeding")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub response time in seconds")
+    args = parser.parse_args()
+
+    stub = StubTelegramServer(fail_first=args.fail_first, latency=args.latency).start()
+    notifier = TelegramNotifier("TEST", "1", base_url=stub.url, batch_window=0.2, backoff=0.1)
+    start = time.perf_counter()
+    for i in range(args.messages):
+        notifier.send(f"Buy order placed for NAS100 #{i}")
+    queued = time.perf_counter() - start
+    notifier.close()
+    print(f"Queued {args.messages} messages in {queued * 1000:.3f} ms")
+    print(f"Stub received {stub.requests} requests, delivered {len(stub.messages)} batched message(s)")
+    stub.stop()
+
+if __name__ == "__main__":
+    main()
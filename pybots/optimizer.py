@@ -0,0 +1,176 @@
+import argparse
+import itertools
+import os
+import random
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from backtest import load_bars, rolling_mean
+
+# Worker-side state, set once per process by init_worker
+_shm = None
+_prices = None
+_sma_cache = {}
+
+def init_worker(shm_name, n):
+    """Attach to the shared price block; rows are open and close, nothing is copied"""
+    global _shm, _prices
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _prices = np.ndarray((2, n), dtype=np.float64, buffer=_shm.buf)
+    _sma_cache.clear()
+
+def cached_sma(period):
+    """SMA of the shared closes, computed once per period per worker"""
+    sma = _sma_cache.get(period)
+    if sma is None:
+        sma = _sma_cache[period] = rolling_mean(_prices[1], period)
+    return sma
+
+def sma_cross_positions(fast, slow, mode):
+    """
+    Long/flat position held after each bar closes, same rules as the backtrader strategies:
+    "cross" - buy on a fast-over-slow crossover, close on the cross back
+              (buysell.SmaCross / getsignal.SmaCross)
+    "trend" - long while fast > slow (apitrade.MovingAverageCrossover)
+    """
+    with np.errstate(invalid="ignore"):
+        above = fast > slow
+        below = fast < slow
+    if mode == "trend":
+        return above.astype(np.float64)
+    prev_above = np.r_[False, above[:-1]]
+    prev_below = np.r_[False, below[:-1]]
+    events = np.full(len(fast), np.nan)
+    events[above & prev_below] = 1.0
+    events[below & prev_above] = 0.0
+    # Carry the last event forward to get the position
+    idx = np.where(np.isnan(events), 0, np.arange(len(events)))
+    np.maximum.accumulate(idx, out=idx)
+    position = events[idx]
+    position[np.isnan(position)] = 0.0
+    return position
+
+def evaluate(params, mode="cross", bars_per_year=252):
+    """
+    Run one parameter set on the shared prices.
+    Orders fill at the next bar's open like backtrader market orders. `stake` is the
+    fraction of equity put into each trade and `commission` is charged per side.
+    """
+    open_, close = _prices[0], _prices[1]
+    fast_period, slow_period, stake, commission = params
+    position = sma_cross_positions(cached_sma(fast_period), cached_sma(slow_period), mode)
+
+    # Decided at close t, held from open t+1 to open t+2
+    held = np.r_[0.0, position[:-1]]
+    returns = np.zeros(len(open_))
+    returns[:-1] = open_[1:] / open_[:-1] - 1
+    trades = np.abs(np.diff(np.r_[0.0, held]))
+    bar_returns = stake * held * returns - commission * stake * trades
+    equity = np.cumprod(1 + bar_returns)
+
+    peak = np.maximum.accumulate(equity)
+    std = bar_returns.std()
+    return {
+        "fast": fast_period,
+        "slow": slow_period,
+        "stake": stake,
+        "commission": commission,
+        "total_return": float(equity[-1] - 1),
+        "max_drawdown": float(((peak - equity) / peak).max()),
+        "sharpe": float(bar_returns.mean() / std * np.sqrt(bars_per_year)) if std > 0 else 0.0,
+        "trades": int((trades.sum() + 1) // 2),
+    }
+
+def evaluate_chunk(chunk, mode, bars_per_year):
+    """Evaluate a batch of parameter sets in one task to keep IPC overhead low"""
+    return [evaluate(params, mode, bars_per_year) for params in chunk]
+
+def parameter_grid(fast_periods, slow_periods, stakes, commissions, samples=None, seed=0):
+    """All valid (fast, slow, stake, commission) combinations, or a random sample of them"""
+    grid = [p for p in itertools.product(fast_periods, slow_periods, stakes, commissions) if p[0] < p[1]]
+    if samples is not None and samples < len(grid):
+        grid = random.Random(seed).sample(grid, samples)
+    return grid
+
+# Function to run the sweep across all cores
+def optimize(bars, grid, mode="cross", bars_per_year=252, workers=None, chunk_size=None,
+             sort_by="sharpe"):
+    """
+    Evaluate every parameter set in `grid` over a process pool.
+    The open/close arrays are placed once in shared memory and every worker maps them.
+    :return: DataFrame of results, best first
+    """
+    prices = np.vstack([bars["open"].to_numpy(dtype=np.float64), bars["close"].to_numpy(dtype=np.float64)])
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, len(grid) // (workers * 4))
+    # Group by SMA periods so each worker's SMA cache gets reused
+    grid = sorted(grid)
+    chunks = [grid[i:i + chunk_size] for i in range(0, len(grid), chunk_size)]
+
+    shm = shared_memory.SharedMemory(create=True, size=prices.nbytes)
+    try:
+        np.ndarray(prices.shape, dtype=prices.dtype, buffer=shm.buf)[:] = prices
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(shm.name, prices.shape[1])) as pool:
+            futures = [pool.submit(evaluate_chunk, chunk, mode, bars_per_year) for chunk in chunks]
+            results = [row for future in futures for row in future.result()]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    ascending = sort_by == "max_drawdown"
+    return pd.DataFrame(results).sort_values(sort_by, ascending=ascending).reset_index(drop=True)
+
+def fetch_bars(symbol, start_date, end_date):
+    """Download daily bars with yfinance (imported here so CSV sweeps work offline)"""
+    import yfinance as yf
+    data = yf.download(symbol, start=start_date, end=end_date)
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    return pd.DataFrame({"open": data["Open"].to_numpy(), "close": data["Close"].to_numpy()})
+
+def parse_range(text):
+    """'10:60:5' -> range(10, 60, 5), '10,20,30' -> [10, 20, 30]"""
+    if ":" in text:
+        return list(range(*[int(x) for x in text.split(":")]))
+    return [float(x) if "." in x else int(x) for x in text.split(",")]
+
+# Main function
+def main():
+    parser = argparse.ArgumentParser(description="Parallel SMA crossover parameter sweep")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Bars file (CSV/Parquet) with time (or date), open, high, low and close columns")
+    source.add_argument("--symbol", help="Download with yfinance, e.g. MSFT or ^DJI")
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--end", default="2023-01-01")
+    parser.add_argument("--mode", choices=["cross", "trend"], default="cross",
+                        help="cross = buysell/getsignal SmaCross, trend = apitrade MovingAverageCrossover")
+    parser.add_argument("--fast", default="5:60:5", help="Fast SMA periods, start:stop:step or a list")
+    parser.add_argument("--slow", default="20:220:10", help="Slow SMA periods")
+    parser.add_argument("--stake", default="0.5,1.0", help="Fraction of equity per trade")
+    parser.add_argument("--commission", default="0.0,0.001", help="Commission per side")
+    parser.add_argument("--samples", type=int, help="Random search: evaluate this many combinations")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--sort-by", default="sharpe", choices=["sharpe", "total_return", "max_drawdown"])
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="Write all results to this CSV")
+    args = parser.parse_args()
+
+    bars = load_bars(args.csv) if args.csv else fetch_bars(args.symbol, args.start, args.end)
+    grid = parameter_grid(parse_range(args.fast), parse_range(args.slow),
+                          [float(x) for x in args.stake.split(",")],
+                          [float(x) for x in args.commission.split(",")], args.samples)
+
+    start = time.perf_counter()
+    results = optimize(bars, grid, args.mode, workers=args.workers, sort_by=args.sort_by)
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {len(results)} combinations on {len(bars)} bars in {elapsed:.2f}s")
+    print(results.head(args.top).to_string())
+    if args.out:
+        results.to_csv(args.out, index=False)
+
+if __name__ == "__main__":
+    main()
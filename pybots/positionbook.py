@@ -0,0 +1,161 @@
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from scheduler import get_clock
+
+# MT5 position/deal directions and deal entry kinds
+BUY = 0
+SELL = 1
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_ENTRY_INOUT = 2
+DEAL_ENTRY_OUT_BY = 3
+
+
+def snapshot_key(positions):
+    """What a deal can change in a positions_get() result: tickets and their volumes"""
+    return sorted((p.ticket, p.volume) for p in positions)
+
+
+class PositionBook:
+    """
+    Local copy of the account's open positions, kept current from deal history.
+    sync() loads a full positions_get() snapshot once; refresh() then only asks
+    the terminal for deals since the last one seen and applies them (entries open
+    or add to a position, exits reduce or close it, SL/TP hits included), with a
+    full resync every `resync_every` seconds to correct any drift.
+    Open volume and position counts are indexed by (symbol, side) and
+    (symbol, side, magic), so has() and volume() are dictionary lookups.
+    :param mt5: The MetaTrader5 module or a broker.get_broker() backend
+    :param lookback: Seconds of deal history re-read on every refresh; covers clock
+                     skew between this machine and the server (seen deals are skipped)
+    :param on_deal: Called with every deal made after the first sync, e.g. TradeJournal.fill
+    The history window and resync period follow the broker's clock (replay time on the simulator).
+    """
+    def __init__(self, mt5, lookback=3600, resync_every=300.0, on_deal=None):
+        self.mt5 = mt5
+        self.lookback = lookback
+        self.resync_every = resync_every
+        self.on_deal = on_deal
+        self.clock = get_clock(mt5)
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.open = {}  # position id -> {"symbol", "side", "magic", "volume"}
+        self.counts = defaultdict(int)
+        self.volumes = defaultdict(float)
+        self.seen = {}  # deal ticket -> deal time, within the lookback window
+        self.last_deal_time = None
+        self.synced_at = None
+
+    def add(self, key, volume, count):
+        symbol, side, magic = key
+        for k in (key, (symbol, side)):
+            self.counts[k] += count
+            self.volumes[k] += volume
+            if self.counts[k] <= 0:
+                del self.counts[k]
+                self.volumes.pop(k, None)
+
+    def sync(self, attempts=3):
+        """
+        Rebuild the book from a full positions_get() snapshot.
+        Positions are read on both sides of the deal history: if the two snapshots
+        match, no deal landed in between, so every deal read is already in the
+        snapshot and can be marked seen. Otherwise it tries again; after
+        `attempts` mismatches the old state is kept and False returned.
+        """
+        for _ in range(attempts):
+            before = self.mt5.positions_get()
+            deals = self.history(self.clock.time() - self.lookback)
+            positions = self.mt5.positions_get()
+            if before is None or positions is None:
+                return False
+            if snapshot_key(before) == snapshot_key(positions):
+                break
+        else:
+            return False
+        with self.lock:
+            if self.on_deal is not None and self.synced_at is not None:
+                # Deals the incremental path has not reported yet; the first sync only seeds the
+                # book, as the lookback's deals predate this bot (or belong to other bots)
+                for deal in deals:
+                    if deal.ticket not in self.seen:
+                        self.on_deal(deal)
+            self.clear()
+            self.seen = {deal.ticket: deal.time for deal in deals}
+            self.last_deal_time = max((deal.time for deal in deals), default=int(self.clock.time()))
+            for p in positions:
+                self.open[p.ticket] = {"symbol": p.symbol, "side": p.type, "magic": p.magic, "volume": p.volume}
+                self.add((p.symbol, p.type, p.magic), p.volume, 1)
+            self.synced_at = self.clock.monotonic()
+        return True
+
+    def history(self, since):
+        date_from = datetime.fromtimestamp(max(since, 0), tz=timezone.utc)
+        # Server clocks often run ahead of UTC, so look a day past now
+        date_to = datetime.fromtimestamp(self.clock.time(), tz=timezone.utc) + timedelta(days=1)
+        return self.mt5.history_deals_get(date_from, date_to) or ()
+
+    def refresh(self):
+        """
+        Apply deals that arrived since the last call (one history_deals_get call).
+        Falls back to a full sync the first time and every `resync_every` seconds.
+        """
+        if self.synced_at is None or self.clock.monotonic() - self.synced_at >= self.resync_every:
+            return self.sync()
+        return self.apply_deals()
+
+    def apply_deals(self):
+        deals = self.history(self.last_deal_time - self.lookback)
+        with self.lock:
+            for deal in sorted(deals, key=lambda d: (d.time, d.ticket)):
+                if deal.ticket in self.seen:
+                    continue
+                self.seen[deal.ticket] = deal.time
+                self.apply(deal)
+                if self.on_deal is not None:
+                    self.on_deal(deal)
+                self.last_deal_time = max(self.last_deal_time, deal.time)
+            # Forget tickets that can no longer show up in the lookback window
+            cutoff = self.last_deal_time - self.lookback
+            self.seen = {ticket: t for ticket, t in self.seen.items() if t >= cutoff}
+        return True
+
+    def apply(self, deal):
+        """Update the book with one trade deal (balance and other deal types are ignored)"""
+        if deal.type not in (BUY, SELL):
+            return
+        position = self.open.get(deal.position_id)
+        if deal.entry == DEAL_ENTRY_IN:
+            if position is None:
+                position = self.open[deal.position_id] = {"symbol": deal.symbol, "side": deal.type,
+                                                          "magic": deal.magic, "volume": 0.0}
+                self.add((deal.symbol, deal.type, deal.magic), 0.0, 1)
+            position["volume"] += deal.volume
+            self.add((position["symbol"], position["side"], position["magic"]), deal.volume, 0)
+        elif position is not None and deal.entry in (DEAL_ENTRY_OUT, DEAL_ENTRY_OUT_BY, DEAL_ENTRY_INOUT):
+            key = (position["symbol"], position["side"], position["magic"])
+            remaining = position["volume"] - deal.volume
+            if remaining > 1e-9:
+                position["volume"] = remaining
+                self.add(key, -deal.volume, 0)
+                return
+            del self.open[deal.position_id]
+            self.add(key, -position["volume"], -1)
+            if deal.entry == DEAL_ENTRY_INOUT and remaining < -1e-9:
+                # Netting reversal: the rest of the deal opens the opposite side
+                self.open[deal.position_id] = {"symbol": deal.symbol, "side": deal.type,
+                                               "magic": deal.magic, "volume": -remaining}
+                self.add((deal.symbol, deal.type, deal.magic), -remaining, 1)
+
+    def has(self, symbol, side, magic=None):
+        """True if a position on this symbol and side (and magic, if given) is open"""
+        key = (symbol, side) if magic is None else (symbol, side, magic)
+        return key in self.counts
+
+    def volume(self, symbol, side, magic=None):
+        """Open lots on this symbol and side (and magic, if given)"""
+        key = (symbol, side) if magic is None else (symbol, side, magic)
+        return self.volumes.get(key, 0.0)
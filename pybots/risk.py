@@ -0,0 +1,147 @@
+import threading
+import numpy as np
+from scheduler import get_clock
+
+# Symbol specs that don't move with the price, cached per symbol
+STATIC_FIELDS = ("point", "tick_size", "tick_value", "volume_step", "volume_min", "volume_max", "contract_size")
+
+
+def risk_lots(balance, risk_percent, sl_distance, tick_size, tick_value,
+              volume_step=0.01, volume_min=0.01, volume_max=np.inf):
+    """
+    Lots that lose `risk_percent` of `balance` when a stop `sl_distance` (price units)
+    away is hit, rounded down to the volume step and capped at volume_max.
+    Sizes below volume_min (or undefined) become 0. Works on scalars or arrays.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loss_per_lot = np.asarray(sl_distance, dtype=float) / tick_size * tick_value
+        raw = balance * risk_percent / loss_per_lot
+    return round_lots(raw, volume_step, volume_min, volume_max)
+
+def round_lots(lots, volume_step, volume_min, volume_max=np.inf):
+    """Round down to the volume step, cap at volume_max, and zero anything below volume_min"""
+    lots = np.asarray(lots, dtype=float)
+    with np.errstate(invalid="ignore"):
+        stepped = np.minimum(np.floor(lots / volume_step + 1e-9) * volume_step, volume_max)
+        valid = np.isfinite(stepped) & (stepped >= volume_min - 1e-12)
+    # Rounding strips float noise such as 0.30000000000000004 so order_send accepts the volume
+    return np.round(np.where(valid, stepped, 0.0), 8)
+
+
+class RiskEngine:
+    """
+    Portfolio-level position sizing for a batch of candidate orders.
+    Each order risks `risk_percent` of the balance at its stop, using the symbol's
+    tick value and size, rounded to its volume step (so lots no longer depend on how
+    close two moving averages are). The batch is then cut down, all at once, so that:
+    no symbol/side holds more than `max_symbol_lots` including open positions,
+    margin used stays under `max_margin_usage` of equity, and total notional stays
+    under `max_leverage` times equity.
+    Static symbol specs (tick value, volume limits, contract size) are cached per
+    symbol for `spec_ttl` seconds on the broker's clock; margin and notional per
+    lot are priced from the current tick on every call. The batch is then sized
+    with a handful of vector operations.
+    :param market: MarketData cache for symbol specs and account info
+    :param book: Optional PositionBook for the open volume per symbol and side
+    """
+    def __init__(self, mt5, market, book=None, max_symbol_lots=None, max_margin_usage=0.5,
+                 max_leverage=None, spec_ttl=3600.0):
+        self.mt5 = mt5
+        self.market = market
+        self.book = book
+        self.max_symbol_lots = max_symbol_lots
+        self.max_margin_usage = max_margin_usage
+        self.max_leverage = max_leverage
+        self.spec_ttl = spec_ttl
+        self.clock = get_clock(mt5)
+        self.cache = {}  # symbol -> (fetched_at, static spec row), bounded by the watchlist
+        self.lock = threading.Lock()
+
+    def static_specs(self, symbol):
+        """The symbol's STATIC_FIELDS, re-read every `spec_ttl` seconds (NaN, uncached, if unknown)"""
+        now = self.clock.monotonic()
+        with self.lock:
+            cached = self.cache.get(symbol)
+            if cached is not None and now - cached[0] < self.spec_ttl:
+                return cached[1]
+        info = self.market.symbol_info(symbol)
+        if info is None:
+            return (np.nan,) * len(STATIC_FIELDS)
+        row = (info.point, info.trade_tick_size or info.point, info.trade_tick_value,
+               info.volume_step, info.volume_min, info.volume_max, info.trade_contract_size)
+        with self.lock:
+            self.cache[symbol] = (now, row)
+        return row
+
+    def specs(self, symbols):
+        """Spec arrays for `symbols` (in order), with margin and notional per lot at the current tick"""
+        table = np.array([self.static_specs(symbol) for symbol in symbols], dtype=float).reshape(
+            len(symbols), len(STATIC_FIELDS))
+        arrays = {name: table[:, i] for i, name in enumerate(STATIC_FIELDS)}
+        arrays["margin"] = np.full(len(symbols), np.nan)
+        arrays["notional"] = np.full(len(symbols), np.nan)
+        for i, symbol in enumerate(symbols):
+            tick = self.market.tick(symbol)
+            price = (tick.ask or tick.bid) if tick is not None else 0.0
+            if not price or np.isnan(arrays["contract_size"][i]):
+                continue
+            arrays["notional"][i] = arrays["contract_size"][i] * price
+            arrays["margin"][i] = self.margin_per_lot(symbol, arrays["notional"][i], price)
+        return arrays
+
+    def margin_per_lot(self, symbol, notional, price):
+        """Margin for one lot from the terminal when it can tell, else notional / leverage"""
+        calc = getattr(self.mt5, "order_calc_margin", None)
+        if calc is not None:
+            margin = calc(self.mt5.ORDER_TYPE_BUY, symbol, 1.0, price)
+            if margin is not None:
+                return margin
+        account = self.market.account_info()
+        leverage = account.leverage if account is not None and account.leverage else 1
+        return notional / leverage
+
+    def invalidate(self):
+        with self.lock:
+            self.cache.clear()
+
+    def size(self, symbols, sides, sl_points, risk_percent):
+        """
+        Lots for each candidate order, after the portfolio limits.
+        :param symbols: Symbol per order
+        :param sides: POSITION_TYPE_BUY / POSITION_TYPE_SELL per order
+        :param sl_points: Stop distance in points (scalar or one per order)
+        :param risk_percent: Fraction of the balance risked per order, e.g. 0.01
+        :return: NumPy array of lots (0 where the order should be skipped)
+        """
+        if len(symbols) == 0:
+            return np.zeros(0)
+        account = self.market.account_info()
+        if account is None:
+            return np.zeros(len(symbols))
+        s = self.specs(symbols)
+        lots = risk_lots(account.balance, risk_percent, np.asarray(sl_points) * s["point"],
+                         s["tick_size"], s["tick_value"], s["volume_step"], s["volume_min"], s["volume_max"])
+
+        if self.max_symbol_lots is not None and self.book is not None:
+            held = np.array([self.book.volume(symbol, side) for symbol, side in zip(symbols, sides)])
+            lots = np.minimum(lots, np.maximum(self.max_symbol_lots - held, 0.0))
+
+        # Scale the whole batch down proportionally when it would break a portfolio limit
+        scale = 1.0
+        margin = np.nan_to_num(lots * s["margin"])
+        budget = account.equity * self.max_margin_usage - account.margin
+        if margin.sum() > budget:
+            scale = max(budget, 0.0) / margin.sum()
+        if self.max_leverage is not None:
+            notional = np.nan_to_num(lots * s["notional"]).sum()
+            # Open positions' notional, from the margin they hold
+            budget = account.equity * self.max_leverage - account.margin * account.leverage
+            if notional > budget:
+                scale = min(scale, max(budget, 0.0) / notional)
+        if scale < 1.0:
+            lots = lots * scale
+        return round_lots(lots, s["volume_step"], s["volume_min"], s["volume_max"])
+
+    def size_one(self, symbol, side, sl_points, risk_percent):
+        """Lots for a single order (0.0 if it should be skipped)"""
+        return float(self.size([symbol], [side], sl_points, risk_percent)[0])
@@ -0,0 +1,97 @@
+import time
+from datetime import datetime
+
+# Bar length in seconds for the MT5 timeframes the bots use
+TIMEFRAME_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+}
+
+
+class ReplayFinished(Exception):
+    """Raised by a replay clock (broker.SimBroker) when sleeping runs past the end of its data"""
+
+
+class WallClock:
+    """
+    Real time. The bots read the time and sleep through a clock so that, on the
+    simulated broker, the same code runs on replay time instead (broker.SimClock).
+    """
+    max_sleep = 5.0  # Longest single sleep, so clock jumps are noticed quickly
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        """For measuring intervals (TTLs, resync periods)"""
+        return time.monotonic()
+
+    def now(self):
+        """Local datetime, like datetime.now()"""
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def wait(self, stop_event, seconds):
+        """Sleep up to `seconds`; True (early) if `stop_event` is set"""
+        if stop_event is None:
+            self.sleep(seconds)
+            return False
+        return stop_event.wait(seconds)
+
+
+WALL_CLOCK = WallClock()
+
+def get_clock(mt5):
+    """The broker's replay clock if it has one (SimBroker), else the wall clock"""
+    return getattr(mt5, "clock", None) or WALL_CLOCK
+
+
+class BarScheduler:
+    """
+    Wakes up just after each bar of a timeframe closes.
+    :param period: Bar length in seconds (see TIMEFRAME_SECONDS)
+    :param delay: Seconds to wait after the boundary so the terminal has closed the bar
+    :param offset: Broker server time minus UTC in seconds (matters for D1 and longer bars)
+    :param clock: Time source (default the wall clock; get_clock(mt5) follows the broker)
+    """
+    def __init__(self, period, delay=1.0, offset=0, clock=None):
+        self.period = period
+        self.delay = delay
+        self.offset = offset
+        self.clock = clock or WALL_CLOCK
+        self.last_bar = None
+
+    def next_close(self, now=None):
+        """Unix time of the next bar boundary after `now`"""
+        if now is None:
+            now = self.clock.time()
+        server_now = now + self.offset
+        return (server_now // self.period + 1) * self.period - self.offset
+
+    def wait(self, stop_event=None):
+        """
+        Sleep until the next bar closes.
+        Returns the boundary time that was reached, or None if `stop_event` was set.
+        The target is recomputed from the wall clock on every wake-up, so sleep
+        overshoot or a clock adjustment never accumulates into drift.
+        """
+        target = self.next_close()
+        if self.last_bar is not None and target <= self.last_bar:
+            # Woke slightly early last time, don't fire twice for the same bar
+            target = self.last_bar + self.period
+        while True:
+            remaining = target + self.delay - self.clock.time()
+            if remaining <= 0:
+                break
+            # Sleep in short slices so clock jumps are noticed quickly
+            if self.clock.wait(stop_event, min(remaining, self.clock.max_sleep)):
+                return None
+        self.last_bar = target
+        return target
@@ -0,0 +1,110 @@
+import argparse
+import os
+import runpy
+import sys
+import time
+import pandas as pd
+
+# Every bot in this process gets the shared simulator; replay fills and models stay out of the live ones
+os.environ["BROKER"] = "sim"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIM_DIR = os.path.join(ROOT, "data", "sim")
+os.environ.setdefault("JOURNAL_PATH", os.path.join(SIM_DIR, "journal.sqlite"))
+os.environ.setdefault("MODEL_DIR", os.path.join(SIM_DIR, "models"))
+# Simulator tickets restart at 1, so each replay journals its orders and fills under its own run id
+os.environ.setdefault("JOURNAL_RUN", time.strftime("sim-%Y%m%d-%H%M%S-") + str(os.getpid()))
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import broker
+import barstore
+
+# Script bots run unchanged as __main__; mt5dailybot runs its trading loop without the window
+BOT_SCRIPTS = {
+    "nasdaq": os.path.join(ROOT, "pybots", "nasdaq.py"),
+    "djiEA": os.path.join(ROOT, "pybots", "djiEA.py"),
+    "fxbot": os.path.join(ROOT, "fxpred", "fxbot.py"),
+    "mt5dailybot": None,
+}
+# Symbols each bot trades by default, and the bar store interval closest to how often it wakes
+BOT_SYMBOLS = {"nasdaq": "NAS100", "djiEA": "^DJI", "fxbot": "EURUSD", "mt5dailybot": "XAUUSD"}
+BOT_INTERVALS = {"nasdaq": "1m", "djiEA": "1d", "fxbot": "1m", "mt5dailybot": "15m"}
+
+
+def run_bot(bot, symbols, strategy, risk_percent):
+    """Run the bot's own main loop until the replay runs out of data"""
+    if BOT_SCRIPTS[bot] is None:
+        import mt5dailybot
+        app = mt5dailybot.MT5TradingBot.headless({
+            "symbols": symbols, "strategy": strategy, "risk_percent": risk_percent,
+            "start_time": "00:00", "end_time": "23:59"})
+        try:
+            app.run_trading_loop()
+        finally:
+            app.journal.close()
+            app.log.close()
+        return
+    path = BOT_SCRIPTS[bot]
+    sys.path.insert(0, os.path.dirname(path))
+    runpy.run_path(path, run_name="__main__")
+
+
+# Function to replay stored (or synthetic) bars through one of the live bots
+def simulate(bot, symbols=None, interval=None, start=None, synthetic=None, warmup=500, strategy="Moving Average Crossover",
+             risk_percent=0.01, seed=0):
+    """
+    The bot's real loop on the shared SimBroker: its scheduler and sleeps run on
+    the replay clock, so every wait replays the ticks in between.
+    :param interval: Bar store interval replayed (default the bot's; coarser timeframes it asks
+                     for are resampled, finer ones loaded from the store)
+    :param start: Replay start; default `warmup` bars into the data
+    :param synthetic: Random-walk bars per symbol instead of the bar store
+    Returns (sim, elapsed seconds, replayed seconds, replayed ticks)
+    """
+    symbols = symbols or [BOT_SYMBOLS[bot]]
+    interval = interval or BOT_INTERVALS[bot]
+    timeframe = broker.INTERVAL_TIMEFRAMES[interval]
+    period = broker.TIMEFRAME_SECONDS[timeframe]
+    bars = {}
+    for i, symbol in enumerate(symbols):
+        if synthetic:
+            first = int(barstore.to_epoch(start or "2024-01-01")) - warmup * period
+            bars[symbol] = broker.synthetic_bars(synthetic + warmup, timeframe=timeframe, start=first, seed=seed + i)
+        else:
+            columns = barstore.store.columns(symbol, interval)
+            if columns is None:
+                raise SystemExit(f"No stored {interval} bars for {symbol}")
+            bars[symbol] = broker.to_rates(columns)
+    if start is None:
+        start = min(int(rates["time"][min(warmup, len(rates) - 1)]) for rates in bars.values())
+    os.environ["BROKER_SIM_START"] = pd.Timestamp(barstore.to_epoch(start), unit="s").isoformat()
+    os.environ["BROKER_SIM_INTERVAL"] = interval
+    sim = broker.get_broker("sim")
+    for symbol, rates in bars.items():
+        sim.add_symbol(symbol, rates, timeframe=timeframe)
+    begin, cursor = sim.now(), sim.cursor
+    started = time.perf_counter()
+    run_bot(bot, symbols, strategy, risk_percent)
+    return sim, time.perf_counter() - started, sim.now() - begin, sim.cursor - cursor
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay bars through a live bot on the simulated broker")
+    parser.add_argument("bot", choices=sorted(BOT_SCRIPTS))
+    parser.add_argument("--symbols", help="Comma-separated symbols (default: the bot's own)")
+    parser.add_argument("--interval", help="Bar store interval to replay, e.g. 1m, 15m, 1d (default: the bot's)")
+    parser.add_argument("--start", help="Replay start date (default: --warmup bars into the data)")
+    parser.add_argument("--warmup", type=int, default=500, help="Bars before the start kept as history")
+    parser.add_argument("--synthetic", type=int, help="Replay this many random-walk bars per symbol instead")
+    parser.add_argument("--strategy", default="Moving Average Crossover", help="mt5dailybot strategy")
+    parser.add_argument("--risk", type=float, default=1.0, help="mt5dailybot risk per trade in percent")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    symbols = [s.strip() for s in args.symbols.split(",")] if args.symbols else None
+    sim, elapsed, replayed, ticks = simulate(args.bot, symbols, args.interval, args.start, args.synthetic, args.warmup,
+                                            args.strategy, args.risk / 100, args.seed)
+    account = sim.account_info()
+    print(f"\n{replayed / 86400:,.1f} days replayed in {elapsed:.2f} s ({ticks:,} ticks, {ticks / elapsed:,.0f} ticks/s)")
+    print(f"{len(sim.deals)} deals, {len(sim.positions)} open, balance {account.balance:.2f}, equity {account.equity:.2f}")
+
+if __name__ == "__main__":
+    main()
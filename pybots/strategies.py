@@ -0,0 +1,48 @@
+from indicators import IndicatorEngine
+
+# Indicator periods and the strategies MT5TradingBot offers
+FAST_PERIOD = 20
+SLOW_PERIOD = 50
+CHANNEL_PERIOD = 20
+STRATEGIES = ["Mean Reversion", "Breakout", "Moving Average Crossover"]
+
+
+def new_engine():
+    """Indicator engine with the periods every strategy reads"""
+    return IndicatorEngine(fast=FAST_PERIOD, slow=SLOW_PERIOD, channel=CHANNEL_PERIOD)
+
+# Function to apply a strategy's rules to indicator values
+def strategy_rules(strategy, point, close, sma_fast, sma_slow, prev_sma_fast, prev_sma_slow, high_max, low_min):
+    """
+    The single definition of the MT5TradingBot strategy rules, shared by the
+    live bot, the backtest and the tick replay. Pure and elementwise: floats for
+    one bar give one decision, NumPy arrays over every bar give the backtest's
+    signal arrays in one pass (NaN compares False).
+    Returns (buy, sell).
+    """
+    if strategy == "Mean Reversion":
+        # Price deviating from its mean by more than 10 points reverts
+        active = abs(close - sma_fast) > 10 * point
+        return active & (close < sma_fast), active & (close > sma_fast)
+    if strategy == "Breakout":
+        return close > high_max, close < low_min
+    if strategy == "Moving Average Crossover":
+        # Golden cross buys, death cross sells
+        return ((prev_sma_fast < prev_sma_slow) & (sma_fast > sma_slow),
+                (prev_sma_fast > prev_sma_slow) & (sma_fast < sma_slow))
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+# Function to decide a trade from the streaming indicators on the latest closed bar
+def strategy_signal(strategy, engine, point):
+    """Returns "buy", "sell" or None; the engine must be ready"""
+    buy, sell = strategy_rules(strategy, point, engine.close, engine.sma_fast.value, engine.sma_slow.value,
+                               engine.prev_sma_fast, engine.prev_sma_slow,
+                               engine.high_max.value, engine.low_min.value)
+    return "buy" if buy else "sell" if sell else None
+
+def strategy_order(strategy, engine, point, open_buy, open_sell):
+    """The strategy's signal, or None when a position on that side is already open"""
+    side = strategy_signal(strategy, engine, point)
+    if (side == "buy" and open_buy) or (side == "sell" and open_sell):
+        return None
+    return side
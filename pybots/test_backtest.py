@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import run_backtest, strategy_signals
+from broker import synthetic_bars
+from strategies import STRATEGIES, new_engine, strategy_signal
+
+POINT = 0.01
+
+
+def streaming_signals(strategy, rates):
+    """The live bot's path: every closed bar through the IndicatorEngine and strategy_signal"""
+    buy = np.zeros(len(rates), dtype=bool)
+    sell = np.zeros(len(rates), dtype=bool)
+    engine = new_engine()
+    for i, bar in enumerate(rates):
+        engine.add_bar(bar)
+        if engine.ready:
+            side = strategy_signal(strategy, engine, POINT)
+            buy[i], sell[i] = side == "buy", side == "sell"
+    return buy, sell
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_vectorized_signals_match_the_strategy_rules_bar_for_bar(strategy):
+    rates = synthetic_bars(5000, price=100.0, volatility=0.002, seed=1)
+    buy, sell = strategy_signals(strategy, rates["high"], rates["low"], rates["close"], POINT)
+    expected_buy, expected_sell = streaming_signals(strategy, rates)
+    np.testing.assert_array_equal(buy, expected_buy)
+    np.testing.assert_array_equal(sell, expected_sell)
+    assert not (buy & sell).any()
+
+
+def test_backtest_stops_when_no_signal_can_be_sized():
+    rates = synthetic_bars(2000, price=100.0, volatility=0.002, seed=2)
+    bars = {col: rates[col] for col in ("time", "open", "high", "low", "close")}
+    trades, equity = run_backtest(pd.DataFrame(bars), "Moving Average Crossover", balance=0.0)
+    assert trades.empty
+    assert (equity == 0.0).all()
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+from barstore import BarStore, COLUMNS, to_epoch
+
+
+class Fetcher:
+    """Daily bars on weekdays only; records every request, fails while `offline`"""
+    def __init__(self):
+        self.calls = []
+        self.offline = False
+
+    def __call__(self, symbol, start, end, interval):
+        self.calls.append((to_epoch(start), to_epoch(end)))
+        if self.offline:
+            raise RuntimeError("offline")
+        days = pd.date_range(start, end, freq="D", inclusive="left")
+        days = days[days.dayofweek < 5]
+        return pd.DataFrame({col: 1.0 for col in COLUMNS}, index=pd.DatetimeIndex(days, name="Date"))
+
+
+def test_empty_fetch_is_covered_and_not_fetched_again(tmp_path):
+    fetcher = Fetcher()
+    store = BarStore(str(tmp_path), fetcher)
+    # A weekend on its own: nothing traded, but the range is known
+    assert store.download("AAA", "2024-01-06", "2024-01-08").empty
+    store.download("AAA", "2024-01-06", "2024-01-08")
+    assert len(fetcher.calls) == 1
+    assert len(store.download("AAA", "2024-01-01", "2024-01-13")) == 10
+    store.download("AAA", "2024-01-01", "2024-01-13")
+    assert len(fetcher.calls) == 3
+
+
+def test_failed_fetch_leaves_the_range_to_fetch_again(tmp_path):
+    fetcher = Fetcher()
+    store = BarStore(str(tmp_path), fetcher)
+    store.download("AAA", "2024-01-01", "2024-01-06")
+    fetcher.offline = True
+    assert len(store.download("AAA", "2024-01-01", "2024-01-13")) == 5
+    fetcher.offline = False
+    assert len(store.download("AAA", "2024-01-01", "2024-01-13")) == 10
+    assert fetcher.calls[-1] == (to_epoch("2024-01-06"), to_epoch("2024-01-13"))
+
+
+def test_first_fetch_failure_is_raised(tmp_path):
+    fetcher = Fetcher()
+    fetcher.offline = True
+    with pytest.raises(RuntimeError):
+        BarStore(str(tmp_path), fetcher).download("AAA", "2024-01-01", "2024-01-06")
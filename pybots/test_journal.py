@@ -0,0 +1,70 @@
+import sqlite3
+import broker
+from journal import TradeJournal
+from positionbook import PositionBook
+
+
+def replay(path, run, bars):
+    """One short simulator run that opens and closes a position, journaled under `run`"""
+    sim = broker.SimBroker(start=int(bars["time"][100]))
+    sim.add_symbol("AAA", bars, timeframe=broker.TIMEFRAME_M1)
+    journal = TradeJournal(path, bot="test", clock=sim.clock, run=run, flush_interval=0.01)
+    book = PositionBook(sim, on_deal=journal.fill)
+    book.refresh()
+    for order_type in (sim.ORDER_TYPE_BUY, sim.ORDER_TYPE_SELL):
+        tick = sim.symbol_info_tick("AAA")
+        request = {"action": sim.TRADE_ACTION_DEAL, "symbol": "AAA", "volume": 1.0, "type": order_type,
+                   "price": tick.ask if order_type == sim.ORDER_TYPE_BUY else tick.bid, "deviation": 10}
+        if order_type == sim.ORDER_TYPE_SELL:
+            request["position"] = next(iter(sim.positions))
+        journal.order(request, sim.order_send(request))
+        sim.clock.sleep(600)
+        book.refresh()
+    journal.close()
+    return journal
+
+
+def test_replays_with_the_same_tickets_keep_their_own_fills(tmp_path):
+    path = str(tmp_path / "journal.sqlite")
+    bars = broker.synthetic_bars(1000, start=1_704_067_200, volatility=0.01)
+    replay(path, "first", bars)
+    journal = replay(path, "second", bars)
+    fills = journal.fills()
+    assert sorted(fills["run"]) == ["first", "first", "second", "second"]
+    trips = journal.round_trips()
+    assert list(trips["run"]) == ["first", "second"]
+    assert trips["exit_price"].notna().all()
+
+
+def test_first_sync_does_not_journal_earlier_deals(tmp_path):
+    path = str(tmp_path / "journal.sqlite")
+    bars = broker.synthetic_bars(1000, start=1_704_067_200, volatility=0.01)
+    sim = broker.SimBroker(start=int(bars["time"][100]))
+    sim.add_symbol("AAA", bars, timeframe=broker.TIMEFRAME_M1)
+    tick = sim.symbol_info_tick("AAA")
+    sim.order_send({"action": sim.TRADE_ACTION_DEAL, "symbol": "AAA", "volume": 1.0,
+                    "type": sim.ORDER_TYPE_BUY, "price": tick.ask, "deviation": 10})
+    deals = []
+    book = PositionBook(sim, on_deal=deals.append)
+    book.refresh()
+    assert deals == [] and book.volume("AAA", sim.POSITION_TYPE_BUY) == 1.0
+
+
+def test_old_journal_is_rebuilt_with_run_keys(tmp_path):
+    path = str(tmp_path / "journal.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE fills (ticket INTEGER PRIMARY KEY, time REAL NOT NULL, bot TEXT, symbol TEXT NOT NULL, "
+                 "type INTEGER, entry INTEGER, volume REAL, price REAL, profit REAL, commission REAL, swap REAL, "
+                 "magic INTEGER, position_id INTEGER, order_ticket INTEGER, comment TEXT)")
+    conn.execute("CREATE INDEX fills_time ON fills (time)")
+    conn.execute("INSERT INTO fills VALUES (1, 0, 'old', 'AAA', 0, 0, 1, 1, 0, 0, 0, 0, 1, 1, '')")
+    conn.commit()
+    conn.close()
+    journal = TradeJournal(path)
+    journal.close()
+    fills = journal.fills()
+    assert list(fills["ticket"]) == [1] and list(fills["run"]) == [""] and fills["server_time"].isna().all()
+    conn = sqlite3.connect(path)
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(fills)")}
+    conn.close()
+    assert {"fills_symbol_time", "fills_time", "fills_position"} <= indexes
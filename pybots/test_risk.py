@@ -0,0 +1,28 @@
+import broker
+from marketdata import MarketData
+from risk import RiskEngine
+
+
+def make_engine(symbols=("AAA", "BBB", "CCC")):
+    rates = broker.synthetic_bars(3000, start=1_704_067_200, volatility=0.01)
+    sim = broker.SimBroker(start=int(rates["time"][100]))
+    for symbol in symbols:
+        sim.add_symbol(symbol, rates, timeframe=broker.TIMEFRAME_M1)
+    return sim, RiskEngine(sim, MarketData(sim))
+
+
+def test_spec_cache_holds_one_row_per_symbol():
+    sim, risk = make_engine()
+    for batch in (["AAA"], ["AAA", "BBB"], ["CCC", "AAA"], ["BBB", "CCC", "AAA"]):
+        risk.size(batch, [sim.POSITION_TYPE_BUY] * len(batch), 100, 0.01)
+    assert sorted(risk.cache) == ["AAA", "BBB", "CCC"]
+
+
+def test_margin_follows_the_current_price_on_the_replay_clock():
+    sim, risk = make_engine()
+    before = risk.specs(["AAA"])
+    sim.clock.sleep(2000 * 60)
+    after = risk.specs(["AAA"])
+    price = sim.symbol_info_tick("AAA").ask
+    assert after["notional"][0] == price != before["notional"][0]
+    assert after["margin"][0] == sim.order_calc_margin(sim.ORDER_TYPE_BUY, "AAA", 1.0, price)
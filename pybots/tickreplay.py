@@ -0,0 +1,274 @@
+import argparse
+import heapq
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from risk import risk_lots
+from backtest import SL_POINTS, TP_POINTS
+from strategies import STRATEGIES, new_engine, strategy_order
+
+# Ticks live under <repo>/data/ticks unless TICK_STORE points somewhere else
+DEFAULT_ROOT = os.environ.get(
+    "TICK_STORE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ticks"),
+)
+TICK_COLUMNS = {"time_msc": np.int64, "bid": np.float64, "ask": np.float64}
+
+
+class TickStore:
+    """
+    On-disk tick store, one directory per symbol with a raw binary file per column
+    (int64 epoch milliseconds, float64 bid and ask) plus meta.json with the row
+    count. Reads are memory-mapped, so replays never load a whole file.
+    """
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def path(self, symbol):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol)
+        return os.path.join(self.root, safe)
+
+    def rows(self, symbol):
+        try:
+            with open(os.path.join(self.path(symbol), "meta.json")) as f:
+                return json.load(f)["rows"]
+        except FileNotFoundError:
+            return 0
+
+    def columns(self, symbol):
+        """Memory-mapped time_msc/bid/ask arrays, or None if nothing is stored"""
+        rows = self.rows(symbol)
+        if rows == 0:
+            return None
+        base = self.path(symbol)
+        return {col: np.memmap(os.path.join(base, f"{col}.bin"), dtype=dtype, mode="r", shape=(rows,))
+                for col, dtype in TICK_COLUMNS.items()}
+
+    def append(self, symbol, time_msc, bid, ask):
+        """Append ticks (must be newer than the stored ones)"""
+        base = self.path(symbol)
+        os.makedirs(base, exist_ok=True)
+        rows = self.rows(symbol)
+        for col, values in (("time_msc", time_msc), ("bid", bid), ("ask", ask)):
+            values = np.ascontiguousarray(values, dtype=TICK_COLUMNS[col])
+            with open(os.path.join(base, f"{col}.bin"), "r+b" if rows else "wb") as f:
+                f.seek(rows * values.itemsize)
+                f.write(values.tobytes())
+                f.truncate()
+        meta = os.path.join(base, "meta.json")
+        with open(meta + ".tmp", "w") as f:
+            json.dump({"rows": rows + len(time_msc)}, f)
+        os.replace(meta + ".tmp", meta)
+
+    def import_csv(self, symbol, csv_file, chunksize=1_000_000):
+        """
+        Import an MT5 tick export (tab separated <DATE> <TIME> <BID> <ASK> ...)
+        chunk by chunk. Empty bid/ask cells mean "unchanged" and are carried forward.
+        """
+        last = {"bid": np.nan, "ask": np.nan}
+        for chunk in pd.read_csv(csv_file, sep="\t", chunksize=chunksize):
+            chunk.columns = [c.strip("<>").lower() for c in chunk.columns]
+            stamps = pd.to_datetime(chunk["date"] + " " + chunk["time"], format="%Y.%m.%d %H:%M:%S.%f")
+            quotes = {}
+            for side in ("bid", "ask"):
+                values = chunk[side].astype(float)
+                quotes[side] = values.fillna(last[side]).ffill().to_numpy()
+                last[side] = quotes[side][-1]
+            valid = ~(np.isnan(quotes["bid"]) | np.isnan(quotes["ask"]))
+            self.append(symbol, stamps.to_numpy(dtype="datetime64[ms]").astype(np.int64)[valid],
+                        quotes["bid"][valid], quotes["ask"][valid])
+
+
+class TickReplay:
+    """
+    Event-driven replay of stored ticks through the MT5TradingBot strategies.
+    Ticks are read from the memory-mapped store one chunk at a time and folded into
+    bid bars with vectorized reductions; the strategy runs in Python only when a bar
+    closes (on the first tick of the next bar, as the live bot would see it).
+    An order is sent at that tick's quote and filled `latency_ticks` later at the
+    ask (buys) or bid (sells); fills further than `deviation` points from the quote
+    are requoted and dropped. SL/TP are set from the quoted price like place_order
+    and resolved tick by tick: buys exit on the bid, sells on the ask, at the price
+    of the first tick that reaches a level (so stops slip through gaps). That search
+    is a vectorized scan over the memory map, so ticks between events never enter
+    the Python loop.
+    :param timeframe: Bar length in seconds
+    """
+    def __init__(self, ticks, strategy=STRATEGIES[2], timeframe=900, point=0.01, sl_points=SL_POINTS,
+                 tp_points=TP_POINTS, deviation=10, latency_ticks=1, risk_percent=0.01,
+                 balance=10000.0, contract_size=1.0, chunk=1 << 20):
+        self.time_msc = ticks["time_msc"]
+        self.bid = ticks["bid"]
+        self.ask = ticks["ask"]
+        self.strategy = strategy
+        self.period_ms = int(timeframe) * 1000
+        self.point = point
+        self.sl_points = sl_points
+        self.tp_points = tp_points
+        self.deviation = deviation
+        self.latency_ticks = latency_ticks
+        self.risk_percent = risk_percent
+        self.initial_balance = balance
+        self.contract_size = contract_size
+        self.chunk = chunk
+
+    def first_exit(self, start, sl, tp, is_buy, search=4096):
+        """First tick at or after `start` reaching SL or TP: (index, price, reason) or Nones"""
+        n = len(self.bid)
+        prices = self.bid if is_buy else self.ask
+        i = start
+        while i < n:
+            j = min(n, i + search)
+            window = np.asarray(prices[i:j])
+            if is_buy:
+                sl_hit = window <= sl
+                tp_hit = window >= tp
+            else:
+                sl_hit = window >= sl
+                tp_hit = window <= tp
+            hit = sl_hit | tp_hit
+            if hit.any():
+                k = int(np.argmax(hit))
+                return i + k, float(window[k]), "sl" if sl_hit[k] else "tp"
+            i = j
+            search *= 2  # Most trades are short, widen the window for long ones
+        return None, None, None
+
+    def bars(self):
+        """
+        Yield closed bars as (event tick index, bar dict), reading one chunk of
+        the memory map at a time. A bar closes on the first tick of the next bucket.
+        """
+        n = len(self.time_msc)
+        current = None  # [bucket, open, high, low, close]
+        for lo in range(0, n, self.chunk):
+            hi = min(n, lo + self.chunk)
+            bucket = np.asarray(self.time_msc[lo:hi]) // self.period_ms
+            bid = np.asarray(self.bid[lo:hi])
+            starts = np.flatnonzero(np.diff(bucket)) + 1
+            starts = np.concatenate([[0], starts])
+            opens = bid[starts]
+            highs = np.maximum.reduceat(bid, starts)
+            lows = np.minimum.reduceat(bid, starts)
+            closes = bid[np.concatenate([starts[1:] - 1, [len(bid) - 1]])]
+            for k in range(len(starts)):
+                if current is not None and current[0] == bucket[starts[k]]:
+                    # Continues the bar left open by the previous chunk
+                    current[2] = max(current[2], highs[k])
+                    current[3] = min(current[3], lows[k])
+                    current[4] = closes[k]
+                    continue
+                if current is not None:
+                    yield lo + int(starts[k]), {"time": current[0] * self.period_ms // 1000, "open": current[1],
+                                                "high": current[2], "low": current[3], "close": current[4]}
+                current = [int(bucket[starts[k]]), opens[k], highs[k], lows[k], closes[k]]
+
+    def run(self):
+        """
+        Replay every tick. Returns (trades DataFrame, stats dict).
+        """
+        start = time.perf_counter()
+        n = len(self.bid)
+        engine = new_engine()
+        balance = self.initial_balance
+        pending = []  # heap of (exit tick, profit) not yet booked
+        open_until = {"buy": -1, "sell": -1}  # Exit tick of the open position per side
+        trades = []
+        bars = requotes = 0
+        for event, bar in self.bars():
+            bars += 1
+            engine.add_bar(bar)
+            while pending and pending[0][0] <= event:
+                balance += heapq.heappop(pending)[1]
+            if not engine.ready:
+                continue
+            side = strategy_order(self.strategy, engine, self.point,
+                                  open_until["buy"] > event, open_until["sell"] > event)
+            if side is None:
+                continue
+            # Risk `risk_percent` of the realized balance at the stop, like the live bot
+            lots = float(risk_lots(balance, self.risk_percent, self.sl_points * self.point, self.point,
+                                   self.point * self.contract_size))
+            if lots <= 0:
+                continue
+            is_buy = side == "buy"
+            fill_tick = event + self.latency_ticks
+            if fill_tick >= n:
+                break
+            requested = float(self.ask[event] if is_buy else self.bid[event])
+            entry = float(self.ask[fill_tick] if is_buy else self.bid[fill_tick])
+            if abs(entry - requested) > self.deviation * self.point + 1e-12:
+                requotes += 1
+                continue
+            direction = 1 if is_buy else -1
+            sl = requested - direction * self.sl_points * self.point
+            tp = requested + direction * self.tp_points * self.point
+            exit_tick, exit_price, reason = self.first_exit(fill_tick, sl, tp, is_buy)
+            if exit_tick is None:
+                # Still open at the end of the data, mark it to the last tick
+                exit_tick = n - 1
+                exit_price = float(self.bid[-1] if is_buy else self.ask[-1])
+                reason = "open"
+            profit = direction * (exit_price - entry) * lots * self.contract_size
+            trades.append((bar["time"], int(self.time_msc[fill_tick]), int(self.time_msc[exit_tick]), side, lots,
+                           requested, entry, sl, tp, exit_price, reason, profit))
+            heapq.heappush(pending, (exit_tick, profit))
+            open_until[side] = exit_tick
+
+        elapsed = time.perf_counter() - start
+        columns = ["signal_time", "entry_time_msc", "exit_time_msc", "type", "lots", "requested",
+                   "entry", "sl", "tp", "exit", "reason", "profit"]
+        trades = pd.DataFrame(trades, columns=columns)
+        stats = {
+            "ticks": n,
+            "bars": bars,
+            "trades": len(trades),
+            "requotes": requotes,
+            "net_profit": float(trades["profit"].sum()),
+            "seconds": elapsed,
+            "ticks_per_second": n / elapsed if elapsed else float("inf"),
+        }
+        return trades, stats
+
+
+def synthetic_ticks(n, start_msc=1_700_000_000_000, price=100.0, volatility=2e-5, spread=0.02, seed=0):
+    """Random-walk ticks about 250 ms apart, for benchmarks"""
+    rng = np.random.default_rng(seed)
+    time_msc = start_msc + np.cumsum(rng.integers(1, 500, n))
+    bid = np.round(price * np.exp(np.cumsum(rng.normal(0, volatility, n))), 2)
+    return {"time_msc": time_msc, "bid": bid, "ask": bid + spread}
+
+# Main function
+def main():
+    parser = argparse.ArgumentParser(description="Replay stored ticks through an MT5TradingBot strategy")
+    parser.add_argument("symbol", nargs="?", default="SYNTH", help="Symbol in the tick store")
+    parser.add_argument("--csv", help="Import this MT5 tick export into the store first")
+    parser.add_argument("--synthetic", type=int, help="Replay this many random-walk ticks from a temporary store")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=STRATEGIES[2])
+    parser.add_argument("--timeframe", type=int, default=60, help="Bar length in seconds")
+    parser.add_argument("--point", type=float, default=0.01)
+    parser.add_argument("--deviation", type=float, default=10, help="Max slippage in points")
+    parser.add_argument("--latency-ticks", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TickStore(tmp if args.synthetic else DEFAULT_ROOT)
+        if args.synthetic:
+            store.append(args.symbol, **synthetic_ticks(args.synthetic))
+        if args.csv:
+            store.import_csv(args.symbol, args.csv)
+        ticks = store.columns(args.symbol)
+        if ticks is None:
+            parser.error(f"No ticks stored for {args.symbol}")
+        replay = TickReplay(ticks, args.strategy, args.timeframe, args.point,
+                            deviation=args.deviation, latency_ticks=args.latency_ticks)
+        trades, stats = replay.run()
+        del ticks, replay
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()